@@ -1,8 +1,10 @@
 # Router for base api
 from fastapi import APIRouter
 from langflow.api.v1 import (
+    cache_router,
     chat_router,
     endpoints_router,
+    files_router,
     validate_router,
     flows_router,
     flow_styles_router,
@@ -16,3 +18,5 @@ router.include_router(endpoints_router)
 router.include_router(validate_router)
 router.include_router(flows_router)
 router.include_router(flow_styles_router)
+router.include_router(cache_router)
+router.include_router(files_router)
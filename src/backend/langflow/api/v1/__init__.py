@@ -1,12 +1,16 @@
+from langflow.api.v1.cache import router as cache_router
 from langflow.api.v1.endpoints import router as endpoints_router
+from langflow.api.v1.files import router as files_router
 from langflow.api.v1.validate import router as validate_router
 from langflow.api.v1.chat import router as chat_router
 from langflow.api.v1.flows import router as flows_router
 from langflow.api.v1.flow_styles import router as flow_styles_router
 
 __all__ = [
+    "cache_router",
     "chat_router",
     "endpoints_router",
+    "files_router",
     "validate_router",
     "flows_router",
     "flow_styles_router",
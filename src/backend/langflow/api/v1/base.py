@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic import BaseModel, validator
 
 from langflow.interface.utils import extract_input_variables_from_prompt
@@ -33,6 +35,19 @@ class PromptValidationResponse(BaseModel):
     input_variables: list
 
 
+class GraphValidationError(BaseModel):
+    node: Optional[str] = None
+    message: str
+
+
+class GraphValidationResponse(BaseModel):
+    valid: bool
+    root: Optional[str] = None
+    errors: List[GraphValidationError]
+    # Nodes that are ignored, e.g. because they are not connected
+    warnings: List[GraphValidationError] = []
+
+
 INVALID_CHARACTERS = {
     " ",
     ",",
@@ -0,0 +1,46 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, HTTPException
+
+from langflow.api.v1.schemas import CacheStatsRead, CacheStatsResponse
+from langflow.cache.base import ObservableCache
+from langflow.cache.registry import cache_registry
+from langflow.utils.logger import logger
+
+# build router
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+def get_cache(name: str) -> ObservableCache:
+    cache = cache_registry.get(name)
+    if cache is None:
+        raise HTTPException(status_code=404, detail=f"Cache {name} not found")
+    return cache
+
+
+@router.get("/stats", response_model=CacheStatsResponse, status_code=200)
+def get_cache_stats():
+    """Entries, estimated bytes, hits, misses, waits, evictions and expirations of every cache."""
+    return CacheStatsResponse(
+        caches={
+            name: CacheStatsRead(**asdict(stats))
+            for name, stats in cache_registry.stats().items()
+        }
+    )
+
+
+@router.post("/{name}/clear", status_code=200)
+def clear_cache(name: str):
+    """Remove every item of a cache."""
+    get_cache(name).clear()
+    logger.info(f"Cleared cache {name}")
+    return {"message": f"Cache {name} cleared"}
+
+
+@router.delete("/{name}/{key}", status_code=200)
+def evict_cache_key(name: str, key: str):
+    """Remove an item of a cache, e.g. a flow id from the builds cache."""
+    if not get_cache(name).evict(key):
+        raise HTTPException(status_code=404, detail=f"Key {key} not found in {name}")
+    logger.info(f"Evicted {key} from cache {name}")
+    return {"message": f"Evicted {key} from cache {name}"}
@@ -1,23 +1,58 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketException, status
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketException,
+    status,
+)
 from fastapi.responses import StreamingResponse
-from langflow.api.v1.schemas import BuildStatus, BuiltResponse, InitResponse, StreamData
+import asyncio
+from typing import Any, Dict, List
 
+from langflow.api.v1.schemas import (
+    BuildReportResponse,
+    BuildStatus,
+    BuiltResponse,
+    CancelBuildResponse,
+    FileDelivery,
+    InitResponse,
+    StreamData,
+)
+
+from langflow.cache.registry import ObservableLRUCache, cache_registry
 from langflow.chat.manager import ChatManager
+from langflow.chat.utils import BuildCancelledError, run_until_cancelled
 from langflow.graph.graph.base import Graph
+from langflow.utils.payload import get_root_node
 from langflow.utils.logger import logger
 from cachetools import LRUCache
 
 router = APIRouter(tags=["Chat"])
 chat_manager = ChatManager()
-flow_data_store: LRUCache = LRUCache(maxsize=10)
+flow_data_store: LRUCache = ObservableLRUCache(maxsize=10)
+cache_registry.register("chat", chat_manager.in_memory_cache)
+cache_registry.register("builds", flow_data_store)
 
 
 @router.websocket("/chat/{client_id}")
-async def chat(client_id: str, websocket: WebSocket):
-    """Websocket endpoint for chat."""
+async def chat(
+    client_id: str,
+    websocket: WebSocket,
+    files: FileDelivery = FileDelivery.INLINE,
+    table_format: str = Query("csv", regex="^(csv|parquet)$"),
+):
+    """
+    Websocket endpoint for chat.
+
+    Files (images and tables) are sent as base64, as a url or as binary
+    frames depending on files, and tables as CSV or Parquet.
+    """
     try:
         if client_id in chat_manager.in_memory_cache:
-            await chat_manager.handle_websocket(client_id, websocket)
+            await chat_manager.handle_websocket(
+                client_id, websocket, files=files, table_format=table_format
+            )
         else:
             # We accept the connection but close it immediately
             # if the flow is not built yet
@@ -45,12 +80,14 @@ async def init_build(graph_data: dict, flow_id: str):
 
         # Delete from cache if already exists
         if flow_id in chat_manager.in_memory_cache:
-            with chat_manager.in_memory_cache._lock:
-                chat_manager.in_memory_cache.delete(flow_id)
-                logger.debug(f"Deleted flow {flow_id} from cache")
+            chat_manager.in_memory_cache.delete(flow_id)
+            logger.debug(f"Deleted flow {flow_id} from cache")
+        # Keep the last built graph so unchanged vertices can be reused
+        previous_graph = flow_data_store.get(flow_id, {}).get("graph")
         flow_data_store[flow_id] = {
             "graph_data": graph_data,
             "status": BuildStatus.STARTED,
+            "graph": previous_graph,
         }
 
         return InitResponse(flowId=flow_id)
@@ -77,12 +114,58 @@ async def build_status(flow_id: str):
         return HTTPException(status_code=500, detail=str(exc))
 
 
+@router.post("/build/{flow_id}/cancel", response_model=CancelBuildResponse)
+async def cancel_build(flow_id: str):
+    """Cancel the build of a flow, stopping the vertex being built."""
+    if flow_id not in flow_data_store:
+        raise HTTPException(status_code=404, detail="Flow not found")
+    cancel_event = flow_data_store[flow_id].get("cancel_event")
+    if (
+        cancel_event is None
+        or flow_data_store[flow_id]["status"] != BuildStatus.IN_PROGRESS
+    ):
+        return CancelBuildResponse(cancelled=False)
+    cancel_event.set()
+    return CancelBuildResponse(cancelled=True)
+
+
+@router.get("/build/{flow_id}/report", response_model=BuildReportResponse)
+async def build_report(flow_id: str):
+    """Return the resources used by each vertex of the last build of a flow."""
+    if flow_id not in flow_data_store or "report" not in flow_data_store[flow_id]:
+        raise HTTPException(status_code=404, detail="Flow has not been built")
+    vertices = flow_data_store[flow_id]["report"]
+    return BuildReportResponse(
+        flowId=flow_id,
+        status=flow_data_store[flow_id]["status"].value,
+        vertices=vertices,
+        wall_time=sum(vertex["wall_time"] or 0 for vertex in vertices),
+        cpu_time=sum(vertex["cpu_time"] or 0 for vertex in vertices),
+    )
+
+
+def get_vertex_report(vertex, valid: bool, skipped: bool = False) -> Dict[str, Any]:
+    return {
+        "id": vertex.id,
+        "vertex_type": vertex.vertex_type,
+        "valid": valid,
+        "skipped": skipped,
+        "start_time": vertex.build_start_time,
+        "end_time": vertex.build_end_time,
+        "wall_time": vertex.build_metrics.get("wall_time"),
+        "cpu_time": vertex.build_metrics.get("cpu_time"),
+        "memory_peak": vertex.build_metrics.get("memory_peak"),
+        "cache_hit": vertex.build_metrics.get("cache_hit", False),
+    }
+
+
 @router.get("/build/stream/{flow_id}", response_class=StreamingResponse)
 async def stream_build(flow_id: str):
     """Stream the build process based on stored flow data."""
 
     async def event_stream(flow_id):
         final_response = {"end_of_stream": True}
+        disconnected = False
         try:
             if flow_id not in flow_data_store:
                 error_message = "Invalid session ID"
@@ -94,7 +177,8 @@ async def stream_build(flow_id: str):
                 yield str(StreamData(event="error", data={"error": error_message}))
                 return
 
-            graph_data = flow_data_store[flow_id].get("graph_data")
+            # The raw payload is only needed to build the graph, which is kept
+            graph_data = flow_data_store[flow_id].pop("graph_data", None)
 
             if not graph_data:
                 error_message = "No data provided"
@@ -104,35 +188,47 @@ async def stream_build(flow_id: str):
             logger.debug("Building langchain object")
             try:
                 # Some error could happen when building the graph
-                graph = Graph.from_payload(graph_data)
+                if previous_graph := flow_data_store[flow_id].get("graph"):
+                    graph = Graph.from_previous(previous_graph, graph_data)
+                else:
+                    graph = Graph.from_payload(graph_data)
+                del graph_data
             except Exception as exc:
                 logger.exception(exc)
                 error_message = str(exc)
                 yield str(StreamData(event="error", data={"error": error_message}))
                 return
 
-            number_of_nodes = len(graph.nodes)
+            number_of_nodes = len(graph.nodes) + len(graph.unreachable_nodes)
+            reused_ids = {vertex.id for vertex in graph.nodes if vertex._built}
             flow_data_store[flow_id]["status"] = BuildStatus.IN_PROGRESS
-            # To deal with the ZeroShotAgent case
-            # we need to build the root node first
-            # and then the rest of the graph
-            # This is a big problem because certain nodes require
-            # params that are not connected to it.
-            # We should consider connecting the tools to the ZeroShotPrompt
-            graph.build()
+            # Filled as the vertices are built, see build_report
+            report: List[Dict[str, Any]] = []
+            flow_data_store[flow_id]["report"] = report
+            cancel_event = asyncio.Event()
+            flow_data_store[flow_id]["cancel_event"] = cancel_event
+            root_node = get_root_node(graph)
+            if root_node is None:
+                raise ValueError("No root node found")
 
+            # Each vertex is built exactly once, in build order. The prompts
+            # and chains of a ZeroShotAgent are built by the agent itself
+            # (it passes its tools along), so they come right after it.
             for i, vertex in enumerate(graph.generator_build(), 1):
                 try:
+                    action = "Reusing" if vertex.id in reused_ids else "Building"
                     log_dict = {
-                        "log": f"Building node {vertex.vertex_type}",
+                        "log": f"{action} node {vertex.vertex_type}",
                     }
                     yield str(StreamData(event="log", data=log_dict))
-                    vertex.build()
+                    await run_until_cancelled(vertex.abuild(), cancel_event)
                     params = vertex._built_object_repr()
                     valid = True
                     logger.debug(
                         f"Building node {params[:50]}{'...' if len(params) > 50 else ''}"
                     )
+                except BuildCancelledError:
+                    raise
                 except Exception as exc:
                     params = str(exc)
                     valid = False
@@ -143,18 +239,56 @@ async def stream_build(flow_id: str):
                     "params": params,
                     "id": vertex.id,
                     "progress": round(i / number_of_nodes, 2),
+                    "start_time": vertex.build_start_time,
+                    "end_time": vertex.build_end_time,
+                    "metrics": vertex.build_metrics,
                 }
+                report.append(get_vertex_report(vertex, valid=valid))
 
                 yield str(StreamData(event="message", data=response))
 
-            chat_manager.set_cache(flow_id, graph.build())
-            flow_data_store[flow_id]["status"] = BuildStatus.SUCCESS
+            # Nodes the root does not depend on are never built
+            for i, vertex in enumerate(graph.unreachable_nodes, len(graph.nodes) + 1):
+                response = {
+                    "valid": True,
+                    "params": "skipped (unreachable)",
+                    "id": vertex.id,
+                    "progress": round(i / number_of_nodes, 2),
+                    "start_time": None,
+                    "end_time": None,
+                    "metrics": {},
+                }
+                report.append(get_vertex_report(vertex, valid=True, skipped=True))
+                yield str(StreamData(event="message", data=response))
+
+            # The root was built in the loop above, this only returns it
+            flow_data_store[flow_id]["graph"] = graph
+            if chat_manager.set_cache(flow_id, await root_node.abuild()):
+                flow_data_store[flow_id]["status"] = BuildStatus.SUCCESS
+            else:
+                flow_data_store[flow_id]["status"] = BuildStatus.FAILURE
+                error_message = (
+                    "The built flow is too large to be kept for the chat, "
+                    "see chat_cache_max_memory"
+                )
+                yield str(StreamData(event="error", data={"error": error_message}))
+        except BuildCancelledError as exc:
+            logger.debug(f"Build of {flow_id} cancelled")
+            flow_data_store[flow_id]["status"] = BuildStatus.CANCELLED
+            yield str(StreamData(event="error", data={"error": str(exc)}))
+        except asyncio.CancelledError:
+            # The client disconnected, the vertex being built was cancelled
+            logger.debug(f"Client disconnected, build of {flow_id} cancelled")
+            flow_data_store[flow_id]["status"] = BuildStatus.CANCELLED
+            disconnected = True
+            raise
         except Exception as exc:
             logger.error("Error while building the flow: %s", exc)
             flow_data_store[flow_id]["status"] = BuildStatus.FAILURE
             yield str(StreamData(event="error", data={"error": str(exc)}))
         finally:
-            yield str(StreamData(event="message", data=final_response))
+            if not disconnected:
+                yield str(StreamData(event="message", data=final_response))
 
     try:
         return StreamingResponse(event_stream(flow_id), media_type="text/event-stream")
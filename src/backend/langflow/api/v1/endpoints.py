@@ -1,7 +1,14 @@
+import copy
 from typing import Optional
 from langflow.cache.utils import save_uploaded_file
+from langflow.api.v1.flows import save_flow_plan
 from langflow.database.models.flow import Flow
-from langflow.processing.process import process_graph_cached, process_tweaks
+from langflow.graph.graph.constants import PLAN_VERSION
+from langflow.processing.process import (
+    aprocess_graph_cached,
+    aprocess_plan_cached,
+    process_tweaks,
+)
 from langflow.utils.logger import logger
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile
@@ -47,10 +54,30 @@ async def process_flow(
         graph_data = flow.data
         if tweaks:
             try:
-                graph_data = process_tweaks(graph_data, tweaks)
+                # Tweaks apply to this request only, the stored data and the
+                # plan compiled from it stay as they are
+                graph_data = process_tweaks(copy.deepcopy(graph_data), tweaks)
             except Exception as exc:
                 logger.error(f"Error processing tweaks: {exc}")
-        response = process_graph_cached(graph_data, inputs)
+        plan = flow.plan.plan if flow.plan is not None else None
+        # Flows without a plan are fingerprinted when they are processed
+        fingerprint = flow.plan.fingerprint if flow.plan is not None else None
+        if plan is not None and plan.get("version") != PLAN_VERSION:
+            # Compiled by another version of langflow: load the flow from its
+            # data this time and compile the plan again for the next requests
+            logger.debug(f"Recompiling the execution plan of flow {flow_id}")
+            save_flow_plan(session, flow)
+            session.commit()
+            plan = fingerprint = None
+        if tweaks:
+            # The plan and fingerprint match the stored data, tweaks change it
+            response = await aprocess_graph_cached(graph_data, inputs)
+        elif plan is not None:
+            response = await aprocess_plan_cached(plan, inputs, fingerprint=fingerprint)
+        else:
+            response = await aprocess_graph_cached(
+                graph_data, inputs, fingerprint=fingerprint
+            )
         return ProcessResponse(
             result=response,
         )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Response
+
+from langflow.cache.files import claim_file
+
+# build router
+router = APIRouter(prefix="/files", tags=["Files"])
+
+
+@router.get("/{file_id}", status_code=200)
+def download_file(file_id: str):
+    """Download a file sent to a chat client, e.g. a generated image or table."""
+    chat_file = claim_file(file_id)
+    if chat_file is None:
+        raise HTTPException(status_code=404, detail=f"File {file_id} not found")
+    return Response(
+        content=chat_file.data,
+        media_type=chat_file.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{chat_file.filename}"',
+            # The id is the digest of the content, which never changes, so
+            # the response can be cached forever (a year is the usual maximum)
+            "Cache-Control": "private, max-age=31536000, immutable",
+            "ETag": f'"{chat_file.id}"',
+        },
+    )
@@ -3,6 +3,7 @@ from uuid import UUID
 from langflow.settings import settings
 from langflow.api.utils import remove_api_keys
 from langflow.api.v1.schemas import FlowListCreate, FlowListRead
+from langflow.cache.fingerprint import compute_flow_fingerprint
 from langflow.database.models.flow import (
     Flow,
     FlowCreate,
@@ -10,7 +11,10 @@ from langflow.database.models.flow import (
     FlowReadWithStyle,
     FlowUpdate,
 )
+from langflow.database.models.flow_plan import FlowPlan
 from langflow.database.base import get_session
+from langflow.graph import Graph
+from langflow.utils.logger import logger
 from sqlmodel import Session, select
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.encoders import jsonable_encoder
@@ -22,11 +26,43 @@ import json
 router = APIRouter(prefix="/flows", tags=["Flows"])
 
 
+def save_flow_plan(session: Session, db_flow: Flow) -> None:
+    """
+    Compiles the execution plan of a flow and stores it next to the flow,
+    along with the fingerprint of the data it was compiled from, used as
+    its cache key.
+
+    Flows that cannot be loaded yet (e.g. missing required inputs) are saved
+    without a plan and are loaded from their data when processed.
+    """
+    try:
+        plan = Graph.from_payload(db_flow.data).to_plan() if db_flow.data else None
+    except Exception as exc:
+        logger.debug(f"Could not compile an execution plan for {db_flow.id}: {exc}")
+        plan = None
+    if plan is None:
+        if db_flow.plan is not None:
+            session.delete(db_flow.plan)
+    elif db_flow.plan is not None:
+        db_flow.plan.plan = plan
+        db_flow.plan.fingerprint = compute_flow_fingerprint(db_flow.data)
+        session.add(db_flow.plan)
+    else:
+        session.add(
+            FlowPlan(
+                flow_id=db_flow.id,
+                plan=plan,
+                fingerprint=compute_flow_fingerprint(db_flow.data),
+            )
+        )
+
+
 @router.post("/", response_model=FlowRead, status_code=201)
 def create_flow(*, session: Session = Depends(get_session), flow: FlowCreate):
     """Create a new flow."""
     db_flow = Flow.from_orm(flow)
     session.add(db_flow)
+    save_flow_plan(session, db_flow)
     session.commit()
     session.refresh(db_flow)
     return db_flow
@@ -66,6 +102,8 @@ def update_flow(
     for key, value in flow_data.items():
         setattr(db_flow, key, value)
     session.add(db_flow)
+    if "data" in flow_data:
+        save_flow_plan(session, db_flow)
     session.commit()
     session.refresh(db_flow)
     return db_flow
@@ -92,6 +130,7 @@ def create_flows(*, session: Session = Depends(get_session), flow_list: FlowList
     for flow in flow_list.flows:
         db_flow = Flow.from_orm(flow)
         session.add(db_flow)
+        save_flow_plan(session, db_flow)
         db_flows.append(db_flow)
     session.commit()
     for db_flow in db_flows:
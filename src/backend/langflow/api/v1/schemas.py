@@ -2,7 +2,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 from langflow.database.models.flow import FlowCreate, FlowRead
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, validator
 import json
 
 
@@ -13,6 +13,7 @@ class BuildStatus(Enum):
     FAILURE = "failure"
     STARTED = "started"
     IN_PROGRESS = "in_progress"
+    CANCELLED = "cancelled"
 
 
 class GraphData(BaseModel):
@@ -72,6 +73,17 @@ class ChatResponse(ChatMessage):
         return v
 
 
+class FileDelivery(str, Enum):
+    """How the chat websocket sends files to a client."""
+
+    # Base64 in the data field of the JSON message
+    INLINE = "inline"
+    # A url to download the file from, the data field is null
+    URL = "url"
+    # A binary frame after the JSON message, one per file in order
+    BINARY = "binary"
+
+
 class FileResponse(ChatMessage):
     """File response schema."""
 
@@ -79,11 +91,17 @@ class FileResponse(ChatMessage):
     data_type: str
     type: str = "file"
     is_bot: bool = True
+    # Set when the file is sent to a client
+    file_id: Optional[str] = None
+    media_type: Optional[str] = None
+    url: Optional[str] = None
+    # The id of the serialized data by table format, so it is serialized once
+    _file_ids: Dict[str, str] = PrivateAttr(default_factory=dict)
 
     @validator("data_type")
     def validate_data_type(cls, v):
-        if v not in ["image", "csv"]:
-            raise ValueError("data_type must be image or csv")
+        if v not in ["image", "csv", "pandas"]:
+            raise ValueError("data_type must be image, csv or pandas")
         return v
 
 
@@ -103,6 +121,55 @@ class BuiltResponse(BaseModel):
     built: bool
 
 
+class CancelBuildResponse(BaseModel):
+    cancelled: bool
+
+
+class VertexBuildReport(BaseModel):
+    """Resources used to build a vertex, see measure_build."""
+
+    id: str
+    vertex_type: str
+    valid: bool
+    skipped: bool = False
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    wall_time: Optional[float] = None
+    cpu_time: Optional[float] = None
+    memory_peak: Optional[int] = None
+    cache_hit: bool = False
+
+
+class BuildReportResponse(BaseModel):
+    """Build report of a flow."""
+
+    flowId: str
+    status: str
+    vertices: List[VertexBuildReport]
+    wall_time: float
+    cpu_time: float
+
+
+class CacheStatsRead(BaseModel):
+    """Statistics of a cache, see CacheStats."""
+
+    entries: int
+    bytes: Optional[int] = None
+    hits: int
+    misses: int
+    waits: int = 0
+    evictions: int
+    expirations: int
+    max_entries: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+
+class CacheStatsResponse(BaseModel):
+    """Statistics of every cache, by name."""
+
+    caches: Dict[str, CacheStatsRead]
+
+
 class UploadFileResponse(BaseModel):
     """Upload file response schema."""
 
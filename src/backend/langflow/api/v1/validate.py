@@ -3,10 +3,12 @@ from fastapi import APIRouter, HTTPException
 from langflow.api.v1.base import (
     Code,
     CodeValidationResponse,
+    GraphValidationResponse,
     Prompt,
     PromptValidationResponse,
     validate_prompt,
 )
+from langflow.graph import Graph
 from langflow.utils.logger import logger
 from langflow.utils.validate import validate_code
 
@@ -33,3 +35,15 @@ def post_validate_prompt(prompt: Prompt):
     except Exception as e:
         logger.exception(e)
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.post("/graph", status_code=200, response_model=GraphValidationResponse)
+def post_validate_graph(graph_data: dict):
+    """Checks the wiring of a flow without instantiating any of its nodes."""
+    try:
+        return Graph.validate_payload(graph_data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except Exception as e:
+        logger.exception(e)
+        raise HTTPException(status_code=500, detail=str(e)) from e
@@ -1,4 +1,61 @@
 import abc
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class CacheStats:
+    """
+    The statistics every cache reports, see ObservableCache.
+
+    Attributes:
+        entries: The number of cached items.
+        bytes: The estimated memory (or disk) used by the items, None if unknown.
+        hits: The number of lookups that found an item.
+        misses: The number of lookups that did not.
+        waits: The number of lookups that waited for another caller computing
+            the item instead of computing it, counted neither as hits nor misses.
+        evictions: The number of items removed to make room.
+        expirations: The number of items removed because they expired.
+        max_entries: The maximum number of items, None if unbounded.
+        max_bytes: The maximum size of the items, None if unbounded.
+    """
+
+    entries: int = 0
+    bytes: Optional[int] = None
+    hits: int = 0
+    misses: int = 0
+    waits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    max_entries: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+
+class ObservableCache(abc.ABC):
+    """
+    Interface of the caches whose statistics are reported by the
+    /api/v1/cache endpoints, see langflow.cache.registry.
+    """
+
+    @abc.abstractmethod
+    def stats(self) -> CacheStats:
+        """Return the statistics of the cache."""
+
+    @abc.abstractmethod
+    def evict(self, key: Any) -> bool:
+        """
+        Remove an item from the cache.
+
+        Returns:
+            Whether there was an item for the key.
+        """
+
+    @abc.abstractmethod
+    def clear(self):
+        """
+        Clear all items from the cache.
+        """
 
 
 class BaseCache(abc.ABC):
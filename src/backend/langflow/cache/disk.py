@@ -0,0 +1,204 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from langflow.cache.base import CacheStats, ObservableCache
+from langflow.utils.logger import logger
+
+ARTIFACT_SUFFIX = ".pkl"
+TEMP_SUFFIX = ".tmp"
+# Temporary files older than this were left by a crashed writer
+STALE_TEMP_FILE_AGE = 60 * 60
+
+
+class DiskCache(ObservableCache):
+    """
+    A size-bounded cache of pickled objects in a directory, shared by the
+    processes using the same directory and kept across restarts.
+
+    Writes go to a temporary file that is renamed over the artifact, so
+    readers never see partial files. Reads refresh the modification time of
+    the artifact, and the least recently used artifacts are removed when the
+    total size exceeds max_size.
+
+    Example:
+
+        cache = DiskCache("/tmp/artifacts", max_size=2**30)
+        cache.set(build_key, documents)
+        documents = cache.get(build_key)
+    """
+
+    def __init__(self, directory: Union[str, Path], max_size: Optional[int]):
+        """
+        Initialize a new DiskCache instance.
+
+        Args:
+            directory: The directory of the artifacts, created on first write.
+            max_size: Maximum total size of the artifacts in bytes.
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{ARTIFACT_SUFFIX}"
+
+    def get(self, key: str) -> Any:
+        """
+        Load an artifact.
+
+        Returns:
+            The unpickled object, or None if there is none for the key or it
+            cannot be loaded anymore (e.g. its class changed).
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception as exc:
+            logger.debug(f"Removing unreadable artifact {path.name}: {exc}")
+            with contextlib.suppress(OSError):
+                path.unlink()
+            self._count("misses")
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        self._count("hits")
+        return value
+
+    def set(self, key: str, value: Any) -> bool:
+        """
+        Store an artifact, removing the least recently used ones if needed.
+
+        Returns:
+            Whether the artifact was stored. Objects that cannot be pickled or
+            are larger than max_size are not.
+        """
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exc:
+            logger.debug(f"Not storing artifact {key}, it cannot be pickled: {exc}")
+            return False
+        if self.max_size and len(data) > self.max_size:
+            logger.debug(f"Not storing artifact {key}: {len(data)} bytes")
+            return False
+
+        self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        self._count("writes")
+        self.cleanup()
+        return True
+
+    def delete(self, key: str) -> None:
+        """Remove an artifact."""
+        self.evict(key)
+
+    def evict(self, key: str) -> bool:
+        """Remove an artifact, returning whether it existed."""
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def cleanup(self) -> int:
+        """
+        Remove the least recently used artifacts until the total size is at
+        most max_size, and the temporary files left by crashed writers.
+
+        Returns:
+            The number of removed artifacts.
+        """
+        artifacts = []
+        now = time.time()
+        for path in self._list(f"*{TEMP_SUFFIX}"):
+            with contextlib.suppress(OSError):
+                if now - path.stat().st_mtime > STALE_TEMP_FILE_AGE:
+                    path.unlink()
+        for path in self._list(f"*{ARTIFACT_SUFFIX}"):
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                artifacts.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum(size for _, size, _ in artifacts)
+        removed = 0
+        if self.max_size:
+            for _, size, path in sorted(artifacts, key=lambda artifact: artifact[0]):
+                if total_size <= self.max_size:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+                total_size -= size
+                removed += 1
+        if removed:
+            self._count("evictions", removed)
+            logger.debug(f"Removed {removed} artifacts from {self.directory}")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every artifact."""
+        for path in self._list(f"*{ARTIFACT_SUFFIX}"):
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+
+    def size(self) -> int:
+        """Return the total size of the artifacts in bytes."""
+        total_size = 0
+        for path in self._list(f"*{ARTIFACT_SUFFIX}"):
+            with contextlib.suppress(OSError):
+                total_size += path.stat().st_size
+        return total_size
+
+    def stats(self) -> CacheStats:
+        """Return the number and size of the artifacts and the access counts."""
+        with self._lock:
+            stats = CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                max_bytes=self.max_size,
+            )
+        stats.entries = len(self)
+        stats.bytes = self.size()
+        return stats
+
+    def _list(self, pattern: str):
+        if not self.directory.is_dir():
+            return []
+        return list(self.directory.glob(pattern))
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def __len__(self) -> int:
+        return len(self._list(f"*{ARTIFACT_SUFFIX}"))
+
+    def __repr__(self) -> str:
+        return f"DiskCache(directory={str(self.directory)!r}, max_size={self.max_size})"
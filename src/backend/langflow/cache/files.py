@@ -0,0 +1,115 @@
+import hashlib
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Optional, Tuple
+
+import pandas as pd
+from PIL import Image
+
+from langflow.cache.flow import InMemoryCache
+from langflow.cache.registry import cache_registry
+from langflow.settings import settings
+from langflow.utils.logger import logger
+
+TABLE_FORMATS = ("csv", "parquet")
+
+
+@dataclass(frozen=True)
+class ChatFile:
+    """A file sent to chat clients, addressed by the SHA-256 digest of its bytes."""
+
+    id: str
+    data: bytes
+    media_type: str
+    extension: str
+
+    @property
+    def filename(self) -> str:
+        return f"{self.id[:16]}.{self.extension}"
+
+    @property
+    def url(self) -> str:
+        return f"/api/v1/files/{self.id}"
+
+
+def serialize_file(obj: Any, table_format: str = "csv") -> Tuple[bytes, str, str]:
+    """
+    Serialize a cached object for a chat client.
+
+    Images are encoded as PNG and pandas objects as CSV, or as Parquet if
+    table_format is "parquet" and pyarrow is installed.
+
+    Returns:
+        The bytes, their media type and the file extension.
+    """
+    if isinstance(obj, Image.Image):
+        buffer = BytesIO()
+        obj.save(buffer, format="PNG")
+        return buffer.getvalue(), "image/png", "png"
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        if table_format == "parquet":
+            buffer = BytesIO()
+            try:
+                pd.DataFrame(obj).to_parquet(buffer)
+            except ImportError:
+                logger.warning("Sending the table as CSV, install pyarrow for Parquet")
+            else:
+                return buffer.getvalue(), "application/vnd.apache.parquet", "parquet"
+        return obj.to_csv().encode("utf-8"), "text/csv", "csv"
+    if isinstance(obj, str):
+        # CSV cached before DataFrames were kept as they are
+        return obj.encode("utf-8"), "text/csv", "csv"
+    if isinstance(obj, bytes):
+        return obj, "application/octet-stream", "bin"
+    raise ValueError(f"Cannot send a {type(obj).__name__} as a file")
+
+
+# The serialized files, shared by every client: the same image or table is
+# stored once however many times it is sent
+file_store = cache_registry.register(
+    "files",
+    InMemoryCache(
+        max_weight=settings.chat_files_max_memory or None,
+        weigher=lambda file: len(file.data),
+    ),
+)
+
+
+# The files whose url was sent to a client, kept until they are downloaded
+# even if file_store evicts them meanwhile, but for at most the client TTL
+# and within pending_downloads_max_memory
+pending_downloads = cache_registry.register(
+    "pending_downloads",
+    InMemoryCache(
+        expiration_time=settings.client_cache_expiration_time or None,
+        max_weight=settings.pending_downloads_max_memory or None,
+        weigher=lambda file: len(file.data),
+    ),
+)
+
+
+def store_file(obj: Any, table_format: str = "csv") -> ChatFile:
+    """Serialize an object and store it in file_store, returning the stored file."""
+    data, media_type, extension = serialize_file(obj, table_format)
+    file_id = hashlib.sha256(data).hexdigest()
+    return file_store.get_or_set(
+        file_id, ChatFile(file_id, data, media_type, extension)
+    )
+
+
+def get_file(file_id: str) -> Optional[ChatFile]:
+    return file_store.get(file_id)
+
+
+def keep_until_downloaded(chat_file: ChatFile) -> None:
+    """Keep a file whose url is sent to a client until it is downloaded."""
+    pending_downloads.set(chat_file.id, chat_file)
+
+
+def claim_file(file_id: str) -> Optional[ChatFile]:
+    """Return a file for its url, moving it back to file_store if it was pending."""
+    chat_file = pending_downloads.get(file_id)
+    if chat_file is None:
+        return file_store.get(file_id)
+    pending_downloads.delete(file_id)
+    return file_store.get_or_set(file_id, chat_file)
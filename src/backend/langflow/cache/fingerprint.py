@@ -0,0 +1,81 @@
+import hashlib
+import json
+from typing import Any
+
+# Keys only the frontend uses, ignored when fingerprinting a flow
+UI_FLOW_KEYS = frozenset(["viewport", "chatHistory"])
+UI_NODE_KEYS = frozenset(
+    ["position", "positionAbsolute", "selected", "dragging", "width", "height"]
+)
+
+# Strings longer than this (e.g. uploaded file contents) are fingerprinted by
+# their digest
+BLOB_SIZE = 4096
+
+
+def blob_digest(blob: str) -> str:
+    """
+    Return the SHA-256 digest of a large string. It is not cached, as a cache
+    keyed by the string would keep file contents alive.
+    """
+    return hashlib.sha256(blob.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _update(digest, value: Any) -> None:
+    """Feed a value to the digest, each token tagged with its type."""
+    if isinstance(value, dict):
+        digest.update(b"{%d" % len(value))
+        for key in sorted(value, key=str):
+            _update(digest, str(key))
+            _update(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[%d" % len(value))
+        for item in value:
+            _update(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, str):
+        if len(value) > BLOB_SIZE:
+            digest.update(b"b" + blob_digest(value).encode("ascii"))
+        else:
+            encoded = value.encode("utf-8", "surrogatepass")
+            digest.update(b"s%d:" % len(encoded) + encoded)
+    elif value is None or isinstance(value, (bool, int, float)):
+        digest.update(b"v" + json.dumps(value).encode("ascii") + b";")
+    else:
+        _update(digest, str(value))
+
+
+def compute_fingerprint(value: Any) -> str:
+    """
+    Compute a canonical hash of a JSON-like value.
+
+    Dict keys are hashed in sorted order and strings longer than BLOB_SIZE by
+    their digest. Other objects are hashed by their string form.
+    """
+    digest = hashlib.sha256()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def compute_flow_fingerprint(flow_data: dict) -> str:
+    """
+    Compute the fingerprint of the data of a flow, ignoring the keys only the
+    frontend uses (see UI_FLOW_KEYS and UI_NODE_KEYS). The data is not modified.
+    """
+    digest = hashlib.sha256()
+    keys = sorted(key for key in flow_data if key not in UI_FLOW_KEYS)
+    digest.update(b"{%d" % len(keys))
+    for key in keys:
+        _update(digest, key)
+        value = flow_data[key]
+        if key == "nodes" and isinstance(value, list):
+            value = [
+                {k: v for k, v in node.items() if k not in UI_NODE_KEYS}
+                if isinstance(node, dict)
+                else node
+                for node in value
+            ]
+        _update(digest, value)
+    digest.update(b"}")
+    return digest.hexdigest()
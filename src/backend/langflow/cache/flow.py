@@ -1,21 +1,48 @@
+import heapq
+import itertools
 import threading
 import time
+import weakref
 from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from langflow.cache.base import BaseCache
+from langflow.cache.base import BaseCache, CacheStats, ObservableCache
+from langflow.cache.utils import estimate_size
+from langflow.settings import settings
+from langflow.utils.logger import logger
 
 
-class InMemoryCache(BaseCache):
+class _PendingValue:
+    """A value being computed by get_or_set, shared with concurrent callers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class InMemoryCache(BaseCache, ObservableCache):
     """
     A simple in-memory cache using an OrderedDict.
 
     This cache supports setting a maximum size and expiration time for cached items.
     When the cache is full, it uses a Least Recently Used (LRU) eviction policy.
-    Thread-safe using a threading Lock.
+    The size can be bounded by number of items, by the estimated memory of the
+    items (their weight, in bytes) or both.
+
+    Expiration times are kept in a heap, so expired items are found without
+    scanning the cache: they are removed when they are read, when items are
+    set, and by the background sweeper (see start_cache_sweeper).
+    Thread-safe using a threading Lock, which public methods acquire once and
+    never while calling back into user code.
 
     Attributes:
         max_size (int, optional): Maximum number of items to store in the cache.
         expiration_time (int, optional): Time in seconds after which a cached item expires. Default is 1 hour.
+        max_weight (int, optional): Maximum total weight of the items in the cache.
+        weigher (Callable, optional): Returns the weight of a value, estimate_size by default.
+        on_evict (Callable, optional): Called with the key and value of each item
+            evicted to make room or because it expired, e.g. to close connections.
 
     Example:
 
@@ -29,20 +56,51 @@ class InMemoryCache(BaseCache):
         # getting cache values
         a = cache.get("a")
         b = cache["b"]
+
+        # computing a missing value once, even with concurrent callers
+        d = cache.get_or_set("d", factory=lambda: build_flow(data))
+
+        # bounded by memory, closing what it evicts
+        cache = InMemoryCache(max_weight=100 * 2**20, on_evict=close_resource)
     """
 
-    def __init__(self, max_size=None, expiration_time=60 * 60):
+    def __init__(
+        self,
+        max_size=None,
+        expiration_time=60 * 60,
+        max_weight: Optional[int] = None,
+        weigher: Optional[Callable[[Any], int]] = None,
+        on_evict: Optional[Callable[[Any, Any], None]] = None,
+    ):
         """
         Initialize a new InMemoryCache instance.
 
         Args:
             max_size (int, optional): Maximum number of items to store in the cache.
             expiration_time (int, optional): Time in seconds after which a cached item expires. Default is 1 hour.
+            max_weight (int, optional): Maximum total weight of the items in the cache.
+            weigher (Callable, optional): Returns the weight of a value. Values are
+                only weighed when max_weight or weigher is set.
+            on_evict (Callable, optional): Called with the key and value of each evicted item.
         """
-        self._cache = OrderedDict()
+        self._cache: OrderedDict = OrderedDict()
         self._lock = threading.Lock()
+        # (expiration, sequence, key), entries of replaced items are skipped
+        self._expirations: List[Tuple[float, int, Any]] = []
+        self._sequence = itertools.count()
+        self._pending: Dict[Any, _PendingValue] = {}
         self.max_size = max_size
         self.expiration_time = expiration_time
+        self.max_weight = max_weight
+        self.weigher = weigher or (estimate_size if max_weight else None)
+        self.on_evict = on_evict
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+        self.expirations = 0
+        _caches.add(self)
 
     def get(self, key):
         """
@@ -54,55 +112,85 @@ class InMemoryCache(BaseCache):
         Returns:
             The value associated with the key, or None if the key is not found or the item has expired.
         """
+        evicted: List[Tuple[Any, Any]] = []
         with self._lock:
-            if key in self._cache:
-                item = self._cache.pop(key)
-                if (
-                    self.expiration_time is None
-                    or time.time() - item["time"] < self.expiration_time
-                ):
-                    # Move the key to the end to make it recently used
-                    self._cache[key] = item
-                    return item["value"]
-                else:
-                    self.delete(key)
-            return None
+            item = self._get_item(key, evicted)
+        self._notify_evicted(evicted)
+        return None if item is None else item["value"]
 
     def set(self, key, value):
         """
         Add an item to the cache.
 
-        If the cache is full, the least recently used item is evicted.
+        If the cache is full, the least recently used items are evicted. A value
+        heavier than max_weight on its own is not cached.
 
         Args:
             key: The key of the item.
             value: The value to cache.
         """
+        weight = self.weigher(value) if self.weigher else 0
+        evicted: List[Tuple[Any, Any]] = []
         with self._lock:
-            if key in self._cache:
-                # Remove existing key before re-inserting to update order
-                self.delete(key)
-            elif self.max_size and len(self._cache) >= self.max_size:
-                # Remove least recently used item
-                self._cache.popitem(last=False)
-            self._cache[key] = {"value": value, "time": time.time()}
+            self._set_item(key, value, weight, evicted)
+        self._notify_evicted(evicted)
 
-    def get_or_set(self, key, value):
+    def get_or_set(self, key, value=None, factory: Optional[Callable[[], Any]] = None):
         """
         Retrieve an item from the cache. If the item does not exist, set it with the provided value.
 
+        With a factory, the value is computed only when the item is missing,
+        and concurrent callers asking for the same missing key wait for the
+        first one's result instead of computing it again. If the factory
+        raises, the waiting callers get the same exception.
+
         Args:
             key: The key of the item.
             value: The value to cache if the item doesn't exist.
+            factory (Callable, optional): Computes the value to cache if the item doesn't exist.
 
         Returns:
             The cached value associated with the key.
         """
+        weight = self.weigher(value) if self.weigher and factory is None else 0
+        evicted: List[Tuple[Any, Any]] = []
         with self._lock:
-            if key in self._cache:
-                return self.get(key)
-            self.set(key, value)
+            item = self._get_item(key, evicted)
+            if item is not None:
+                pending = None
+                value = item["value"]
+            elif factory is None:
+                pending = None
+                self._set_item(key, value, weight, evicted)
+            else:
+                pending = self._pending.get(key)
+                owner = pending is None
+                if owner:
+                    pending = self._pending[key] = _PendingValue()
+                else:
+                    # Waiting for the owner's value is not a miss of its own
+                    self.misses -= 1
+                    self.waits += 1
+        self._notify_evicted(evicted)
+        if pending is None:
             return value
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = factory()
+            self.set(key, pending.value)
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.done.set()
+        return pending.value
 
     def delete(self, key):
         """
@@ -111,8 +199,8 @@ class InMemoryCache(BaseCache):
         Args:
             key: The key of the item to remove.
         """
-        # with self._lock:
-        self._cache.pop(key, None)
+        with self._lock:
+            self._pop(key)
 
     def clear(self):
         """
@@ -120,10 +208,150 @@ class InMemoryCache(BaseCache):
         """
         with self._lock:
             self._cache.clear()
+            self._expirations.clear()
+            self.weight = 0
+
+    def sweep(self) -> int:
+        """
+        Remove the expired items.
+
+        Returns:
+            The number of removed items.
+        """
+        evicted: List[Tuple[Any, Any]] = []
+        with self._lock:
+            self._remove_expired(evicted)
+        self._notify_evicted(evicted)
+        return len(evicted)
+
+    def evict(self, key) -> bool:
+        """
+        Remove an item from the cache, returning whether it was cached.
+
+        Unlike delete, on_evict is called for the removed item, so evicting
+        a resource from the admin API closes it.
+        """
+        with self._lock:
+            item = self._pop(key)
+        if item is None:
+            return False
+        self._notify_evicted([(key, item["value"])])
+        return True
+
+    def stats(self) -> CacheStats:
+        """
+        Return the statistics of the cache. The bytes are the total weight
+        if the values are weighed, otherwise they are estimated now.
+        """
+        with self._lock:
+            stats = CacheStats(
+                entries=len(self._cache),
+                bytes=self.weight if self.weigher else None,
+                hits=self.hits,
+                misses=self.misses,
+                waits=self.waits,
+                evictions=self.evictions,
+                expirations=self.expirations,
+                max_entries=self.max_size,
+                max_bytes=self.max_weight,
+            )
+            values = (
+                None if self.weigher else [i["value"] for i in self._cache.values()]
+            )
+        if values is not None:
+            stats.bytes = estimate_size(values)
+        return stats
+
+    def _is_expired(self, item: dict, now: float) -> bool:
+        return item["expires"] is not None and item["expires"] <= now
+
+    def _get_item(self, key, evicted: List[Tuple[Any, Any]]) -> Optional[dict]:
+        """Return an unexpired item, marking it as recently used. Lock held."""
+        item = self._cache.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        if self._is_expired(item, time.monotonic()):
+            evicted.append((key, self._pop(key)["value"]))
+            self.expirations += 1
+            self.misses += 1
+            return None
+        # Move the key to the end to make it recently used
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return item
+
+    def _set_item(
+        self, key, value, weight: int, evicted: List[Tuple[Any, Any]]
+    ) -> None:
+        """Store an item, evicting expired and least recently used items. Lock held."""
+        # Remove existing key before re-inserting to update order
+        self._pop(key)
+        self._remove_expired(evicted)
+        if self.max_weight and weight > self.max_weight:
+            logger.debug(
+                f"Not caching {key}: its weight {weight} exceeds {self.max_weight}"
+            )
+            return
+        while self._cache and (
+            (self.max_size and len(self._cache) >= self.max_size)
+            or (self.max_weight and self.weight + weight > self.max_weight)
+        ):
+            # Remove least recently used item
+            lru_key = next(iter(self._cache))
+            evicted.append((lru_key, self._pop(lru_key)["value"]))
+            self.evictions += 1
+        expires = None
+        if self.expiration_time is not None:
+            expires = time.monotonic() + self.expiration_time
+            heapq.heappush(self._expirations, (expires, next(self._sequence), key))
+            if len(self._expirations) > 2 * len(self._cache) + 64:
+                self._rebuild_expirations()
+        self._cache[key] = {"value": value, "expires": expires, "weight": weight}
+        self.weight += weight
+
+    def _remove_expired(self, evicted: List[Tuple[Any, Any]]) -> None:
+        """Pop the expired items from the head of the heap. Lock held."""
+        now = time.monotonic()
+        while self._expirations and self._expirations[0][0] <= now:
+            expires, _, key = heapq.heappop(self._expirations)
+            item = self._cache.get(key)
+            # Items set again since have a later expiration
+            if item is not None and item["expires"] == expires:
+                evicted.append((key, self._pop(key)["value"]))
+                self.expirations += 1
+
+    def _rebuild_expirations(self) -> None:
+        """Drop the heap entries of replaced and deleted items. Lock held."""
+        self._expirations = [
+            (item["expires"], next(self._sequence), key)
+            for key, item in self._cache.items()
+            if item["expires"] is not None
+        ]
+        heapq.heapify(self._expirations)
+
+    def _pop(self, key) -> Optional[dict]:
+        """Remove an item and its weight. Lock held."""
+        item = self._cache.pop(key, None)
+        if item is not None:
+            self.weight -= item["weight"]
+        return item
+
+    def _notify_evicted(self, evicted: List[Tuple[Any, Any]]) -> None:
+        """Call on_evict for the evicted items, outside of the lock."""
+        if self.on_evict is None:
+            return
+        for key, value in evicted:
+            try:
+                self.on_evict(key, value)
+            except Exception as exc:
+                logger.error(f"Error in the eviction callback of {key}: {exc}")
 
     def __contains__(self, key):
-        """Check if the key is in the cache."""
-        return key in self._cache
+        """Check if the key is in the cache and has not expired."""
+        with self._lock:
+            item = self._cache.get(key)
+            return item is not None and not self._is_expired(item, time.monotonic())
 
     def __getitem__(self, key):
         """Retrieve an item from the cache using the square bracket notation."""
@@ -139,8 +367,75 @@ class InMemoryCache(BaseCache):
 
     def __len__(self):
         """Return the number of items in the cache."""
-        return len(self._cache)
+        with self._lock:
+            return len(self._cache)
 
     def __repr__(self):
         """Return a string representation of the InMemoryCache instance."""
-        return f"InMemoryCache(max_size={self.max_size}, expiration_time={self.expiration_time})"
+        return (
+            f"InMemoryCache(max_size={self.max_size}, "
+            f"expiration_time={self.expiration_time}, max_weight={self.max_weight})"
+        )
+
+
+def close_resource(key: Any, value: Any) -> None:
+    """
+    Eviction callback closing values that hold resources, e.g. SQLAlchemy
+    engines, database connections or vector store clients.
+    """
+    for method_name in ("close", "dispose"):
+        method = getattr(value, method_name, None)
+        if callable(method):
+            logger.debug(f"Closing evicted {type(value).__name__} {key}")
+            method()
+            return
+
+
+# Every live InMemoryCache, swept by the background sweeper
+_caches: "weakref.WeakSet[InMemoryCache]" = weakref.WeakSet()
+_sweeper: Optional[threading.Thread] = None
+_sweeper_stop = threading.Event()
+
+
+def sweep_caches() -> int:
+    """Remove the expired items of every cache, returning how many were removed."""
+    removed = 0
+    for cache in list(_caches):
+        try:
+            removed += cache.sweep()
+        except Exception as exc:
+            logger.error(f"Error sweeping {cache!r}: {exc}")
+    return removed
+
+
+def _run_sweeper(interval: float) -> None:
+    while not _sweeper_stop.wait(interval):
+        if removed := sweep_caches():
+            logger.debug(f"Removed {removed} expired items from the caches")
+
+
+def start_cache_sweeper(interval: Optional[float] = None) -> None:
+    """
+    Start a daemon thread removing the expired items of every InMemoryCache
+    each interval seconds, settings.cache_sweep_interval by default.
+    A falsy interval does not start it.
+    """
+    global _sweeper
+    if interval is None:
+        interval = settings.cache_sweep_interval
+    if not interval or (_sweeper is not None and _sweeper.is_alive()):
+        return
+    _sweeper_stop.clear()
+    _sweeper = threading.Thread(
+        target=_run_sweeper, args=(interval,), name="cache-sweeper", daemon=True
+    )
+    _sweeper.start()
+
+
+def stop_cache_sweeper() -> None:
+    """Stop the background sweeper, if it was started."""
+    global _sweeper
+    _sweeper_stop.set()
+    if _sweeper is not None:
+        _sweeper.join()
+        _sweeper = None
@@ -1,9 +1,19 @@
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Any, Awaitable, Callable, List, Optional
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import pandas as pd
 from PIL import Image
 
+from langflow.cache.base import CacheStats, ObservableCache
+from langflow.cache.registry import cache_registry
+from langflow.cache.utils import estimate_size
+from langflow.settings import settings
+from langflow.utils.logger import logger
+
 
 class Subject:
     """Base class for implementing the observer pattern."""
@@ -49,14 +59,76 @@ class AsyncSubject:
             await observer()
 
 
-class CacheManager(Subject):
-    """Manages cache for different clients and notifies observers on changes."""
+class _ClientCache:
+    """The objects of a client, in the order they were added."""
 
     def __init__(self):
+        self.items: OrderedDict = OrderedDict()
+        self.weights: Dict[str, int] = {}
+        self.weight = 0
+        self.last_access = time.monotonic()
+        # Contexts currently using the client, which is never expired meanwhile
+        self.users = 0
+
+    def pop(self, name: str) -> None:
+        self.items.pop(name, None)
+        self.weight -= self.weights.pop(name, 0)
+
+
+def weigh_object(obj: Any) -> int:
+    """Estimate the bytes used by a cached object, images by their pixels."""
+    if isinstance(obj, Image.Image):
+        return obj.width * obj.height * len(obj.getbands())
+    return estimate_size(obj)
+
+
+class CacheManager(Subject, ObservableCache):
+    """
+    Manages cache for different clients and notifies observers on changes.
+
+    The current client is a context variable, so concurrent websocket
+    sessions (and the tasks and asyncio.to_thread calls they start) each see
+    their own client. The objects of a client are bounded by max_client_bytes,
+    evicting the oldest first, and the clients not used for client_ttl
+    seconds are removed.
+    """
+
+    def __init__(
+        self,
+        max_client_bytes: Optional[int] = None,
+        client_ttl: Optional[float] = None,
+    ):
+        """
+        Initialize a new CacheManager instance.
+
+        Args:
+            max_client_bytes (int, optional): Maximum estimated size of the objects of a client.
+            client_ttl (float, optional): Seconds after which an unused client is removed.
+        """
         super().__init__()
-        self._cache = {}
-        self.current_client_id = None
-        self.current_cache = {}
+        self._cache: Dict[str, _ClientCache] = {}
+        self._lock = threading.RLock()
+        self._client_id: ContextVar[Optional[str]] = ContextVar(
+            f"cache_manager_client_id_{id(self)}", default=None
+        )
+        self.max_client_bytes = max_client_bytes
+        self.client_ttl = client_ttl
+        self._next_cleanup = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def current_client_id(self) -> Optional[str]:
+        """The client of the current context."""
+        return self._client_id.get()
+
+    @property
+    def current_cache(self) -> Dict[str, Any]:
+        """The objects of the current client."""
+        client = self._cache.get(self.current_client_id)  # type: ignore
+        return client.items if client is not None else {}
 
     @contextmanager
     def set_client_id(self, client_id: str):
@@ -66,14 +138,48 @@ class CacheManager(Subject):
         Args:
             client_id (str): The client identifier.
         """
-        previous_client_id = self.current_client_id
-        self.current_client_id = client_id
-        self.current_cache = self._cache.setdefault(client_id, {})
+        self.cleanup(force=False)
+        with self._lock:
+            client = self._cache.setdefault(client_id, _ClientCache())
+            client.users += 1
+            client.last_access = time.monotonic()
+        token = self._client_id.set(client_id)
         try:
             yield
         finally:
-            self.current_client_id = previous_client_id
-            self.current_cache = self._cache.get(self.current_client_id, {})
+            self._client_id.reset(token)
+            with self._lock:
+                client.users -= 1
+                client.last_access = time.monotonic()
+
+    def cleanup(self, force: bool = True) -> int:
+        """
+        Remove the clients that have not been used for client_ttl seconds.
+
+        Args:
+            force (bool): Clean up now, otherwise at most every client_ttl / 10 seconds.
+
+        Returns:
+            The number of removed clients.
+        """
+        if not self.client_ttl:
+            return 0
+        now = time.monotonic()
+        if not force and now < self._next_cleanup:
+            return 0
+        self._next_cleanup = now + self.client_ttl / 10
+        deadline = now - self.client_ttl
+        with self._lock:
+            expired = [
+                client_id
+                for client_id, client in self._cache.items()
+                if client.users == 0 and client.last_access <= deadline
+            ]
+            for client_id in expired:
+                self.expirations += len(self._cache.pop(client_id).items)
+        if expired:
+            logger.debug(f"Removed the cached objects of {len(expired)} clients")
+        return len(expired)
 
     def add(self, name: str, obj: Any, obj_type: str, extension: Optional[str] = None):
         """
@@ -92,11 +198,31 @@ class CacheManager(Subject):
             _extension = object_extensions[obj_type]
         else:
             _extension = type(obj).__name__.lower()
-        self.current_cache[name] = {
-            "obj": obj,
-            "type": obj_type,
-            "extension": extension or _extension,
-        }
+        client_id = self.current_client_id
+        if client_id is None:
+            logger.warning(f"Not caching {name}: no client is set")
+            return
+        weight = weigh_object(obj) if self.max_client_bytes else 0
+        with self._lock:
+            client = self._cache.setdefault(client_id, _ClientCache())
+            client.pop(name)
+            # The new object is kept even if it exceeds the quota on its own,
+            # the observers are about to send it to the client
+            while (
+                self.max_client_bytes
+                and client.items
+                and client.weight + weight > self.max_client_bytes
+            ):
+                client.pop(next(iter(client.items)))
+                self.evictions += 1
+            client.items[name] = {
+                "obj": obj,
+                "type": obj_type,
+                "extension": extension or _extension,
+            }
+            client.weights[name] = weight
+            client.weight += weight
+            client.last_access = time.monotonic()
         self.notify()
 
     def add_pandas(self, name: str, obj: Any):
@@ -108,7 +234,8 @@ class CacheManager(Subject):
             obj (Any): The pandas DataFrame or Series object.
         """
         if isinstance(obj, (pd.DataFrame, pd.Series)):
-            self.add(name, obj.to_csv(), "pandas", extension="csv")
+            # Serialized when it is sent, see langflow.cache.files
+            self.add(name, obj, "pandas", extension="csv")
         else:
             raise ValueError("Object is not a pandas DataFrame or Series")
 
@@ -135,7 +262,14 @@ class CacheManager(Subject):
         Returns:
             The cached object associated with the given cache key.
         """
-        return self.current_cache[name]
+        with self._lock:
+            try:
+                value = self.current_cache[name]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.hits += 1
+        return value
 
     def get_last(self):
         """
@@ -144,7 +278,44 @@ class CacheManager(Subject):
         Returns:
             The last added item in the cache.
         """
-        return list(self.current_cache.values())[-1]
+        with self._lock:
+            return next(reversed(self.current_cache.values()))
+
+    def evict(self, client_id: str) -> bool:
+        """Remove the objects of a client, returning whether it had any."""
+        with self._lock:
+            client = self._cache.pop(client_id, None)
+        return client is not None and bool(client.items)
+
+    def clear(self):
+        """Remove the objects of every client."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        """Return the number and estimated size of the objects of every client."""
+        with self._lock:
+            clients = list(self._cache.values())
+            stats = CacheStats(
+                entries=sum(len(client.items) for client in clients),
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                expirations=self.expirations,
+            )
+            objects = [
+                item["obj"] for client in clients for item in client.items.values()
+            ]
+        stats.bytes = (
+            sum(client.weight for client in clients)
+            if self.max_client_bytes
+            else sum(weigh_object(obj) for obj in objects)
+        )
+        return stats
 
 
-cache_manager = CacheManager()
+cache_manager = CacheManager(
+    max_client_bytes=settings.client_cache_max_memory or None,
+    client_ttl=settings.client_cache_expiration_time or None,
+)
+cache_registry.register("client_objects", cache_manager)
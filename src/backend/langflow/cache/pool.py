@@ -0,0 +1,189 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langflow.cache.base import CacheStats, ObservableCache
+from langflow.cache.registry import cache_registry
+from langflow.cache.utils import estimate_size
+from langflow.settings import settings
+from langflow.utils.logger import logger
+
+
+class ResourcePool(ObservableCache):
+    """
+    A process-wide pool of heavyweight objects, like LLM clients and
+    embeddings, shared by every vertex that builds them with the same params.
+
+    Each acquisition adds a reference to the pooled object and must be
+    matched by a release. Objects without references are evicted once they
+    have been idle for longer than idle_time.
+
+    Example:
+
+        pool = ResourcePool(idle_time=600)
+        key = pool.compute_key("llms.OpenAI", {"temperature": 0.7})
+
+        llm = pool.acquire(key)
+        if llm is None:
+            llm = pool.add(key, OpenAI(temperature=0.7))
+        ...
+        pool.release(key)
+    """
+
+    def __init__(self, idle_time: Optional[float] = 10 * 60):
+        """
+        Initialize a new ResourcePool instance.
+
+        Args:
+            idle_time (float, optional): Time in seconds an object without
+                references is kept. None keeps them until they are cleared.
+        """
+        self._resources: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.idle_time = idle_time
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    @staticmethod
+    def compute_key(name: str, params: Dict[str, Any]) -> Optional[str]:
+        """
+        Compute the key of an object from its class name and params.
+
+        Unset (None) params are ignored and sets are sorted, so equivalent
+        configurations get the same key.
+
+        Returns:
+            The key, or None if the params are not JSON serializable (e.g.
+            they contain built objects) and the object cannot be pooled.
+        """
+        normalized = {
+            key: sorted(value) if isinstance(value, (set, frozenset)) else value
+            for key, value in params.items()
+            if value is not None
+        }
+        try:
+            serialized = json.dumps([name, normalized], sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def acquire(self, key: str) -> Any:
+        """
+        Add a reference to a pooled object.
+
+        Returns:
+            The object, or None if there is none for the key.
+        """
+        with self._lock:
+            self._evict_idle()
+            resource = self._resources.get(key)
+            if resource is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            resource["refs"] += 1
+            return resource["value"]
+
+    def add(self, key: str, value: Any) -> Any:
+        """
+        Pool a newly built object with one reference.
+
+        If another caller pooled an object for the same key in the meantime,
+        a reference to that one is added and it is returned instead.
+        """
+        with self._lock:
+            resource = self._resources.setdefault(
+                key, {"value": value, "refs": 0, "released": None}
+            )
+            resource["refs"] += 1
+            return resource["value"]
+
+    def release(self, key: str) -> None:
+        """Remove a reference to a pooled object."""
+        with self._lock:
+            resource = self._resources.get(key)
+            if resource is None or resource["refs"] == 0:
+                return
+            resource["refs"] -= 1
+            if resource["refs"] == 0:
+                resource["released"] = time.time()
+            self._evict_idle()
+
+    def refs(self, key: str) -> int:
+        """Return the number of references to a pooled object."""
+        with self._lock:
+            resource = self._resources.get(key)
+            return resource["refs"] if resource else 0
+
+    def evict_idle(self) -> int:
+        """
+        Evict the objects that have been idle for longer than idle_time.
+
+        Returns:
+            The number of evicted objects.
+        """
+        with self._lock:
+            return self._evict_idle()
+
+    def _evict_idle(self) -> int:
+        if self.idle_time is None:
+            return 0
+        deadline = time.time() - self.idle_time
+        idle = [
+            key
+            for key, resource in self._resources.items()
+            if resource["refs"] == 0 and resource["released"] <= deadline
+        ]
+        for key in idle:
+            del self._resources[key]
+        self.expirations += len(idle)
+        if idle:
+            logger.debug(f"Evicted {len(idle)} idle objects from the resource pool")
+        return len(idle)
+
+    def evict(self, key: str) -> bool:
+        """
+        Remove an object from the pool. The vertices holding it keep using
+        it, and their releases are ignored.
+        """
+        with self._lock:
+            return self._resources.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Remove every object from the pool."""
+        with self._lock:
+            self._resources.clear()
+
+    def stats(self) -> CacheStats:
+        """Return the statistics of the pool, idle evictions are expirations."""
+        with self._lock:
+            stats = CacheStats(
+                entries=len(self._resources),
+                hits=self.hits,
+                misses=self.misses,
+                expirations=self.expirations,
+            )
+            values = [resource["value"] for resource in self._resources.values()]
+        stats.bytes = estimate_size(values)
+        return stats
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._resources
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._resources)
+
+
+# LLMs, chat models and embeddings shared by the vertices that build them
+# with the same params. A falsy resource_pool_idle_time disables it.
+resource_pool = ResourcePool(idle_time=settings.resource_pool_idle_time or None)
+cache_registry.register("resources", resource_pool)
+
+
+def resource_pool_enabled() -> bool:
+    return bool(settings.resource_pool_idle_time)
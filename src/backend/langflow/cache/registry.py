@@ -0,0 +1,158 @@
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from cachetools import Cache, LRUCache
+from langchain.cache import BaseCache as LangChainBaseCache
+
+from langflow.cache.base import CacheStats, ObservableCache
+from langflow.cache.utils import estimate_size
+
+
+class CacheRegistry:
+    """
+    The caches reported by the /api/v1/cache endpoints, by name.
+
+    Example:
+
+        vertex_cache = cache_registry.register("vertices", InMemoryCache())
+        stats = cache_registry.get("vertices").stats()
+    """
+
+    def __init__(self):
+        self._caches: Dict[str, ObservableCache] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, cache: ObservableCache) -> ObservableCache:
+        """Register a cache under a name, replacing any previous one."""
+        with self._lock:
+            self._caches[name] = cache
+        return cache
+
+    def get(self, name: str) -> Optional[ObservableCache]:
+        with self._lock:
+            return self._caches.get(name)
+
+    def stats(self) -> Dict[str, CacheStats]:
+        """Return the statistics of every registered cache."""
+        return {name: cache.stats() for name, cache in self}
+
+    def __iter__(self) -> Iterator[Tuple[str, ObservableCache]]:
+        with self._lock:
+            return iter(sorted(self._caches.items()))
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._caches
+
+
+cache_registry = CacheRegistry()
+
+
+class ObservableLRUCache(LRUCache, ObservableCache):
+    """A cachetools LRUCache counting its hits, misses and evictions."""
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._evicting = False
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.hits += 1
+        return value
+
+    def __missing__(self, key):
+        self.misses += 1
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        self.misses += 1
+        return default
+
+    def __setitem__(self, key, value):
+        # LRUCache.__setitem__ calls popitem to make room
+        self._evicting = True
+        try:
+            super().__setitem__(key, value)
+        finally:
+            self._evicting = False
+
+    def pop(self, key, *args):
+        # Cache.pop reads the item through __getitem__, which is not a hit
+        hits = self.hits
+        try:
+            return super().pop(key, *args)
+        finally:
+            self.hits = hits
+
+    def popitem(self):
+        item = super().popitem()
+        if self._evicting:
+            self.evictions += 1
+        return item
+
+    def evict(self, key) -> bool:
+        if key not in self:
+            return False
+        del self[key]
+        return True
+
+    def stats(self) -> CacheStats:
+        # Reading the items through __getitem__ would count hits and reorder them
+        values = [Cache.__getitem__(self, key) for key in list(self)]
+        return CacheStats(
+            entries=len(values),
+            bytes=estimate_size(values),
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            max_entries=self.maxsize,
+        )
+
+
+class ObservableLLMCache(LangChainBaseCache, ObservableCache):
+    """
+    Wraps the cache set as langchain.llm_cache to count its hits and misses.
+    Its items are keyed by prompt and LLM, so they cannot be evicted by key.
+    """
+
+    def __init__(self, cache: LangChainBaseCache):
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, prompt: str, llm_string: str) -> Any:
+        result = self.cache.lookup(prompt, llm_string)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def update(self, prompt: str, llm_string: str, return_val: Any) -> None:
+        self.cache.update(prompt, llm_string, return_val)
+
+    def evict(self, key) -> bool:
+        return False
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear(**kwargs)
+
+    def stats(self) -> CacheStats:
+        stats = CacheStats(hits=self.hits, misses=self.misses)
+        if isinstance(getattr(self.cache, "_cache", None), dict):
+            # langchain.cache.InMemoryCache
+            values = list(self.cache._cache.values())  # type: ignore
+            stats.entries = len(values)
+            stats.bytes = estimate_size(values)
+        elif hasattr(self.cache, "engine") and hasattr(self.cache, "cache_schema"):
+            # langchain.cache.SQLAlchemyCache and SQLiteCache
+            from sqlalchemy.orm import Session
+
+            with Session(self.cache.engine) as session:  # type: ignore
+                stats.entries = session.query(self.cache.cache_schema).count()  # type: ignore
+        return stats
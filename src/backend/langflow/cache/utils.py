@@ -1,15 +1,27 @@
+import asyncio
 import base64
 import contextlib
 import functools
 import hashlib
-import json
+import inspect
 import os
+import sys
 import tempfile
+import threading
+import time
+import types
 from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from appdirs import user_cache_dir
 
+from langflow.cache.base import CacheStats, ObservableCache
+from langflow.cache.fingerprint import (
+    UI_FLOW_KEYS,
+    UI_NODE_KEYS,
+    compute_flow_fingerprint,
+)
+
 CACHE: Dict[str, Any] = {}
 
 CACHE_DIR = user_cache_dir("langflow", "langflow")
@@ -28,33 +40,268 @@ def create_cache_folder(func):
     return wrapper
 
 
-def memoize_dict(maxsize=128):
-    cache = OrderedDict()
+_MISSING = object()
+
+
+class _Flight:
+    """A call computing a memoized result, shared with concurrent callers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class MemoizedResults(ObservableCache):
+    """
+    The results cached by a function decorated with memoize_dict, keyed by
+    (function name, fingerprint of the dict, keyword arguments).
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self._results: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.flights: Dict[Any, Any] = {}
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, key):
+        """Return the cached result or _MISSING, the lock must be held."""
+        entry = self._results.get(key)
+        if entry is None:
+            return _MISSING
+        expires, result = entry
+        if expires is not None and expires <= time.monotonic():
+            del self._results[key]
+            self.expirations += 1
+            return _MISSING
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def store(self, key, result):
+        """Cache a result, evicting the least recently used ones. Lock held."""
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        self._results[key] = (expires, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def evict(self, key) -> bool:
+        """Remove the results computed for the dict with the given fingerprint."""
+        with self.lock:
+            keys = [k for k in self._results if k[1] == key]
+            for k in keys:
+                del self._results[k]
+        return bool(keys)
+
+    def clear(self):
+        with self.lock:
+            self._results.clear()
+
+    def stats(self) -> CacheStats:
+        with self.lock:
+            stats = CacheStats(
+                entries=len(self._results),
+                hits=self.hits,
+                misses=self.misses,
+                waits=self.waits,
+                evictions=self.evictions,
+                expirations=self.expirations,
+                max_entries=self.maxsize,
+            )
+            results = [result for _, result in self._results.values()]
+        stats.bytes = estimate_size(results)
+        return stats
+
+    def __len__(self):
+        return len(self._results)
+
+
+def memoize_dict(maxsize=128, ttl: Optional[float] = None):
+    """
+    Memoize a function whose first argument is a dict, e.g. the data of a flow.
+
+    The results of the maxsize most recently used arguments are kept, for at
+    most ttl seconds if given. The cache is safe to use from threads and
+    coroutines, and concurrent calls with the same missing arguments wait for
+    the first one to finish instead of computing the result again.
+
+    Callers that already know the fingerprint of the dict (see
+    compute_flow_fingerprint) can pass it as the fingerprint keyword
+    argument to skip hashing it.
+
+    The decorated function exposes cache (a MemoizedResults), clear_cache()
+    and stats().
+    """
+    cache = MemoizedResults(maxsize, ttl)
+    lock = cache.lock
+    flights = cache.flights
+
+    def make_key(func, args, kwargs):
+        hashed = kwargs.pop("fingerprint", None) or compute_dict_hash(args[0])
+        return (func.__name__, hashed, frozenset(kwargs.items()))
 
     def decorator(func):
         @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            hashed = compute_dict_hash(args[0])
-            key = (func.__name__, hashed, frozenset(kwargs.items()))
-            if key not in cache:
-                result = func(*args, **kwargs)
-                cache[key] = result
-                if len(cache) > maxsize:
-                    cache.popitem(last=False)
-            else:
-                result = cache[key]
-            return result
+        def sync_wrapper(*args, **kwargs):
+            key = make_key(func, args, kwargs)
+            with lock:
+                result = cache.lookup(key)
+                if result is not _MISSING:
+                    return result
+                flight = flights.get(key)
+                owner = flight is None
+                if owner:
+                    flight = flights[key] = _Flight()
+                    cache.misses += 1
+                else:
+                    cache.waits += 1
+            if not owner:
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+
+            try:
+                flight.result = func(*args, **kwargs)
+                with lock:
+                    cache.store(key, flight.result)
+            except BaseException as exc:
+                flight.error = exc
+                raise
+            finally:
+                with lock:
+                    flights.pop(key, None)
+                flight.done.set()
+            return flight.result
 
-        def clear_cache():
-            cache.clear()
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            key = make_key(func, args, kwargs)
+            loop = asyncio.get_running_loop()
+            while True:
+                with lock:
+                    result = cache.lookup(key)
+                    if result is not _MISSING:
+                        return result
+                    flight = flights.get(key)
+                    # Futures cannot be awaited from other event loops
+                    owner = flight is None or flight.get_loop() is not loop
+                    if owner:
+                        flight = loop.create_future()
+                        flights.setdefault(key, flight)
+                        cache.misses += 1
+                    else:
+                        cache.waits += 1
+                if owner:
+                    break
+                try:
+                    return await asyncio.shield(flight)
+                except asyncio.CancelledError:
+                    # The first call was cancelled, try computing it again
+                    if not flight.cancelled():
+                        raise
+
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                flight.cancel()
+                raise
+            except BaseException as exc:
+                flight.set_exception(exc)
+                # Waiters are optional, don't log the exception as unretrieved
+                flight.exception()
+                raise
+            else:
+                with lock:
+                    cache.store(key, result)
+                flight.set_result(result)
+                return result
+            finally:
+                with lock:
+                    if flights.get(key) is flight:
+                        del flights[key]
+
+        wrapper: Any = (
+            async_wrapper if inspect.iscoroutinefunction(func) else sync_wrapper
+        )
 
-        wrapper.clear_cache = clear_cache  # type: ignore
+        wrapper.clear_cache = cache.clear  # type: ignore
         wrapper.cache = cache  # type: ignore
+        wrapper.stats = cache.stats  # type: ignore
         return wrapper
 
     return decorator
 
 
+# Objects that are shared rather than owned by the value being measured
+_UNSIZED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+)
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def estimate_size(obj: Any, max_objects: int = 10_000) -> int:
+    """
+    Estimate the memory used by an object and the objects it references, in bytes.
+
+    Containers, instance attributes and slots are followed and each object is
+    counted once. Buffers are counted by their nbytes (e.g. numpy arrays) and
+    FAISS indexes by their number of vectors. After max_objects objects the
+    remaining references are not followed, so the estimate of large object
+    graphs stays cheap but is a lower bound.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _UNSIZED_TYPES):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current, 0)
+        if isinstance(current, _ATOMIC_TYPES):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+            continue
+        if isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+            continue
+        try:
+            nbytes = getattr(current, "nbytes", None)
+            ntotal = getattr(current, "ntotal", None)
+            dimension = getattr(current, "d", None)
+        except Exception:
+            continue
+        if isinstance(nbytes, int):
+            size += nbytes
+            continue
+        if isinstance(ntotal, int) and isinstance(dimension, int):
+            # FAISS indexes store float32 vectors outside of Python objects
+            size += ntotal * dimension * 4
+        attributes = getattr(current, "__dict__", None)
+        if isinstance(attributes, dict):
+            stack.append(attributes)
+        for cls in type(current).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if isinstance(slot, str) and hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return size
+
+
 PREFIX = "langflow_cache"
 
 
@@ -74,32 +321,21 @@ def clear_old_cache_files(max_cache_size: int = 3):
 
 
 def compute_dict_hash(graph_data):
-    graph_data = filter_json(graph_data)
-
-    cleaned_graph_json = json.dumps(graph_data, sort_keys=True)
-    return hashlib.sha256(cleaned_graph_json.encode("utf-8")).hexdigest()
+    return compute_flow_fingerprint(graph_data)
 
 
 def filter_json(json_data):
-    filtered_data = json_data.copy()
-
-    # Remove 'viewport' and 'chatHistory' keys
-    if "viewport" in filtered_data:
-        del filtered_data["viewport"]
-    if "chatHistory" in filtered_data:
-        del filtered_data["chatHistory"]
+    """Return a copy of the data of a flow without the keys only the frontend uses."""
+    filtered_data = {
+        key: value for key, value in json_data.items() if key not in UI_FLOW_KEYS
+    }
 
     # Filter nodes
     if "nodes" in filtered_data:
-        for node in filtered_data["nodes"]:
-            if "position" in node:
-                del node["position"]
-            if "positionAbsolute" in node:
-                del node["positionAbsolute"]
-            if "selected" in node:
-                del node["selected"]
-            if "dragging" in node:
-                del node["dragging"]
+        filtered_data["nodes"] = [
+            {key: value for key, value in node.items() if key not in UI_NODE_KEYS}
+            for node in filtered_data["nodes"]
+        ]
 
     return filtered_data
 
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+from langflow.cache.disk import DiskCache
+from langflow.cache.flow import InMemoryCache
+from langflow.cache.registry import cache_registry
+from langflow.cache.utils import CACHE_DIR
+from langflow.settings import settings
+
+
+def compute_build_key(
+    vertex_type: str, fingerprint: str, dependency_keys: List[str]
+) -> str:
+    """
+    Compute the content-addressed key of a vertex build.
+
+    Args:
+        vertex_type: The type of the vertex.
+        fingerprint: The fingerprint of the vertex template values.
+        dependency_keys: The build keys of the vertices it depends on.
+
+    Returns:
+        The hex digest identifying the build.
+    """
+    serialized = json.dumps([vertex_type, fingerprint, dependency_keys])
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+# Built objects shared by identical vertices across flows and flow versions.
+# A falsy vertex_cache_size disables it.
+vertex_cache = InMemoryCache(
+    max_size=settings.vertex_cache_size or None,
+    expiration_time=settings.vertex_cache_expiration_time or None,
+)
+cache_registry.register("vertices", vertex_cache)
+
+
+def vertex_cache_enabled() -> bool:
+    return bool(settings.vertex_cache_size)
+
+
+# Part of the artifact keys, bumped to invalidate the artifacts stored by
+# previous versions, e.g. agent prompts stored under keys missing their tools
+ARTIFACT_KEY_VERSION = 2
+
+
+def compute_artifact_key(build_key: str, params: Dict[str, Any]) -> str:
+    """
+    Compute the key of a vertex build in the artifact cache.
+
+    Unlike the in-memory cache, artifacts outlive file changes, so the size
+    and modification time of the files the params point to are part of the key.
+    """
+    files = []
+    for key, value in sorted(params.items()):
+        if isinstance(value, str) and os.path.isfile(value):
+            stat = os.stat(value)
+            files.append([key, stat.st_size, stat.st_mtime_ns])
+    serialized = json.dumps([ARTIFACT_KEY_VERSION, build_key, files])
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+# Picklable builds (documents, chunks, prompts, FAISS indexes) kept on disk
+# so restarted workers do not run loaders and embeddings again. A falsy
+# artifact_cache_size disables it.
+artifact_cache = DiskCache(
+    Path(settings.artifact_cache_dir or CACHE_DIR) / "artifacts",
+    max_size=settings.artifact_cache_size or None,
+)
+cache_registry.register("artifacts", artifact_cache)
+
+
+def artifact_cache_enabled(vertex_type: str, base_type: str) -> bool:
+    artifact_types = settings.artifact_cache_types or []
+    return bool(artifact_cache.max_size) and (
+        vertex_type in artifact_types or base_type in artifact_types
+    )
@@ -1,29 +1,45 @@
 from collections import defaultdict
 from fastapi import WebSocket, status
-from langflow.api.v1.schemas import ChatMessage, ChatResponse, FileResponse
+from langflow.api.v1.schemas import (
+    ChatMessage,
+    ChatResponse,
+    FileDelivery,
+    FileResponse,
+)
 from langflow.cache import cache_manager
+from langflow.cache.files import (
+    ChatFile,
+    get_file,
+    keep_until_downloaded,
+    store_file,
+)
 from langflow.cache.manager import Subject
 from langflow.chat.utils import process_graph
-from langflow.interface.utils import pil_to_base64
 from langflow.utils.logger import logger
 
 
 import asyncio
+import base64
 import json
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from langflow.cache.flow import InMemoryCache
+from langflow.settings import settings
 
 
 class ChatHistory(Subject):
     def __init__(self):
         super().__init__()
         self.history: Dict[str, List[ChatMessage]] = defaultdict(list)
+        # When each history was last used, see remove_unused
+        self.last_access: Dict[str, float] = {}
 
     def add_message(self, client_id: str, message: ChatMessage):
         """Add a message to the chat history."""
 
         self.history[client_id].append(message)
+        self.last_access[client_id] = time.monotonic()
 
         if not isinstance(message, FileResponse):
             self.notify()
@@ -41,14 +57,40 @@ class ChatHistory(Subject):
         """Empty the chat history for a client."""
         self.history[client_id] = []
 
+    def remove_unused(self, ttl: float, keep: Iterable[str] = ()) -> int:
+        """
+        Remove the histories not used for ttl seconds, except those of the
+        clients in keep.
+
+        Returns:
+            The number of removed histories.
+        """
+        deadline = time.monotonic() - ttl
+        keep = set(keep)
+        expired = [
+            client_id
+            for client_id, last_access in self.last_access.items()
+            if last_access <= deadline and client_id not in keep
+        ]
+        for client_id in expired:
+            self.history.pop(client_id, None)
+            del self.last_access[client_id]
+        return len(expired)
+
 
 class ChatManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        # How each client receives files, and in which format tables
+        self.file_options: Dict[str, Tuple[FileDelivery, str]] = {}
         self.chat_history = ChatHistory()
         self.cache_manager = cache_manager
         self.cache_manager.attach(self.update)
-        self.in_memory_cache = InMemoryCache()
+        # Nothing is closed on eviction: the built flows are shared with the
+        # vertex cache, the resource pool and the graphs kept for rebuilds
+        self.in_memory_cache = InMemoryCache(
+            max_weight=settings.chat_cache_max_memory or None,
+        )
 
     def on_chat_history_update(self):
         """Send the last chat message to the client."""
@@ -58,14 +100,6 @@ class ChatManager:
                 client_id, filter_messages=False
             )[-1]
             if chat_response.is_bot:
-                # Process FileResponse
-                if isinstance(chat_response, FileResponse):
-                    # If data_type is pandas, convert to csv
-                    if chat_response.data_type == "pandas":
-                        chat_response.data = chat_response.data.to_csv()
-                    elif chat_response.data_type == "image":
-                        # Base64 encode the image
-                        chat_response.data = pil_to_base64(chat_response.data)
                 # get event loop
                 loop = asyncio.get_event_loop()
 
@@ -86,13 +120,63 @@ class ChatManager:
             self.chat_history.add_message(
                 self.cache_manager.current_client_id, chat_response
             )
+            # The objects the quota evicted are not kept alive by the history
+            self.release_files(
+                self.cache_manager.current_client_id,
+                held=[
+                    item["obj"]
+                    for item in list(self.cache_manager.current_cache.values())
+                ],
+            )
 
     async def connect(self, client_id: str, websocket: WebSocket):
+        self.cleanup(force=False)
         await websocket.accept()
         self.active_connections[client_id] = websocket
 
     def disconnect(self, client_id: str):
+        # The chat history is kept for a client reconnecting within the client
+        # TTL (see cleanup), its objects are not
+        self.cache_manager.evict(client_id)
+        self.release_files(client_id)
         self.active_connections.pop(client_id, None)
+        self.file_options.pop(client_id, None)
+        if client_id in self.chat_history.last_access:
+            self.chat_history.last_access[client_id] = time.monotonic()
+
+    def cleanup(self, force: bool = True) -> int:
+        """
+        Remove the cached objects and the chat histories of the clients not
+        used for the client TTL of the cache manager. The histories of the
+        connected clients are kept.
+
+        Returns:
+            The number of removed histories.
+        """
+        self.cache_manager.cleanup(force=force)
+        if not self.cache_manager.client_ttl:
+            return 0
+        return self.chat_history.remove_unused(
+            self.cache_manager.client_ttl, keep=self.active_connections
+        )
+
+    def release_files(self, client_id: str, held: Iterable[Any] = ()):
+        """
+        Drop the objects of the file responses in a client's history, except
+        those in held. Their serialized files stay in file_store, which is
+        bounded by settings.chat_files_max_memory, so the history can still be
+        sent until they are evicted from it.
+        """
+        _, table_format = self.file_options.get(client_id, (FileDelivery.INLINE, "csv"))
+        held_ids = {id(obj) for obj in held}
+        for message in self.chat_history.history.get(client_id, []):
+            if (
+                isinstance(message, FileResponse)
+                and message.data is not None
+                and id(message.data) not in held_ids
+            ):
+                self.get_chat_file(message, table_format)
+                message.data = None
 
     async def send_message(self, client_id: str, message: str):
         websocket = self.active_connections[client_id]
@@ -100,7 +184,74 @@ class ChatManager:
 
     async def send_json(self, client_id: str, message: ChatMessage):
         websocket = self.active_connections[client_id]
-        await websocket.send_json(message.dict())
+        payload, frames = self.message_payload(client_id, message)
+        await websocket.send_json(payload)
+        for frame in frames:
+            await websocket.send_bytes(frame)
+
+    def get_chat_file(
+        self, file_response: FileResponse, table_format: str
+    ) -> Optional[ChatFile]:
+        """
+        Serialize the data of a file response, once per table format.
+
+        Returns None if the data was released and its file is no longer stored.
+        """
+        file_id = file_response._file_ids.get(table_format)
+        chat_file = get_file(file_id) if file_id else None
+        if chat_file is None:
+            if file_response.data is None:
+                return None
+            chat_file = store_file(file_response.data, table_format)
+            file_response._file_ids[table_format] = chat_file.id
+        return chat_file
+
+    def file_payload(
+        self, client_id: str, file_response: FileResponse
+    ) -> Tuple[dict, Optional[bytes]]:
+        """Return the JSON of a file response for a client, and its binary frame if any."""
+        delivery, table_format = self.file_options.get(
+            client_id, (FileDelivery.INLINE, "csv")
+        )
+        chat_file = self.get_chat_file(file_response, table_format)
+        payload = file_response.dict(exclude={"data"})
+        if chat_file is None:
+            logger.debug(f"The file of {client_id} is no longer available")
+            payload["data"] = None
+            return payload, None
+        payload.update(data=None, file_id=chat_file.id, media_type=chat_file.media_type)
+        if delivery == FileDelivery.INLINE:
+            if chat_file.media_type.startswith("text/"):
+                payload["data"] = chat_file.data.decode("utf-8")
+            else:
+                payload["data"] = base64.b64encode(chat_file.data).decode("ascii")
+        elif delivery == FileDelivery.URL:
+            # The url must not 404 if file_store evicts the file before the
+            # client downloads it
+            keep_until_downloaded(chat_file)
+            payload["url"] = chat_file.url
+        else:
+            return payload, chat_file.data
+        return payload, None
+
+    def message_payload(
+        self, client_id: str, message: ChatMessage
+    ) -> Tuple[dict, List[bytes]]:
+        """Return the JSON of a message for a client, and the binary frames following it."""
+        if isinstance(message, FileResponse):
+            payload, frame = self.file_payload(client_id, message)
+            return payload, [frame] if frame is not None else []
+        payload = message.dict(exclude={"files"})
+        frames = []
+        if isinstance(message, ChatResponse):
+            payload["files"] = []
+            for file in message.files:
+                if isinstance(file, FileResponse):
+                    file, frame = self.file_payload(client_id, file)
+                    if frame is not None:
+                        frames.append(frame)
+                payload["files"].append(file)
+        return payload, frames
 
     async def close_connection(self, client_id: str, code: int, reason: str):
         if websocket := self.active_connections[client_id]:
@@ -138,18 +289,12 @@ class ChatManager:
         intermediate_steps = intermediate_steps or ""
         history = self.chat_history.get_history(client_id, filter_messages=False)
         file_responses = []
-        if history:
-            # Iterate backwards through the history
-            for msg in reversed(history):
-                if isinstance(msg, FileResponse):
-                    if msg.data_type == "image":
-                        # Base64 encode the image
-                        if isinstance(msg.data, str):
-                            continue
-                        msg.data = pil_to_base64(msg.data)
-                    file_responses.append(msg)
-                if msg.type == "start":
-                    break
+        # Iterate backwards through the files added since the client's message
+        for msg in reversed(history):
+            if not msg.is_bot:
+                break
+            if isinstance(msg, FileResponse):
+                file_responses.append(msg)
 
         response = ChatResponse(
             message=result,
@@ -163,19 +308,32 @@ class ChatManager:
     def set_cache(self, client_id: str, langchain_object: Any) -> bool:
         """
         Set the cache for a client.
+
+        Returns False if the object was not cached, e.g. because it is heavier
+        than settings.chat_cache_max_memory on its own.
         """
 
         self.in_memory_cache.set(client_id, langchain_object)
         return client_id in self.in_memory_cache
 
-    async def handle_websocket(self, client_id: str, websocket: WebSocket):
+    async def handle_websocket(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        files: FileDelivery = FileDelivery.INLINE,
+        table_format: str = "csv",
+    ):
         await self.connect(client_id, websocket)
+        self.file_options[client_id] = (files, table_format)
 
         try:
             chat_history = self.chat_history.get_history(client_id)
             # iterate and make BaseModel into dict
-            chat_history = [chat.dict() for chat in chat_history]
-            await websocket.send_json(chat_history)
+            payloads = [self.message_payload(client_id, chat) for chat in chat_history]
+            await websocket.send_json([payload for payload, _ in payloads])
+            for _, frames in payloads:
+                for frame in frames:
+                    await websocket.send_bytes(frame)
 
             while True:
                 json_payload = await websocket.receive_json()
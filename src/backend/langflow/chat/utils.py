@@ -1,3 +1,6 @@
+import asyncio
+from typing import Any, Awaitable
+
 from fastapi import WebSocket
 from langflow.api.v1.schemas import ChatMessage
 from langflow.processing.base import get_result_and_steps
@@ -31,3 +34,29 @@ async def process_graph(
         # Log stack trace
         logger.exception(e)
         raise e
+
+
+class BuildCancelledError(Exception):
+    """Raised when a build is cancelled through the cancel endpoint."""
+
+
+async def run_until_cancelled(awaitable: Awaitable, cancel_event: asyncio.Event) -> Any:
+    """
+    Awaits the awaitable, cancelling it as soon as the cancel event is set.
+
+    The awaitable is also cancelled when the caller is, e.g. when the client
+    of a streaming response disconnects.
+    """
+    task = asyncio.ensure_future(awaitable)
+    waiter = asyncio.ensure_future(cancel_event.wait())
+    try:
+        await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        waiter.cancel()
+    if not task.done():
+        task.cancel()
+        raise BuildCancelledError("Build cancelled")
+    return task.result()
@@ -8,6 +8,7 @@ from typing import Dict, Optional
 
 # if TYPE_CHECKING:
 from langflow.database.models.flow_style import FlowStyle, FlowStyleRead
+from langflow.database.models.flow_plan import FlowPlan
 
 
 class FlowBase(SQLModelSerializable):
@@ -40,6 +41,10 @@ class Flow(FlowBase, table=True):
         # use "uselist=False" to make it a one-to-one relationship
         sa_relationship_kwargs={"uselist": False},
     )
+    plan: Optional["FlowPlan"] = Relationship(
+        back_populates="flow",
+        sa_relationship_kwargs={"uselist": False, "cascade": "all, delete-orphan"},
+    )
 
 
 class FlowCreate(FlowBase):
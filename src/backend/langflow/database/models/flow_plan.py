@@ -0,0 +1,20 @@
+# Path: src/backend/langflow/database/models/flow_plan.py
+
+from langflow.database.models.base import SQLModelSerializable
+from sqlmodel import Field, Relationship, JSON, Column
+from uuid import UUID, uuid4
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from langflow.database.models.flow import Flow
+
+
+class FlowPlan(SQLModelSerializable, table=True):
+    """The execution plan compiled from a flow when it is saved."""
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True, unique=True)
+    flow_id: UUID = Field(default=None, foreign_key="flow.id", index=True)
+    plan: Dict = Field(default_factory=dict, sa_column=Column(JSON))
+    # Hash of the flow data the plan was compiled from, see compute_flow_fingerprint
+    fingerprint: Optional[str] = Field(default=None)
+    flow: "Flow" = Relationship(back_populates="plan")
@@ -1,15 +1,25 @@
+from langflow.graph.edge.compatibility import type_index
 from langflow.utils.logger import logger
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from langflow.graph.vertex.base import Vertex
 
 
 class Edge:
-    def __init__(self, source: "Vertex", target: "Vertex"):
+    def __init__(
+        self, source: "Vertex", target: "Vertex", matched_type: Optional[str] = None
+    ):
         self.source: "Vertex" = source
         self.target: "Vertex" = target
-        self.validate_edge()
+        if matched_type is None:
+            self.validate_edge()
+        else:
+            # Already validated when the execution plan was compiled
+            self.source_types = self.source.output
+            self.target_reqs = self.target.required_inputs + self.target.optional_inputs
+            self.valid = True
+            self.matched_type = matched_type
 
     def validate_edge(self) -> None:
         # Validate that the outputs of the source node are valid inputs
@@ -19,16 +29,9 @@ class Edge:
         # Both lists contain strings and sometimes a string contains the value we are
         # looking for e.g. comgin_out=["Chain"] and target_reqs=["LLMChain"]
         # so we need to check if any of the strings in source_types is in target_reqs
-        self.valid = any(
-            output in target_req
-            for output in self.source_types
-            for target_req in self.target_reqs
-        )
         # Get what type of input the target node is expecting
-
-        self.matched_type = next(
-            (output for output in self.source_types if output in self.target_reqs),
-            None,
+        self.valid, self.matched_type = type_index.match_edge(
+            self.source_types, self.target_reqs
         )
         no_matched_type = self.matched_type is None
         if no_matched_type:
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class TypeCompatibilityIndex:
+    """
+    Answers which output types can feed which input types with dict lookups.
+
+    An output type matches an input type when it is contained in it,
+    e.g. "BaseLanguageModel" matches "BaseLanguageModel" and "Chain" matches
+    "LLMChain". The pairs found in the langchain types are indexed the first
+    time the index is used. Pairs of unknown (e.g. custom) types come from
+    user payloads, so they are checked without being indexed, and only the
+    max_edges most recently matched edges are kept.
+    """
+
+    def __init__(self, max_edges: int = 4096) -> None:
+        self._matches: Dict[Tuple[str, str], bool] = {}
+        self._edges: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_edges = max_edges
+        self._loaded = False
+
+    def load(self, types_dict: Dict) -> None:
+        """Indexes every output and input type pair of a langchain types dict."""
+        outputs = set()
+        inputs = set()
+        for nodes in types_dict.values():
+            for node in nodes.values():
+                outputs.update(node.get("base_classes", []))
+                inputs.update(
+                    field["type"]
+                    for field in node.get("template", {}).values()
+                    if isinstance(field, dict) and isinstance(field.get("type"), str)
+                )
+        for output in outputs:
+            for input_type in inputs:
+                self._matches[(output, input_type)] = output in input_type
+        self._loaded = True
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            from langflow.interface.types import langchain_types_dict
+
+            self.load(langchain_types_dict)
+
+    def matches(self, output: str, input_type: str) -> bool:
+        """Returns whether the output type can be used for the input type."""
+        self._ensure_loaded()
+        result = self._matches.get((output, input_type))
+        return output in input_type if result is None else result
+
+    def match_edge(
+        self, source_types: Iterable[str], target_reqs: Iterable[str]
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Matches the outputs of a source vertex with the inputs of a target.
+
+        Returns:
+            Tuple[bool, Optional[str]]: Whether any output fits any input, and
+            the first output that is itself one of the inputs, if any.
+        """
+        key = (tuple(source_types), tuple(target_reqs))
+        with self._lock:
+            result = self._edges.get(key)
+            if result is not None:
+                self._edges.move_to_end(key)
+                return result
+        source_list, target_list = key
+        valid = any(
+            self.matches(output, target_req)
+            for output in source_list
+            for target_req in target_list
+        )
+        target_set = set(target_list)
+        matched_type = next(
+            (output for output in source_list if output in target_set), None
+        )
+        result = (valid, matched_type)
+        with self._lock:
+            self._edges[key] = result
+            if len(self._edges) > self.max_edges:
+                self._edges.popitem(last=False)
+        return result
+
+
+type_index = TypeCompatibilityIndex()
@@ -1,11 +1,17 @@
-from typing import Dict, Generator, List, Type, Union
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Generator, List, Optional, Set, Tuple, Type, Union
 
+from langflow.cache.vertex import compute_build_key
 from langflow.graph.edge.base import Edge
-from langflow.graph.graph.constants import VERTEX_TYPE_MAP
+from langflow.graph.graph.constants import PLAN_VERSION, VERTEX_CLASSES, VERTEX_TYPE_MAP
 from langflow.graph.vertex.base import Vertex
 from langflow.graph.vertex.types import (
+    AgentVertex,
+    ChainVertex,
     FileToolVertex,
     LLMVertex,
+    PromptVertex,
     ToolkitVertex,
 )
 from langflow.interface.tools.constants import FILE_TOOLS
@@ -48,19 +54,253 @@ class Graph:
                 f"Invalid payload. Expected keys 'nodes' and 'edges'. Found {list(payload.keys())}"
             ) from exc
 
+    @classmethod
+    def from_previous(cls, previous: "Graph", payload: Dict) -> "Graph":
+        """
+        Creates a graph from a payload, reusing what was already built in a
+        previous version of the same flow.
+
+        Only the vertices that changed and the vertices that depend on them
+        will be built again.
+
+        Args:
+            previous (Graph): The previously built graph.
+            payload (Dict): The payload to create the graph from.
+
+        Returns:
+            Graph: The created graph.
+        """
+        graph = cls.from_payload(payload)
+        graph.reuse_built_vertices(previous)
+        return graph
+
+    @classmethod
+    def from_plan(cls, plan: Dict) -> "Graph":
+        """
+        Creates a graph from an execution plan compiled by `to_plan`.
+
+        Node templates are not parsed, edges are not validated and the
+        vertices are not sorted again, so loading a plan is much cheaper
+        than loading the payload it was compiled from.
+
+        Args:
+            plan (Dict): The plan to create the graph from.
+
+        Returns:
+            Graph: The created graph.
+        """
+        if plan.get("version") != PLAN_VERSION:
+            raise ValueError(
+                f"Unsupported execution plan version {plan.get('version')}"
+            )
+        graph = cls.__new__(cls)
+        graph._nodes = [
+            {"id": vertex_plan["id"], "plan": vertex_plan}
+            for vertex_plan in plan["vertices"]
+        ]
+        graph._edges = plan["edges"]
+        graph._load_plan(plan)
+        return graph
+
+    def to_plan(self) -> Dict:
+        """
+        Compiles the graph into a JSON serializable execution plan.
+
+        The plan holds everything `from_plan` needs: the parsed vertices and
+        their params, the validated edges and the topological order.
+        It must be compiled before the graph is built, as building replaces
+        the params with the built objects.
+
+        Returns:
+            Dict: The execution plan.
+        """
+        if any(node._built for node in self.nodes):
+            raise ValueError("Cannot compile a graph that was already built")
+        order, waves = self.sort_vertices()
+        return {
+            "version": PLAN_VERSION,
+            "vertices": [node.to_plan() for node in order],
+            "edges": [
+                {
+                    "source": edge.source.id,
+                    "target": edge.target.id,
+                    "matched_type": edge.matched_type,
+                }
+                for edge in self.edges
+            ],
+            "waves": [[node.id for node in wave] for wave in waves],
+        }
+
+    def _load_plan(self, plan: Dict) -> None:
+        """Restores the graph state compiled by `to_plan`."""
+        self.nodes = [
+            VERTEX_CLASSES[node["plan"]["class"]](node) for node in self._nodes
+        ]
+        self._vertex_map = {node.id: node for node in self.nodes}
+        # The plan was compiled from a graph without unreachable nodes
+        self.unreachable_nodes = []
+        self.edges = [
+            Edge(
+                self._vertex_map[edge["source"]],
+                self._vertex_map[edge["target"]],
+                matched_type=edge["matched_type"],
+            )
+            for edge in self._edges
+        ]
+        self._build_adjacency()
+        for edge in self.edges:
+            edge.source.add_edge(edge)
+            edge.target.add_edge(edge)
+        for node in self._nodes:
+            vertex = self._vertex_map[node["id"]]
+            vertex.params = {
+                key: self._decode_param(value)
+                for key, value in node["plan"]["params"].items()
+            }
+        order = [self._vertex_map[node["id"]] for node in self._nodes]
+        waves = [
+            [self._vertex_map[node_id] for node_id in wave] for wave in plan["waves"]
+        ]
+        self._sorted_vertices = (order, waves)
+        self._set_build_keys()
+
+    def _decode_param(self, param: Dict):
+        if "vertex" in param:
+            return self._vertex_map[param["vertex"]]
+        if "vertices" in param:
+            return [self._vertex_map[node_id] for node_id in param["vertices"]]
+        return param["value"]
+
+    @classmethod
+    def validate_payload(cls, data: Dict) -> Dict:
+        """
+        Checks that a flow is wired correctly without building it.
+
+        Runs the same checks as loading the graph (node data, edge types and
+        required inputs) plus cycle and root detection, but reports every
+        problem found instead of stopping at the first one. No component is
+        instantiated.
+
+        Args:
+            data (Dict): The payload to validate.
+
+        Returns:
+            Dict: "valid", the id of the "root" node if one was found, the
+            "errors" and the "warnings", each with a "message" and the
+            "node" it refers to.
+
+        Raises:
+            ValueError: If the payload is not made of lists of nodes and edges.
+        """
+        errors: List[Dict[str, Optional[str]]] = []
+        warnings: List[Dict[str, Optional[str]]] = []
+
+        def add_error(message: str, node_id: Optional[str] = None) -> None:
+            errors.append({"node": node_id, "message": message})
+
+        if "data" in data:
+            data = data["data"]
+        nodes, edges = data.get("nodes"), data.get("edges")
+        if not isinstance(nodes, list) or not isinstance(edges, list):
+            raise ValueError("Invalid payload. Expected lists of 'nodes' and 'edges'")
+        if not all(isinstance(edge, dict) for edge in edges):
+            raise ValueError("Invalid payload. Expected every edge to be an object")
+
+        graph = cls.__new__(cls)
+        graph._nodes, graph._edges = nodes, edges
+        graph._sorted_vertices = None
+        graph.nodes = []
+        for node in nodes:
+            try:
+                node_data = node["data"]
+                VertexClass = graph._get_vertex_class(
+                    node_data["type"], node_data["node"]["template"]["_type"]
+                )
+                graph.nodes.append(VertexClass(node))
+            except (KeyError, TypeError, ValueError) as exc:
+                node_id = node.get("id") if isinstance(node, dict) else None
+                add_error(f"Invalid node data: {exc!r}", node_id)
+        graph._vertex_map = {node.id: node for node in graph.nodes}
+
+        graph.edges = []
+        for edge in edges:
+            source = graph.get_node(edge.get("source"))
+            target = graph.get_node(edge.get("target"))
+            if source is None or target is None:
+                missing = edge.get("source") if source is None else edge.get("target")
+                add_error(f"Edge node {missing} not found")
+                continue
+            try:
+                graph.edges.append(Edge(source, target))
+            except ValueError as exc:
+                add_error(str(exc), target.id)
+        graph._build_adjacency()
+        for edge in graph.edges:
+            edge.source.add_edge(edge)
+            edge.target.add_edge(edge)
+
+        for node in graph.nodes:
+            try:
+                node._build_params()
+            except ValueError as exc:
+                add_error(str(exc), node.id)
+        loaded_nodes = graph.nodes
+        graph._remove_invalid_nodes()
+        # Loading the graph drops them silently
+        for node in loaded_nodes:
+            if node.id not in graph._vertex_map:
+                message = f"Node {node.id} is not connected and is ignored"
+                warnings.append({"node": node.id, "message": message})
+
+        root_node = None
+        try:
+            graph.sort_vertices()
+        except ValueError as exc:
+            add_error(str(exc))
+        else:
+            root_node = payload.get_root_node(graph)
+            if root_node is None:
+                add_error("No root node found")
+        return {
+            "valid": not errors,
+            "root": root_node.id if root_node is not None else None,
+            "errors": errors,
+            "warnings": warnings,
+        }
+
     def _build_graph(self) -> None:
         """Builds the graph from the nodes and edges."""
+        self._sorted_vertices: Optional[Tuple[List[Vertex], List[List[Vertex]]]] = None
         self.nodes = self._build_vertices()
+        self._vertex_map: Dict[str, Vertex] = {node.id: node for node in self.nodes}
         self.edges = self._build_edges()
+        self._build_adjacency()
         for edge in self.edges:
             edge.source.add_edge(edge)
             edge.target.add_edge(edge)
 
+        # remove invalid nodes
+        self._remove_invalid_nodes()
+        self._remove_unreachable_nodes()
         # This is a hack to make sure that the LLM node is sent to
         # the toolkit node
         self._build_node_params()
-        # remove invalid nodes
-        self._remove_invalid_nodes()
+        self._compact()
+        self._set_build_keys()
+
+    def _compact(self) -> None:
+        """
+        Releases the raw payload once the params are built.
+
+        The vertices only keep what they need to build, and the payload
+        lists only keep the ids and types of the nodes and edges.
+        """
+        for node in self.nodes:
+            node._compact()
+        self._nodes = [node._data for node in self.nodes]
+        self._edges = [
+            {"source": edge.source.id, "target": edge.target.id} for edge in self.edges
+        ]
 
     def _build_node_params(self) -> None:
         """Identifies and handles the LLM node within the graph."""
@@ -75,6 +315,14 @@ class Graph:
                 if isinstance(node, ToolkitVertex):
                     node.params["llm"] = llm_node
 
+    def _build_adjacency(self) -> None:
+        """Indexes the incoming and outgoing edges of each vertex by id."""
+        self._in_edges: Dict[str, List[Edge]] = {node.id: [] for node in self.nodes}
+        self._out_edges: Dict[str, List[Edge]] = {node.id: [] for node in self.nodes}
+        for edge in self.edges:
+            self._out_edges[edge.source.id].append(edge)
+            self._in_edges[edge.target.id].append(edge)
+
     def _remove_invalid_nodes(self) -> None:
         """Removes invalid nodes from the graph."""
         self.nodes = [
@@ -83,6 +331,60 @@ class Graph:
             if self._validate_node(node)
             or (len(self.nodes) == 1 and len(self.edges) == 0)
         ]
+        self._vertex_map = {node.id: node for node in self.nodes}
+        self._in_edges = {node.id: self._in_edges[node.id] for node in self.nodes}
+        self._out_edges = {node.id: self._out_edges[node.id] for node in self.nodes}
+
+    def _remove_unreachable_nodes(self) -> None:
+        """
+        Removes the nodes the root node does not depend on.
+
+        Their params are not built and they are never built, they are only
+        kept in unreachable_nodes so they can be reported.
+        """
+        self.unreachable_nodes: List[Vertex] = []
+        root_node = payload.get_root_node(self)
+        if root_node is None:
+            return
+        reachable = self._collect_upstream(root_node, set())
+        # The LLM is passed to the toolkits without an edge, see _build_node_params
+        if any(isinstance(node, ToolkitVertex) for node in reachable):
+            llm_node = next(
+                (node for node in reversed(self.nodes) if isinstance(node, LLMVertex)),
+                None,
+            )
+            if llm_node is not None:
+                self._collect_upstream(llm_node, reachable)
+        self.unreachable_nodes = [node for node in self.nodes if node not in reachable]
+        if not self.unreachable_nodes:
+            return
+        for node in self.unreachable_nodes:
+            logger.debug(f"Skipping unreachable node {node.vertex_type} ({node.id})")
+        self.nodes = [node for node in self.nodes if node in reachable]
+        self.edges = [
+            edge
+            for edge in self.edges
+            if edge.source in reachable and edge.target in reachable
+        ]
+        for node in self.nodes:
+            node.edges = [
+                edge
+                for edge in node.edges
+                if edge.source in reachable and edge.target in reachable
+            ]
+        self._vertex_map = {node.id: node for node in self.nodes}
+        self._build_adjacency()
+
+    def _collect_upstream(self, node: Vertex, collected: Set[Vertex]) -> Set[Vertex]:
+        """Adds the node and every node it depends on through edges to collected."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current in collected:
+                continue
+            collected.add(current)
+            stack.extend(edge.source for edge in self._in_edges[current.id])
+        return collected
 
     def _validate_node(self, node: Vertex) -> bool:
         """Validates a node."""
@@ -91,23 +393,348 @@ class Graph:
 
     def get_node(self, node_id: str) -> Union[None, Vertex]:
         """Returns a node by id."""
-        return next((node for node in self.nodes if node.id == node_id), None)
+        return self._vertex_map.get(node_id)
 
     def get_nodes_with_target(self, node: Vertex) -> List[Vertex]:
         """Returns the nodes connected to a node."""
         connected_nodes: List[Vertex] = [
-            edge.source for edge in self.edges if edge.target == node
+            edge.source for edge in self._in_edges.get(node.id, [])
+        ]
+        return connected_nodes
+
+    def get_nodes_with_source(self, node: Vertex) -> List[Vertex]:
+        """Returns the nodes a node is connected to."""
+        connected_nodes: List[Vertex] = [
+            edge.target for edge in self._out_edges.get(node.id, [])
         ]
         return connected_nodes
 
-    def build(self) -> Chain:
-        """Builds the graph."""
+    def get_changed_vertices(self, previous: "Graph") -> Set[Vertex]:
+        """
+        Returns the vertices that have to be rebuilt compared to a previous graph.
+
+        A vertex changed if it is new, was not built, its fingerprint differs
+        or its incoming edges differ. Everything depending on a changed vertex
+        has to be rebuilt as well, including the chains and prompts an agent
+        builds when one of its tools changed (see _get_build_dependencies).
+        """
+        changed: Set[Vertex] = set()
+        for node in self.nodes:
+            previous_node = previous.get_node(node.id)
+            if (
+                previous_node is None
+                or not previous_node._built
+                or previous_node.fingerprint != node.fingerprint
+                or previous._get_incoming_signature(previous_node)
+                != self._get_incoming_signature(node)
+            ):
+                changed.add(node)
+
+        try:
+            deferred = self._get_deferred_vertices()
+        except ValueError:
+            deferred = {}
+        dependents = self._get_dependents(self._get_build_dependencies(deferred))
+        stack = list(changed)
+        while stack:
+            node = stack.pop()
+            for dependent in dependents[node.id]:
+                if dependent not in changed:
+                    changed.add(dependent)
+                    stack.append(dependent)
+        return changed
+
+    def reuse_built_vertices(self, previous: "Graph") -> Set[Vertex]:
+        """
+        Copies the built objects of the unchanged vertices of a previous graph.
+
+        Returns:
+            Set[Vertex]: The vertices that still have to be built.
+        """
+        changed = self.get_changed_vertices(previous)
+        for node in self.nodes:
+            if node in changed:
+                continue
+            previous_node = previous.get_node(node.id)
+            node._built_object = previous_node._built_object  # type: ignore
+            node._built = True
+            node.build_metrics = {
+                "wall_time": 0.0,
+                "cpu_time": 0.0,
+                "memory_peak": None,
+                "cache_hit": True,
+            }
+        logger.debug(
+            f"Reusing {len(self.nodes) - len(changed)} of {len(self.nodes)} vertices"
+        )
+        return changed
+
+    def _get_incoming_signature(self, node: Vertex) -> List[tuple]:
+        return sorted(
+            (edge.source.id, edge.matched_type) for edge in self._in_edges[node.id]
+        )
+
+    def _get_dependencies(self, node: Vertex) -> List[Vertex]:
+        """Returns the vertices a vertex needs to be built, in edge order."""
+        dependencies = self.get_nodes_with_target(node)
+        # Some params are set without an edge, e.g. the llm of a toolkit
+        for value in node.params.values():
+            values = value if isinstance(value, list) else [value]
+            for dependency in values:
+                if (
+                    isinstance(dependency, Vertex)
+                    and dependency.id in self._vertex_map
+                    and dependency not in dependencies
+                ):
+                    dependencies.append(dependency)
+        return dependencies
+
+    def _get_build_dependencies(
+        self, deferred: Dict[Vertex, Vertex]
+    ) -> Dict[str, List[Vertex]]:
+        """
+        Maps each vertex id to the vertices its build depends on.
+
+        The chains and prompts an agent builds (see _get_deferred_vertices)
+        are built from the agent's tools, so they depend on those tools too.
+        """
+        dependencies = {node.id: self._get_dependencies(node) for node in self.nodes}
+        for vertex in deferred:
+            agent = deferred[vertex]
+            while agent in deferred:
+                agent = deferred[agent]
+            for tool in dependencies[agent.id]:
+                if tool not in deferred and tool not in dependencies[vertex.id]:
+                    dependencies[vertex.id].append(tool)
+        return dependencies
+
+    def _get_dependents(
+        self, dependencies: Dict[str, List[Vertex]]
+    ) -> Dict[str, List[Vertex]]:
+        """Maps each vertex id to the vertices depending on it."""
+        dependents: Dict[str, List[Vertex]] = {node.id: [] for node in self.nodes}
+        for node in self.nodes:
+            for dependency in dependencies[node.id]:
+                dependents[dependency.id].append(node)
+        return dependents
+
+    def _set_build_keys(self) -> None:
+        """
+        Gives every cacheable vertex a key for the vertex build cache.
+
+        The key covers the vertex type, its template values and the keys of
+        everything it depends on, so identical sub-components share a key
+        across flows. Vertices depending on a non-cacheable vertex (like a
+        memory) are not cacheable either.
+
+        The chains and prompts an agent builds also depend on the agent's
+        tools, see _get_build_dependencies.
+        """
+        for node in self.nodes:
+            node.build_key = None
+        try:
+            deferred = self._get_deferred_vertices()
+        except ValueError:
+            # A graph with a cycle cannot be built, so its vertices get no key
+            return
+        for node in self.nodes:
+            node.deferred = node in deferred
+        dependencies = self._get_build_dependencies(deferred)
+        dependents = self._get_dependents(dependencies)
+        # Vertices left pending by a cycle through an agent keep no key
+        pending = {node.id: len(dependencies[node.id]) for node in self.nodes}
+        ready = [node for node in self.nodes if pending[node.id] == 0]
+        while ready:
+            node = ready.pop()
+            dependency_keys = [
+                dependency.build_key for dependency in dependencies[node.id]
+            ]
+            if node.cacheable and all(dependency_keys):
+                node.build_key = compute_build_key(
+                    node.vertex_type, node.fingerprint, dependency_keys  # type: ignore
+                )
+            for dependent in dependents[node.id]:
+                pending[dependent.id] -= 1
+                if pending[dependent.id] == 0:
+                    ready.append(dependent)
+
+    def build(self, parallel: bool = False, max_workers: Optional[int] = None) -> Chain:
+        """
+        Builds the graph.
+
+        Args:
+            parallel (bool): If True, build each dependency layer of the graph
+                concurrently before building the root node.
+            max_workers (int, optional): Size of the thread pool used when
+                building in parallel.
+
+        Returns:
+            Chain: The object built by the root node.
+        """
         # Get root node
         root_node = payload.get_root_node(self)
         if root_node is None:
             raise ValueError("No root node found")
+        if parallel:
+            self._build_layers_in_parallel(max_workers)
         return root_node.build()
 
+    async def abuild(self, parallel: bool = False) -> Chain:
+        """
+        Builds the graph without blocking the event loop.
+
+        Args:
+            parallel (bool): If True, the vertices of each dependency layer
+                are built concurrently before building the root node.
+
+        Returns:
+            Chain: The object built by the root node.
+        """
+        root_node = payload.get_root_node(self)
+        if root_node is None:
+            raise ValueError("No root node found")
+        if parallel:
+            deferred = self._get_deferred_vertices()
+            for layer in self.topological_layers():
+                await asyncio.gather(
+                    *(vertex.abuild() for vertex in layer if vertex not in deferred)
+                )
+        return await root_node.abuild()
+
+    def _build_layers_in_parallel(self, max_workers: Optional[int] = None) -> None:
+        """Builds the vertices layer by layer, each layer on a thread pool."""
+        deferred = self._get_deferred_vertices()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for layer in self.topological_layers():
+                vertices = [vertex for vertex in layer if vertex not in deferred]
+                # list() waits for the whole layer and re-raises the first error
+                list(executor.map(lambda vertex: vertex.build(), vertices))
+
+    def _get_deferred_vertices(self) -> Dict[Vertex, Vertex]:
+        """
+        Returns the vertices that have to be built by the vertex consuming them,
+        mapped to that consumer.
+
+        Agents build their chains and prompts passing their own tools along,
+        so building those ahead of the agent would leave the prompt without tools.
+        """
+        deferred: Dict[Vertex, Vertex] = {}
+        # A chain shared by several agents is built by the first one
+        for node in self.topological_sort():
+            if not isinstance(node, AgentVertex):
+                continue
+            for chain_node in self.get_nodes_with_target(node):
+                if not isinstance(chain_node, ChainVertex):
+                    continue
+                deferred.setdefault(chain_node, node)
+                for value in chain_node.params.values():
+                    if isinstance(value, PromptVertex):
+                        deferred.setdefault(value, chain_node)
+        return deferred
+
+    def build_order(self) -> List[Vertex]:
+        """
+        Returns the order in which building each vertex once builds the graph.
+
+        This is the topological order, except that the vertices built by their
+        consumer (see _get_deferred_vertices) come right after that consumer.
+        """
+        deferred = self._get_deferred_vertices()
+        built_by: Dict[Vertex, List[Vertex]] = {}
+        for vertex, consumer in deferred.items():
+            built_by.setdefault(consumer, []).append(vertex)
+
+        order: List[Vertex] = []
+
+        def add(vertex: Vertex) -> None:
+            order.append(vertex)
+            for dependency in built_by.get(vertex, []):
+                add(dependency)
+
+        for vertex in self.topological_sort():
+            if vertex not in deferred:
+                add(vertex)
+        return order
+
+    def sort_vertices(self) -> Tuple[List[Vertex], List[List[Vertex]]]:
+        """
+        Sorts the vertices with Kahn's algorithm in O(V+E).
+
+        Returns:
+            Tuple[List[Vertex], List[List[Vertex]]]: The vertices in topological
+            order, and the same vertices grouped into dependency waves. Every
+            vertex of a wave only depends on vertices of previous waves, so a
+            whole wave can be built at the same time.
+
+        Raises:
+            ValueError: If the graph contains a cycle. The message names the
+                vertices forming it.
+        """
+        # The vertices and edges do not change once the graph is created
+        if self._sorted_vertices is not None:
+            return self._sorted_vertices
+        in_degree = {node.id: len(self._in_edges[node.id]) for node in self.nodes}
+        wave = [node for node in self.nodes if in_degree[node.id] == 0]
+        order: List[Vertex] = []
+        waves: List[List[Vertex]] = []
+        while wave:
+            waves.append(wave)
+            order.extend(wave)
+            next_wave = []
+            for node in wave:
+                for edge in self._out_edges[node.id]:
+                    in_degree[edge.target.id] -= 1
+                    if in_degree[edge.target.id] == 0:
+                        next_wave.append(edge.target)
+            wave = next_wave
+        if len(order) != len(self.nodes):
+            cycle = self._find_cycle(
+                {node_id for node_id, degree in in_degree.items() if degree}
+            )
+            raise ValueError(
+                "Graph contains a cycle, cannot perform topological sort: "
+                + " -> ".join(cycle)
+            )
+        self._sorted_vertices = (order, waves)
+        return self._sorted_vertices
+
+    def _find_cycle(self, remaining: Set[str]) -> List[str]:
+        """
+        Returns the ids of a cycle among the vertices Kahn's algorithm left over.
+
+        Each of those vertices still has a predecessor among them, so walking
+        predecessors must eventually visit a vertex twice.
+        """
+        node_id = next(node.id for node in self.nodes if node.id in remaining)
+        path: List[str] = []
+        position: Dict[str, int] = {}
+        while node_id not in position:
+            position[node_id] = len(path)
+            path.append(node_id)
+            node_id = next(
+                edge.source.id
+                for edge in self._in_edges[node_id]
+                if edge.source.id in remaining
+            )
+        # The walk went against the edges, reverse it to follow them
+        cycle = path[position[node_id] :][::-1]
+        return cycle + [cycle[0]]
+
+    def topological_layers(self) -> List[List[Vertex]]:
+        """
+        Groups the vertices into dependency layers.
+
+        Every vertex in a layer only depends on vertices of previous layers,
+        so the vertices of a single layer can be built at the same time.
+
+        Returns:
+            List[List[Vertex]]: The layers in build order.
+
+        Raises:
+            ValueError: If the graph contains a cycle.
+        """
+        return self.sort_vertices()[1]
+
     def topological_sort(self) -> List[Vertex]:
         """
         Performs a topological sort of the vertices in the graph.
@@ -118,51 +745,24 @@ class Graph:
         Raises:
             ValueError: If the graph contains a cycle.
         """
-        # States: 0 = unvisited, 1 = visiting, 2 = visited
-        state = {node: 0 for node in self.nodes}
-        sorted_vertices = []
-
-        def dfs(node):
-            if state[node] == 1:
-                # We have a cycle
-                raise ValueError(
-                    "Graph contains a cycle, cannot perform topological sort"
-                )
-            if state[node] == 0:
-                state[node] = 1
-                for edge in node.edges:
-                    if edge.source == node:
-                        dfs(edge.target)
-                state[node] = 2
-                sorted_vertices.append(node)
-
-        # Visit each node
-        for node in self.nodes:
-            if state[node] == 0:
-                dfs(node)
-
-        return list(reversed(sorted_vertices))
+        return self.sort_vertices()[0]
 
     def generator_build(self) -> Generator:
-        """Builds each vertex in the graph and yields it."""
-        sorted_vertices = self.topological_sort()
+        """Yields each vertex of the graph in the order it should be built."""
+        sorted_vertices = self.build_order()
         logger.debug("Sorted vertices: %s", sorted_vertices)
         yield from sorted_vertices
 
     def get_node_neighbors(self, node: Vertex) -> Dict[Vertex, int]:
         """Returns the neighbors of a node."""
         neighbors: Dict[Vertex, int] = {}
-        for edge in self.edges:
-            if edge.source == node:
-                neighbor = edge.target
-                if neighbor not in neighbors:
-                    neighbors[neighbor] = 0
-                neighbors[neighbor] += 1
-            elif edge.target == node:
-                neighbor = edge.source
-                if neighbor not in neighbors:
-                    neighbors[neighbor] = 0
-                neighbors[neighbor] += 1
+        for neighbor in self.get_nodes_with_source(node):
+            neighbors[neighbor] = neighbors.get(neighbor, 0) + 1
+        for neighbor in self.get_nodes_with_target(node):
+            # Self-loops were only counted once by the edge scan
+            if neighbor == node:
+                continue
+            neighbors[neighbor] = neighbors.get(neighbor, 0) + 1
         return neighbors
 
     def _build_edges(self) -> List[Edge]:
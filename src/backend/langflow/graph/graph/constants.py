@@ -32,3 +32,12 @@ VERTEX_TYPE_MAP: Dict[str, Type[Vertex]] = {
     **{t: types.TextSplitterVertex for t in textsplitter_creator.to_list()},
     **{t: types.RetrieverVertex for t in retriever_creator.to_list()},
 }
+
+# Vertex classes by name, used to restore vertices from an execution plan
+VERTEX_CLASSES: Dict[str, Type[Vertex]] = {
+    cls.__name__: cls
+    for cls in [Vertex, types.FileToolVertex, *VERTEX_TYPE_MAP.values()]
+}
+
+# Bump when the layout of Graph.to_plan changes
+PLAN_VERSION = 1
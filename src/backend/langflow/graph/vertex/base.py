@@ -1,14 +1,29 @@
+from langflow.cache.fingerprint import compute_fingerprint
+from langflow.cache.pool import resource_pool, resource_pool_enabled
+from langflow.cache.vertex import (
+    artifact_cache,
+    artifact_cache_enabled,
+    compute_artifact_key,
+    vertex_cache,
+    vertex_cache_enabled,
+)
+from langflow.graph.vertex.metrics import measure_build
 from langflow.utils.constants import DIRECT_TYPES
 from langflow.interface.initialize import loading
-from langflow.interface.listing import ALL_TYPES_DICT
+from langflow.interface.listing import TYPE_REGISTRY
+from langflow.settings import settings
 from langflow.utils.logger import logger
 from langflow.utils.util import sync_to_async
 
 
+import asyncio
 import contextlib
 import inspect
+import threading
+import time
 import types
 import warnings
+import weakref
 from typing import Any, Dict, List, Optional
 from typing import TYPE_CHECKING
 
@@ -17,14 +32,39 @@ if TYPE_CHECKING:
 
 
 class Vertex:
+    # Stateful vertices (e.g. memories) must not be shared through the build cache
+    cacheable: bool = True
+    # Whether identical instances are shared through the resource pool
+    pooled: bool = False
+
     def __init__(self, data: Dict, base_type: Optional[str] = None) -> None:
         self.id: str = data["id"]
         self._data = data
         self.edges: List["Edge"] = []
         self.base_type: Optional[str] = base_type
-        self._parse_data()
+        self._fingerprint: Optional[str] = None
+        if "plan" in data:
+            self._load_plan(data["plan"])
+        else:
+            self._parse_data()
         self._built_object = None
         self._built = False
+        # Guards _built_object when vertices are built from several threads
+        self._lock = threading.RLock()
+        self._async_lock: Optional[asyncio.Lock] = None
+        # Set by the graph, None means the vertex is not cached
+        self.build_key: Optional[str] = None
+        # Set by the graph for the vertices built by the vertex consuming
+        # them, see Graph._get_deferred_vertices
+        self.deferred = False
+        # Key of the build in the artifact cache, see _get_artifact_key
+        self._artifact_key: Optional[str] = None
+        self.build_start_time: Optional[float] = None
+        self.build_end_time: Optional[float] = None
+        # Resources used by the last build, see measure_build
+        self.build_metrics: Dict[str, Any] = {}
+        # Releases the pooled object held by the vertex, see _hold_pooled
+        self._pool_release: Optional[weakref.finalize] = None
 
     def _parse_data(self) -> None:
         self.data = self._data["data"]
@@ -53,11 +93,73 @@ class Vertex:
             else template_dict["_type"]
         )
 
-        if self.base_type is None:
-            for base_type, value in ALL_TYPES_DICT.items():
-                if self.vertex_type in value:
-                    self.base_type = base_type
-                    break
+        if self.base_type is None and self.vertex_type in TYPE_REGISTRY:
+            self.base_type = TYPE_REGISTRY[self.vertex_type].base_type
+
+    def _load_plan(self, plan: Dict) -> None:
+        """Restores what _parse_data extracts from an execution plan entry."""
+        self.data = plan["data"]
+        self.output = plan["output"]
+        self.required_inputs = plan["required_inputs"]
+        self.optional_inputs = plan["optional_inputs"]
+        self.vertex_type = plan["vertex_type"]
+        self.base_type = plan["base_type"]
+        self._fingerprint = plan["fingerprint"]
+
+    def to_plan(self) -> Dict:
+        """
+        Returns the parsed state of the vertex as a JSON serializable dict.
+
+        Params pointing to other vertices are stored by id, the graph
+        resolves them back when the plan is loaded.
+        """
+        return {
+            "id": self.id,
+            "class": type(self).__name__,
+            "data": self._compact_data(),
+            "output": self.output,
+            "required_inputs": self.required_inputs,
+            "optional_inputs": self.optional_inputs,
+            "vertex_type": self.vertex_type,
+            "base_type": self.base_type,
+            "fingerprint": self.fingerprint,
+            "params": {
+                key: self._encode_param(value) for key, value in self.params.items()
+            },
+        }
+
+    def _compact_data(self) -> Dict:
+        """The part of the node data that is still read once params are built."""
+        return {"type": self.data["type"], "node": {"base_classes": self.output}}
+
+    def _compact(self) -> None:
+        """
+        Releases the raw node payload once the params are built.
+
+        The template, display fields and file contents of the frontend JSON
+        are not needed to build the vertex, only its parsed types, params
+        and fingerprint are kept.
+        """
+        # Computed while the template is still available
+        self._fingerprint = self.fingerprint
+        self.data = self._compact_data()
+        self._data = {"id": self.id, "data": self.data}
+
+    def _encode_param(self, value: Any) -> Dict:
+        if isinstance(value, Vertex):
+            return {"vertex": value.id}
+        if value and self._is_vertex_list(value):
+            return {"vertices": [vertex.id for vertex in value]}
+        return {"value": value}
+
+    @property
+    def fingerprint(self) -> str:
+        """A hash of the vertex type and its template values."""
+        if self._fingerprint is None:
+            self._fingerprint = compute_fingerprint(
+                {"type": self.vertex_type, "template": self.data["node"]["template"]}
+            )
+        return self._fingerprint
 
     def _build_params(self):
         # Some params are required, some are optional
@@ -80,6 +182,7 @@ class Vertex:
             if isinstance(value, dict)
         }
         params = {}
+        incoming_edges = [edge for edge in self.edges if edge.target == self]
         for key, value in template_dict.items():
             if key == "_type":
                 continue
@@ -97,8 +200,8 @@ class Vertex:
                 # Get the edge that connects to this node
                 edges = [
                     edge
-                    for edge in self.edges
-                    if edge.target == self and edge.matched_type in value["type"]
+                    for edge in incoming_edges
+                    if edge.matched_type in value["type"]
                 ]
 
                 # Get the output of the node that the edge connects to
@@ -145,6 +248,12 @@ class Vertex:
         # and continue
         # Another aspect is that the node_type is the class that we need to import
         # and instantiate with these built params
+        self.build_start_time = time.time()
+        if self._load_from_vertex_cache():
+            return
+        self._artifact_key = self._get_artifact_key()
+        if self._artifact_key and self._load_from_artifact_cache():
+            return
         logger.debug(f"Building {self.vertex_type}")
         # Build each node in the params dict
         for key, value in self.params.copy().items():
@@ -154,68 +263,250 @@ class Vertex:
                 if value == self:
                     del self.params[key]
                     continue
-                result = value.build()
-                # If the key is "func", then we need to use the run method
-                if key == "func":
-                    if not isinstance(result, types.FunctionType):
-                        # func can be
-                        # PythonFunction(code='\ndef upper_case(text: str) -> str:\n    return text.upper()\n')
-                        # so we need to check if there is an attribute called run
-                        if hasattr(result, "run"):
-                            result = result.run  # type: ignore
-                        elif hasattr(result, "get_function"):
-                            result = result.get_function()  # type: ignore
-                    elif inspect.iscoroutinefunction(result):
-                        self.params["coroutine"] = result
-                    else:
-                        # turn result which is a function into a coroutine
-                        # so that it can be awaited
-                        self.params["coroutine"] = sync_to_async(result)
-                if isinstance(result, list):
-                    # If the result is a list, then we need to extend the list
-                    # with the result but first check if the key exists
-                    # if it doesn't, then we need to create a new list
-                    if isinstance(self.params[key], list):
-                        self.params[key].extend(result)
-
-                self.params[key] = result
-            elif isinstance(value, list) and all(
-                isinstance(node, Vertex) for node in value
-            ):
-                self.params[key] = []
-                for node in value:
-                    built = node.build()
-                    if isinstance(built, list):
-                        self.params[key].extend(built)
-                    else:
-                        self.params[key].append(built)
+                self._set_built_param(key, value.build())
+            elif self._is_vertex_list(value):
+                self._set_built_list_param(key, [node.build() for node in value])
 
         # Get the class from LANGCHAIN_TYPES_DICT
         # and instantiate it with the params
         # and return the instance
 
-        try:
-            self._built_object = loading.instantiate_class(
+        with measure_build() as metrics:
+            try:
+                self._built_object = self._instantiate()
+            except Exception as exc:
+                raise ValueError(
+                    f"Error building node {self.vertex_type}: {str(exc)}"
+                ) from exc
+        self.build_metrics = {**metrics, "cache_hit": False}
+
+        self._finish_build()
+        if self._artifact_key:
+            self._store_artifact()
+
+    async def _abuild(self):
+        # Same as _build, but dependencies are awaited and the blocking
+        # instantiation runs in an executor so the event loop stays free
+        self.build_start_time = time.time()
+        if self._load_from_vertex_cache():
+            return
+        self._artifact_key = self._get_artifact_key()
+        if self._artifact_key and await asyncio.to_thread(
+            self._load_from_artifact_cache
+        ):
+            return
+        logger.debug(f"Building {self.vertex_type} asynchronously")
+        for key, value in self.params.copy().items():
+            if isinstance(value, Vertex):
+                if value == self:
+                    del self.params[key]
+                    continue
+                self._set_built_param(key, await value.abuild())
+            elif self._is_vertex_list(value):
+                self._set_built_list_param(key, [await node.abuild() for node in value])
+
+        timeout = self._get_build_timeout()
+        # The event loop thread runs other builds meanwhile
+        with measure_build(offloaded=True) as metrics:
+            try:
+                self._built_object = await asyncio.wait_for(
+                    self._ainstantiate(), timeout
+                )
+            except asyncio.TimeoutError as exc:
+                raise ValueError(
+                    f"Building node {self.vertex_type} timed out after {timeout} seconds"
+                ) from exc
+            except Exception as exc:
+                raise ValueError(
+                    f"Error building node {self.vertex_type}: {str(exc)}"
+                ) from exc
+        self.build_metrics = {**metrics, "cache_hit": False}
+
+        self._finish_build()
+        if self._artifact_key:
+            await asyncio.to_thread(self._store_artifact)
+
+    def _instantiate(self) -> Any:
+        pool_key = self._get_pool_key()
+        built_object = resource_pool.acquire(pool_key) if pool_key else None
+        if built_object is None:
+            built_object = loading.instantiate_class(
                 node_type=self.vertex_type,
                 base_type=self.base_type,
                 params=self.params,
             )
-        except Exception as exc:
-            raise ValueError(
-                f"Error building node {self.vertex_type}: {str(exc)}"
-            ) from exc
+            if pool_key:
+                built_object = resource_pool.add(pool_key, built_object)
+        if pool_key:
+            self._hold_pooled(pool_key)
+        return built_object
 
+    async def _ainstantiate(self) -> Any:
+        pool_key = self._get_pool_key()
+        built_object = resource_pool.acquire(pool_key) if pool_key else None
+        if built_object is None:
+            built_object = await loading.ainstantiate_class(
+                node_type=self.vertex_type,
+                base_type=self.base_type,
+                params=self.params,
+            )
+            if pool_key:
+                built_object = resource_pool.add(pool_key, built_object)
+        if pool_key:
+            self._hold_pooled(pool_key)
+        return built_object
+
+    def _get_pool_key(self) -> Optional[str]:
+        """The resource pool key of the vertex, None if it is not pooled."""
+        if not self.pooled or not resource_pool_enabled():
+            return None
+        return resource_pool.compute_key(
+            f"{self.base_type}.{self.vertex_type}", self.params
+        )
+
+    def _hold_pooled(self, pool_key: str) -> None:
+        """
+        Keeps the reference acquired in the resource pool until the vertex is
+        garbage collected or built again.
+        """
+        if self._pool_release is not None:
+            self._pool_release()
+        self._pool_release = weakref.finalize(self, resource_pool.release, pool_key)
+
+    def _get_build_timeout(self) -> Optional[float]:
+        """
+        Seconds the async instantiation may take, None means no limit.
+
+        The blocking instantiation keeps running in its executor thread after
+        a timeout, but the event loop is free to serve other requests.
+        Sync builds (build, Graph.build including its threaded layer builds)
+        are not limited, as a thread running an instantiation cannot be
+        interrupted.
+        """
+        timeouts = settings.vertex_build_timeouts or {}
+        timeout = (
+            timeouts.get(self.vertex_type)
+            or timeouts.get(self.base_type)
+            or settings.vertex_build_timeout
+        )
+        return timeout or None
+
+    @staticmethod
+    def _is_vertex_list(value: Any) -> bool:
+        return isinstance(value, list) and all(
+            isinstance(node, Vertex) for node in value
+        )
+
+    def _set_built_param(self, key: str, result: Any) -> None:
+        # If the key is "func", then we need to use the run method
+        if key == "func":
+            if not isinstance(result, types.FunctionType):
+                # func can be
+                # PythonFunction(code='\ndef upper_case(text: str) -> str:\n    return text.upper()\n')
+                # so we need to check if there is an attribute called run
+                if hasattr(result, "run"):
+                    result = result.run  # type: ignore
+                elif hasattr(result, "get_function"):
+                    result = result.get_function()  # type: ignore
+            elif inspect.iscoroutinefunction(result):
+                self.params["coroutine"] = result
+            else:
+                # turn result which is a function into a coroutine
+                # so that it can be awaited
+                self.params["coroutine"] = sync_to_async(result)
+        if isinstance(result, list):
+            # If the result is a list, then we need to extend the list
+            # with the result but first check if the key exists
+            # if it doesn't, then we need to create a new list
+            if isinstance(self.params[key], list):
+                self.params[key].extend(result)
+
+        self.params[key] = result
+
+    def _set_built_list_param(self, key: str, results: List[Any]) -> None:
+        self.params[key] = []
+        for built in results:
+            if isinstance(built, list):
+                self.params[key].extend(built)
+            else:
+                self.params[key].append(built)
+
+    def _finish_build(self) -> None:
         if self._built_object is None:
             raise ValueError(f"Node type {self.vertex_type} not found")
 
         self._built = True
+        self.build_end_time = time.time()
+        if self.build_key is not None and vertex_cache_enabled():
+            vertex_cache.set(self.build_key, self._built_object)
+
+    def _load_from_vertex_cache(self) -> bool:
+        """Reuses the object built by an identical vertex, if there is one."""
+        if self.build_key is None or not vertex_cache_enabled():
+            return False
+        with measure_build() as metrics:
+            built_object = vertex_cache.get(self.build_key)
+        if built_object is None:
+            return False
+        self.build_metrics = {**metrics, "cache_hit": True}
+        logger.debug(f"Loaded {self.vertex_type} from the vertex cache")
+        self._built_object = built_object
+        self._built = True
+        self.build_end_time = time.time()
+        return True
+
+    def _get_artifact_key(self) -> Optional[str]:
+        """The key of the build in the artifact cache, None if not stored there."""
+        # What an agent builds depends on the agent, which the key covers only
+        # as long as the process runs (see Graph._set_build_keys)
+        if (
+            self.build_key is None
+            or self.deferred
+            or not artifact_cache_enabled(
+                self.vertex_type, self.base_type  # type: ignore
+            )
+        ):
+            return None
+        return compute_artifact_key(self.build_key, self.params)
+
+    def _load_from_artifact_cache(self) -> bool:
+        """Loads the object an identical vertex built before a restart, if stored."""
+        with measure_build() as metrics:
+            built_object = artifact_cache.get(self._artifact_key)  # type: ignore
+        if built_object is None:
+            return False
+        self.build_metrics = {**metrics, "cache_hit": True}
+        logger.debug(f"Loaded {self.vertex_type} from the artifact cache")
+        self._built_object = built_object
+        self._finish_build()
+        return True
+
+    def _store_artifact(self) -> None:
+        try:
+            artifact_cache.set(self._artifact_key, self._built_object)  # type: ignore
+        except OSError as exc:
+            logger.warning(f"Could not store {self.vertex_type} on disk: {exc}")
 
     def build(self, force: bool = False) -> Any:
-        if not self._built or force:
-            self._build()
+        with self._lock:
+            if not self._built or force:
+                self._build()
+
+        return self._built_object
+
+    async def abuild(self, force: bool = False) -> Any:
+        async with self._get_async_lock():
+            if not self._built or force:
+                await self._abuild()
 
         return self._built_object
 
+    def _get_async_lock(self) -> asyncio.Lock:
+        # Created lazily so the lock belongs to the running event loop
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        return self._async_lock
+
     def add_edge(self, edge: "Edge") -> None:
         self.edges.append(edge)
 
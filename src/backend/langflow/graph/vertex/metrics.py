@@ -0,0 +1,81 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# tracemalloc has a single, process-wide peak, so a peak is only reported
+# for measurements no other measurement overlapped
+_lock = threading.Lock()
+_active = 0
+_started = 0
+# The CPU times counted by count_cpu_time for the enclosing offloaded measure_build
+_offloaded_cpu_times: ContextVar[Optional[List[float]]] = ContextVar(
+    "offloaded_cpu_times", default=None
+)
+
+
+@contextmanager
+def measure_build(offloaded: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Measures the resources used by the block into the yielded dict.
+
+    wall_time and cpu_time are in seconds. cpu_time is the CPU time of the
+    calling thread, which is right for sync builds, including the threaded
+    layer builds. Async builds share the event loop thread with other builds,
+    so they pass offloaded=True and their cpu_time is the CPU time of the
+    executor threads the block ran functions in through count_cpu_time.
+
+    memory_peak is the peak of memory allocated during the block in bytes.
+    It is only measured while tracemalloc is tracing (see
+    settings.trace_build_memory), and it is None otherwise or when other
+    builds ran at the same time, since the peak covers the whole process.
+
+    Work done in the process pool is not counted in either.
+    """
+    global _active, _started
+    metrics: Dict[str, Any] = {}
+    tracing = tracemalloc.is_tracing()
+    with _lock:
+        alone = _active == 0
+        _active += 1
+        _started += 1
+        started = _started
+        if tracing and alone:
+            memory_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+    cpu_times: List[float] = []
+    token = _offloaded_cpu_times.set(cpu_times if offloaded else None)
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield metrics
+    finally:
+        metrics["wall_time"] = time.perf_counter() - wall_start
+        cpu_end = time.thread_time()
+        _offloaded_cpu_times.reset(token)
+        metrics["cpu_time"] = sum(cpu_times) if offloaded else cpu_end - cpu_start
+        with _lock:
+            _active -= 1
+            overlapped = not alone or _started != started
+            metrics["memory_peak"] = (
+                tracemalloc.get_traced_memory()[1] - memory_start
+                if tracing and not overlapped
+                else None
+            )
+
+
+def count_cpu_time(func: Callable, *args, **kwargs) -> Any:
+    """
+    Calls func, adding the CPU time of the calling thread to the enclosing
+    offloaded measure_build. Meant to run in an executor with the context of
+    the build copied, e.g. through asyncio.to_thread.
+    """
+    cpu_times = _offloaded_cpu_times.get()
+    cpu_start = time.thread_time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if cpu_times is not None:
+            cpu_times.append(time.thread_time() - cpu_start)
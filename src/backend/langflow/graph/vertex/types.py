@@ -21,17 +21,32 @@ class AgentVertex(Vertex):
                 self.chains.append(source_node)
 
     def build(self, force: bool = False) -> Any:
-        if not self._built or force:
-            self._set_tools_and_chains()
-            # First, build the tools
-            for tool_node in self.tools:
-                tool_node.build()
+        with self._lock:
+            if not self._built or force:
+                self._set_tools_and_chains()
+                # First, build the tools
+                for tool_node in self.tools:
+                    tool_node.build()
 
-            # Next, build the chains and the rest
-            for chain_node in self.chains:
-                chain_node.build(tools=self.tools)
+                # Next, build the chains and the rest
+                for chain_node in self.chains:
+                    chain_node.build(tools=self.tools)
 
-            self._build()
+                self._build()
+
+        return self._built_object
+
+    async def abuild(self, force: bool = False) -> Any:
+        async with self._get_async_lock():
+            if not self._built or force:
+                self._set_tools_and_chains()
+                for tool_node in self.tools:
+                    await tool_node.abuild()
+
+                for chain_node in self.chains:
+                    await chain_node.abuild(tools=self.tools)
+
+                await self._abuild()
 
         return self._built_object
 
@@ -42,25 +57,13 @@ class ToolVertex(Vertex):
 
 
 class LLMVertex(Vertex):
-    built_node_type = None
-    class_built_object = None
+    # Some models take up too much memory or time to load, so vertices
+    # with the same params share a single instance
+    pooled = True
 
     def __init__(self, data: Dict):
         super().__init__(data, base_type="llms")
 
-    def build(self, force: bool = False) -> Any:
-        # LLM is different because some models might take up too much memory
-        # or time to load. So we only load them when we need them.ß
-        if self.vertex_type == self.built_node_type:
-            return self.class_built_object
-        if not self._built or force:
-            self._build()
-            self.built_node_type = self.vertex_type
-            self.class_built_object = self._built_object
-        # Avoid deepcopying the LLM
-        # that are loaded from a file
-        return self._built_object
-
 
 class ToolkitVertex(Vertex):
     def __init__(self, data: Dict):
@@ -77,10 +80,19 @@ class WrapperVertex(Vertex):
         super().__init__(data, base_type="wrappers")
 
     def build(self, force: bool = False) -> Any:
-        if not self._built or force:
-            if "headers" in self.params:
-                self.params["headers"] = eval(self.params["headers"])
-            self._build()
+        with self._lock:
+            if not self._built or force:
+                if "headers" in self.params:
+                    self.params["headers"] = eval(self.params["headers"])
+                self._build()
+        return self._built_object
+
+    async def abuild(self, force: bool = False) -> Any:
+        async with self._get_async_lock():
+            if not self._built or force:
+                if "headers" in self.params:
+                    self.params["headers"] = eval(self.params["headers"])
+                await self._abuild()
         return self._built_object
 
 
@@ -98,6 +110,8 @@ class DocumentLoaderVertex(Vertex):
 
 
 class EmbeddingVertex(Vertex):
+    pooled = True
+
     def __init__(self, data: Dict):
         super().__init__(data, base_type="embeddings")
 
@@ -108,6 +122,8 @@ class VectorStoreVertex(Vertex):
 
 
 class MemoryVertex(Vertex):
+    cacheable = False
+
     def __init__(self, data: Dict):
         super().__init__(data, base_type="memory")
 
@@ -139,14 +155,30 @@ class ChainVertex(Vertex):
         force: bool = False,
         tools: Optional[List[Union[ToolkitVertex, ToolVertex]]] = None,
     ) -> Any:
-        if not self._built or force:
-            # Check if the chain requires a PromptVertex
-            for key, value in self.params.items():
-                if isinstance(value, PromptVertex):
-                    # Build the PromptVertex, passing the tools if available
-                    self.params[key] = value.build(tools=tools, force=force)
+        with self._lock:
+            if not self._built or force:
+                # Check if the chain requires a PromptVertex
+                for key, value in self.params.items():
+                    if isinstance(value, PromptVertex):
+                        # Build the PromptVertex, passing the tools if available
+                        self.params[key] = value.build(tools=tools, force=force)
+
+                self._build()
+
+        return self._built_object
+
+    async def abuild(
+        self,
+        force: bool = False,
+        tools: Optional[List[Union[ToolkitVertex, ToolVertex]]] = None,
+    ) -> Any:
+        async with self._get_async_lock():
+            if not self._built or force:
+                for key, value in self.params.items():
+                    if isinstance(value, PromptVertex):
+                        self.params[key] = await value.abuild(tools=tools, force=force)
 
-            self._build()
+                await self._abuild()
 
         return self._built_object
 
@@ -160,36 +192,57 @@ class PromptVertex(Vertex):
         force: bool = False,
         tools: Optional[List[Union[ToolkitVertex, ToolVertex]]] = None,
     ) -> Any:
-        if not self._built or force:
-            if (
-                "input_variables" not in self.params
-                or self.params["input_variables"] is None
-            ):
-                self.params["input_variables"] = []
-            # Check if it is a ZeroShotPrompt and needs a tool
-            if "ShotPrompt" in self.vertex_type:
-                tools = (
+        with self._lock:
+            if not self._built or force:
+                # Only a ZeroShotPrompt needs the tools built
+                built_tools = (
                     [tool_node.build() for tool_node in tools]
-                    if tools is not None
-                    else []
+                    if tools is not None and "ShotPrompt" in self.vertex_type
+                    else None
+                )
+                self._set_prompt_params(built_tools)
+                self._build()
+        return self._built_object
+
+    async def abuild(
+        self,
+        force: bool = False,
+        tools: Optional[List[Union[ToolkitVertex, ToolVertex]]] = None,
+    ) -> Any:
+        async with self._get_async_lock():
+            if not self._built or force:
+                built_tools = (
+                    [await tool_node.abuild() for tool_node in tools]
+                    if tools is not None and "ShotPrompt" in self.vertex_type
+                    else None
                 )
-                # flatten the list of tools if it is a list of lists
-                # first check if it is a list
-                if tools and isinstance(tools, list) and isinstance(tools[0], list):
-                    tools = flatten_list(tools)
-                self.params["tools"] = tools
-                prompt_params = [
-                    key
-                    for key, value in self.params.items()
-                    if isinstance(value, str) and key != "format_instructions"
-                ]
-            else:
-                prompt_params = ["template"]
-            for param in prompt_params:
-                prompt_text = self.params[param]
-                variables = extract_input_variables_from_prompt(prompt_text)
-                self.params["input_variables"].extend(variables)
-            self.params["input_variables"] = list(set(self.params["input_variables"]))
-
-            self._build()
+                self._set_prompt_params(built_tools)
+                await self._abuild()
         return self._built_object
+
+    def _set_prompt_params(self, tools: Optional[List[Any]]) -> None:
+        if (
+            "input_variables" not in self.params
+            or self.params["input_variables"] is None
+        ):
+            self.params["input_variables"] = []
+        # Check if it is a ZeroShotPrompt and needs a tool
+        if "ShotPrompt" in self.vertex_type:
+            tools = tools if tools is not None else []
+            # flatten the list of tools if it is a list of lists
+            # first check if it is a list
+            if tools and isinstance(tools, list) and isinstance(tools[0], list):
+                tools = flatten_list(tools)
+            self.params["tools"] = tools
+            prompt_params = [
+                key
+                for key, value in self.params.items()
+                if isinstance(value, str) and key != "format_instructions"
+            ]
+        else:
+            prompt_params = ["template"]
+        for param in prompt_params:
+            prompt_text = self.params[param]
+            variables = extract_input_variables_from_prompt(prompt_text)
+            self.params["input_variables"].extend(variables)
+        self.params["input_variables"] = list(set(self.params["input_variables"]))
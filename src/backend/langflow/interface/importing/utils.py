@@ -1,7 +1,7 @@
 # This module is used to import any langchain class by name.
 
 import importlib
-from typing import Any, Type
+from typing import Any, Callable, Dict, Type, Union
 
 from langchain import PromptTemplate
 from langchain.agents import Agent
@@ -28,31 +28,17 @@ def import_module(module_path: str) -> Any:
 
 def import_by_type(_type: str, name: str) -> Any:
     """Import class by type and name"""
+    return get_importer(_type, name)(name)
+
+
+def get_importer(_type: str, name: str) -> Callable[[str], Any]:
+    """Get the function that imports the class of a type and name"""
     if _type is None:
         raise ValueError(f"Type cannot be None. Check if {name} is in the config file.")
-    func_dict = {
-        "agents": import_agent,
-        "prompts": import_prompt,
-        "llms": {"llm": import_llm, "chat": import_chat_llm},
-        "tools": import_tool,
-        "chains": import_chain,
-        "toolkits": import_toolkit,
-        "wrappers": import_wrapper,
-        "memory": import_memory,
-        "embeddings": import_embedding,
-        "vectorstores": import_vectorstore,
-        "documentloaders": import_documentloader,
-        "textsplitters": import_textsplitter,
-        "utilities": import_utility,
-        "retrievers": import_retriever,
-    }
     if _type == "llms":
         key = "chat" if "chat" in name.lower() else "llm"
-        loaded_func = func_dict[_type][key]  # type: ignore
-    else:
-        loaded_func = func_dict[_type]
-
-    return loaded_func(name)
+        return IMPORTERS[_type][key]  # type: ignore
+    return IMPORTERS[_type]  # type: ignore
 
 
 def import_chat_llm(llm: str) -> BaseChatModel:
@@ -161,3 +147,21 @@ def get_function(code):
     function_name = validate.extract_function_name(code)
 
     return validate.create_function(code, function_name)
+
+
+IMPORTERS: Dict[str, Union[Callable, Dict[str, Callable]]] = {
+    "agents": import_agent,
+    "prompts": import_prompt,
+    "llms": {"llm": import_llm, "chat": import_chat_llm},
+    "tools": import_tool,
+    "chains": import_chain,
+    "toolkits": import_toolkit,
+    "wrappers": import_wrapper,
+    "memory": import_memory,
+    "embeddings": import_embedding,
+    "vectorstores": import_vectorstore,
+    "documentloaders": import_documentloader,
+    "textsplitters": import_textsplitter,
+    "utilities": import_utility,
+    "retrievers": import_retriever,
+}
@@ -1,3 +1,5 @@
+import asyncio
+import inspect
 import json
 from typing import Any, Callable, Dict, Sequence, Type
 
@@ -8,12 +10,21 @@ from langchain.agents.agent_toolkits.base import BaseToolkit
 from langchain.agents.tools import BaseTool
 from langflow.interface.initialize.llm import initialize_vertexai
 
+from langflow.interface.initialize.process_pool import (
+    get_process_pool,
+    instantiate_in_process,
+    is_cpu_heavy,
+    pack_params,
+    unpack_documents,
+)
 from langflow.interface.initialize.vector_store import vecstore_initializer
 
 from pydantic import ValidationError
 
 from langflow.interface.custom_lists import CUSTOM_NODES
 from langflow.interface.importing.utils import get_function, import_by_type
+from langflow.interface.listing import get_type_importer
+from langflow.graph.vertex.metrics import count_cpu_time
 from langflow.interface.toolkits.base import toolkits_creator
 from langflow.interface.chains.base import chain_creator
 from langflow.interface.retrievers.base import retriever_creator
@@ -35,10 +46,50 @@ def instantiate_class(node_type: str, base_type: str, params: Dict) -> Any:
                 return custom_node.initialize(**params)
             return custom_node(**params)
 
-    class_object = import_by_type(_type=base_type, name=node_type)
+    if importer := get_type_importer(node_type, base_type):
+        class_object = importer(node_type)
+    else:
+        class_object = import_by_type(_type=base_type, name=node_type)
     return instantiate_based_on_type(class_object, base_type, node_type, params)
 
 
+async def ainstantiate_class(node_type: str, base_type: str, params: Dict) -> Any:
+    """
+    Instantiate class without blocking the event loop.
+
+    Custom nodes that define an async ``ainitialize`` are awaited directly,
+    the types listed in settings.cpu_heavy_vertex_types are instantiated in the
+    process pool and everything else by instantiate_class in the default executor.
+    """
+    custom_node = CUSTOM_NODES.get(node_type)
+    if inspect.iscoroutinefunction(getattr(custom_node, "ainitialize", None)):
+        params = convert_kwargs(convert_params_to_sets(params))
+        return await custom_node.ainitialize(**params)  # type: ignore
+
+    loop = asyncio.get_running_loop()
+    process_pool = get_process_pool() if is_cpu_heavy(node_type, base_type) else None
+    if process_pool is not None:
+        # Pickling large document lists would block the event loop too
+        packed_params = await asyncio.to_thread(pack_params, params)
+        if packed_params is not None:
+            # CPU-bound work would hold the GIL of the web worker
+            result = await loop.run_in_executor(
+                process_pool,
+                instantiate_in_process,
+                node_type,
+                base_type,
+                packed_params,
+            )
+            return await asyncio.to_thread(unpack_documents, result)
+    return await asyncio.to_thread(
+        count_cpu_time,
+        instantiate_class,
+        node_type=node_type,
+        base_type=base_type,
+        params=params,
+    )
+
+
 def convert_params_to_sets(params):
     """Convert certain params to sets"""
     if "allowed_special" in params:
@@ -0,0 +1,96 @@
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from langchain.schema import Document
+
+from langflow.settings import settings
+from langflow.utils.logger import logger
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+class PackedDocuments(list):
+    """A list of documents as (page_content, metadata) tuples."""
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the process pool, None if settings.process_pool_size disables it."""
+    global _process_pool
+    if not settings.process_pool_size:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            # Forking a worker that runs threads can deadlock the children
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.process_pool_size,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the processes of the pool, if it was started."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(cancel_futures=True)
+            _process_pool = None
+
+
+def is_cpu_heavy(node_type: str, base_type: str) -> bool:
+    """Whether a vertex is listed in settings.cpu_heavy_vertex_types."""
+    cpu_heavy_types = settings.cpu_heavy_vertex_types or []
+    return node_type in cpu_heavy_types or base_type in cpu_heavy_types
+
+
+def pack_documents(value: Any) -> Any:
+    """Replace a list of documents by its compact form, see PackedDocuments."""
+    if (
+        isinstance(value, list)
+        and value
+        and all(isinstance(item, Document) for item in value)
+    ):
+        return PackedDocuments((doc.page_content, doc.metadata) for doc in value)
+    return value
+
+
+def unpack_documents(value: Any) -> Any:
+    """Rebuild the documents packed by pack_documents."""
+    if isinstance(value, PackedDocuments):
+        return [
+            Document(page_content=page_content, metadata=metadata)
+            for page_content, metadata in value
+        ]
+    return value
+
+
+def pack_params(params: Dict) -> Optional[bytes]:
+    """
+    Serialize the params of a vertex to send them to the process pool.
+
+    Returns:
+        The pickled params, or None if they hold objects that cannot be
+        pickled and the vertex has to be built in the web worker.
+    """
+    try:
+        return pickle.dumps(
+            {key: pack_documents(value) for key, value in params.items()}
+        )
+    except Exception as exc:
+        logger.debug(f"Params cannot be sent to the process pool: {exc}")
+        return None
+
+
+def instantiate_in_process(node_type: str, base_type: str, packed_params: bytes) -> Any:
+    """Instantiate a class in a process of the pool, see ainstantiate_class."""
+    from langflow.interface.initialize.loading import instantiate_class
+
+    params: Dict[str, Any] = {
+        key: unpack_documents(value)
+        for key, value in pickle.loads(packed_params).items()
+    }
+    return pack_documents(instantiate_class(node_type, base_type, params))
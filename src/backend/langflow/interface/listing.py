@@ -1,3 +1,6 @@
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
 from langflow.interface.agents.base import agent_creator
 from langflow.interface.chains.base import chain_creator
 from langflow.interface.document_loaders.base import documentloader_creator
@@ -12,6 +15,8 @@ from langflow.interface.utilities.base import utility_creator
 from langflow.interface.vector_store.base import vectorstore_creator
 from langflow.interface.wrappers.base import wrapper_creator
 from langflow.interface.retrievers.base import retriever_creator
+from langflow.interface.importing.utils import get_importer
+from langflow.utils.logger import logger
 
 
 def get_type_dict():
@@ -41,3 +46,65 @@ ALL_TYPES_DICT = {
     **LANGCHAIN_TYPES_DICT,
     "Custom": ["Custom Tool", "Python Function"],
 }
+
+# Some categories are named differently by the importers
+IMPORT_TYPE_NAMES = {
+    "documentLoaders": "documentloaders",
+    "vectorStore": "vectorstores",
+    "textSplitters": "textsplitters",
+}
+
+
+class TypeEntry(NamedTuple):
+    base_type: str
+    # None for types built by langflow itself, e.g. custom nodes
+    importer: Optional[Callable[[str], Any]]
+
+
+def build_type_registry(
+    types_dict: Dict[str, List[str]]
+) -> Tuple[Mapping[str, TypeEntry], Dict[str, List[str]]]:
+    """
+    Builds a read-only name -> (base type, importer) registry of all types.
+
+    A name listed under several base types resolves to the first of them and
+    is returned with all its base types in the ambiguous names.
+    """
+    registry: Dict[str, TypeEntry] = {}
+    ambiguous: Dict[str, List[str]] = {}
+    for base_type, names in types_dict.items():
+        for name in names:
+            if name not in registry:
+                try:
+                    importer = get_importer(
+                        IMPORT_TYPE_NAMES.get(base_type, base_type), name
+                    )
+                except KeyError:
+                    importer = None
+                registry[name] = TypeEntry(base_type, importer)
+            elif registry[name].base_type != base_type:
+                categories = ambiguous.setdefault(name, [registry[name].base_type])
+                if base_type not in categories:
+                    categories.append(base_type)
+    for name, categories in ambiguous.items():
+        logger.warning(
+            f"{name} is listed as {', '.join(categories)}, resolving it as {categories[0]}"
+        )
+    return MappingProxyType(registry), ambiguous
+
+
+TYPE_REGISTRY, AMBIGUOUS_TYPES = build_type_registry(ALL_TYPES_DICT)
+
+
+def get_type_importer(node_type: str, base_type: str) -> Optional[Callable[[str], Any]]:
+    """
+    Returns the registered importer of a type, or None if the type is not
+    registered under that base type (vertices use the importer names of the
+    base types, e.g. documentloaders).
+    """
+    entry = TYPE_REGISTRY.get(node_type)
+    if entry is None or IMPORT_TYPE_NAMES.get(entry.base_type, entry.base_type) != (
+        IMPORT_TYPE_NAMES.get(base_type, base_type)
+    ):
+        return None
+    return entry.importer
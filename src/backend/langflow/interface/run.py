@@ -1,3 +1,4 @@
+from langflow.cache.registry import cache_registry
 from langflow.cache.utils import memoize_dict
 from langflow.graph import Graph
 from langflow.utils.logger import logger
@@ -14,6 +15,35 @@ def build_langchain_object_with_caching(data_graph):
     return graph.build()
 
 
+@memoize_dict(maxsize=10)
+async def abuild_langchain_object_with_caching(data_graph):
+    """
+    Build langchain object from data_graph without blocking the event loop.
+    """
+
+    logger.debug("Building langchain object")
+    graph = Graph.from_payload(data_graph)
+    return await graph.abuild()
+
+
+@memoize_dict(maxsize=10)
+async def abuild_langchain_object_from_plan_with_caching(plan):
+    """
+    Build langchain object from an execution plan compiled with Graph.to_plan.
+    """
+
+    logger.debug("Building langchain object from execution plan")
+    graph = Graph.from_plan(plan)
+    return await graph.abuild()
+
+
+cache_registry.register("flows", build_langchain_object_with_caching.cache)
+cache_registry.register("flows_async", abuild_langchain_object_with_caching.cache)
+cache_registry.register(
+    "flow_plans", abuild_langchain_object_from_plan_with_caching.cache
+)
+
+
 def build_langchain_object(data_graph):
     """
     Build langchain object from data_graph.
@@ -3,11 +3,13 @@ import json
 import os
 from io import BytesIO
 import re
+import tracemalloc
 
 
 import yaml
 from langchain.base_language import BaseLanguageModel
 from PIL.Image import Image
+from langflow.cache.registry import ObservableLLMCache, cache_registry
 from langflow.utils.logger import logger
 from langflow.chat.config import ChatConfig
 
@@ -42,18 +44,26 @@ def try_setting_streaming_options(langchain_object, websocket):
     # set streaming to True
     # First we need to find the LLM
     llm = None
+    llm_holder = None
     if hasattr(langchain_object, "llm"):
-        llm = langchain_object.llm
+        llm_holder = langchain_object
     elif hasattr(langchain_object, "llm_chain") and hasattr(
         langchain_object.llm_chain, "llm"
     ):
-        llm = langchain_object.llm_chain.llm
+        llm_holder = langchain_object.llm_chain
+    if llm_holder is not None:
+        llm = llm_holder.llm
 
     if isinstance(llm, BaseLanguageModel):
-        if hasattr(llm, "streaming") and isinstance(llm.streaming, bool):
-            llm.streaming = ChatConfig.streaming
-        elif hasattr(llm, "stream") and isinstance(llm.stream, bool):
-            llm.stream = ChatConfig.streaming
+        for attribute in ("streaming", "stream"):
+            value = getattr(llm, attribute, None)
+            if not isinstance(value, bool):
+                continue
+            if value != ChatConfig.streaming:
+                # The LLM may be pooled and shared by other flows (see
+                # langflow.cache.pool), so a copy is changed instead
+                llm_holder.llm = llm.copy(update={attribute: ChatConfig.streaming})
+            break
 
     return langchain_object
 
@@ -76,6 +86,16 @@ def setup_llm_caching():
         logger.warning(f"Could not setup LLM caching. Error: {exc}")
 
 
+def setup_build_memory_tracing():
+    """Start tracing allocations if the memory peak of builds should be reported."""
+
+    from langflow.settings import settings
+
+    if settings.trace_build_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        logger.info("Tracing allocations to measure the memory used by builds")
+
+
 # TODO Rename this here and in `setup_llm_caching`
 def set_langchain_cache(settings):
     import langchain
@@ -85,5 +105,7 @@ def set_langchain_cache(settings):
     cache_class = import_class(f"langchain.cache.{cache_type or settings.cache}")
 
     logger.debug(f"Setting up LLM caching with {cache_class.__name__}")
-    langchain.llm_cache = cache_class()
+    langchain.llm_cache = cache_registry.register(
+        "llm", ObservableLLMCache(cache_class())
+    )
     logger.info(f"LLM caching setup with {cache_class.__name__}")
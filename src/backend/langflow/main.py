@@ -6,8 +6,10 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from langflow.api import router
+from langflow.cache.flow import start_cache_sweeper, stop_cache_sweeper
 from langflow.database.base import create_db_and_tables
-from langflow.interface.utils import setup_llm_caching
+from langflow.interface.initialize.process_pool import shutdown_process_pool
+from langflow.interface.utils import setup_build_memory_tracing, setup_llm_caching
 
 
 def create_app():
@@ -34,6 +36,10 @@ def create_app():
     app.include_router(router)
     app.on_event("startup")(create_db_and_tables)
     app.on_event("startup")(setup_llm_caching)
+    app.on_event("startup")(setup_build_memory_tracing)
+    app.on_event("startup")(start_cache_sweeper)
+    app.on_event("shutdown")(shutdown_process_pool)
+    app.on_event("shutdown")(stop_cache_sweeper)
     return app
 
 
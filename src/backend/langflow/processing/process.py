@@ -1,7 +1,10 @@
+import asyncio
 from pathlib import Path
 from langchain.schema import AgentAction
 import json
 from langflow.interface.run import (
+    abuild_langchain_object_from_plan_with_caching,
+    abuild_langchain_object_with_caching,
     build_langchain_object_with_caching,
     get_memory_key,
     update_memory_keys,
@@ -90,7 +93,44 @@ def process_graph_cached(data_graph: Dict[str, Any], inputs: Optional[dict] = No
     # Load langchain object
     langchain_object = build_langchain_object_with_caching(data_graph)
     logger.debug("Loaded LangChain object")
+    return process_langchain_object(langchain_object, inputs)
 
+
+async def aprocess_graph_cached(
+    data_graph: Dict[str, Any],
+    inputs: Optional[dict] = None,
+    fingerprint: Optional[str] = None,
+):
+    """
+    Same as process_graph_cached, but the graph is built with Graph.abuild
+    and the blocking run happens in a worker thread. The fingerprint of
+    data_graph, if known, is used as its cache key.
+    """
+    langchain_object = await abuild_langchain_object_with_caching(
+        data_graph, fingerprint=fingerprint
+    )
+    logger.debug("Loaded LangChain object")
+    return await asyncio.to_thread(process_langchain_object, langchain_object, inputs)
+
+
+async def aprocess_plan_cached(
+    plan: Dict[str, Any],
+    inputs: Optional[dict] = None,
+    fingerprint: Optional[str] = None,
+):
+    """
+    Same as aprocess_graph_cached, but the graph is loaded from the execution
+    plan compiled when the flow was saved.
+    """
+    langchain_object = await abuild_langchain_object_from_plan_with_caching(
+        plan, fingerprint=fingerprint
+    )
+    logger.debug("Loaded LangChain object")
+    return await asyncio.to_thread(process_langchain_object, langchain_object, inputs)
+
+
+def process_langchain_object(langchain_object: Any, inputs: Optional[dict] = None):
+    """Run a built langchain object and return its result."""
     if langchain_object is None:
         # Raise user facing error
         raise ValueError(
@@ -25,6 +25,44 @@ class Settings(BaseSettings):
     database_url: Optional[str] = None
     cache: str = "InMemoryCache"
     remove_api_keys: bool = False
+    # Per-vertex build cache, 0 disables it
+    vertex_cache_size: int = 100
+    vertex_cache_expiration_time: int = 60 * 60
+    # Seconds between sweeps of the expired cache items, 0 disables them
+    cache_sweep_interval: int = 60
+    # Bytes of the vertex builds of the types or base types listed below kept
+    # on disk across restarts, 0 disables it. Builds must be picklable.
+    artifact_cache_size: int = 0
+    artifact_cache_dir: Optional[str] = None
+    artifact_cache_types: list = [
+        "documentloaders",
+        "textsplitters",
+        "prompts",
+        "FAISS",
+    ]
+    # Estimated bytes of the files and images kept for each chat client, and
+    # seconds after which the objects of an unused client are removed
+    client_cache_max_memory: int = 50 * 1024 * 1024
+    client_cache_expiration_time: int = 60 * 60
+    # Estimated bytes of the built flows kept for the chat, 0 means no limit
+    chat_cache_max_memory: int = 512 * 1024 * 1024
+    # Bytes of the encoded images and tables kept for the chat clients
+    chat_files_max_memory: int = 256 * 1024 * 1024
+    # Bytes of the files kept until their url is downloaded, 0 means no limit
+    pending_downloads_max_memory: int = 64 * 1024 * 1024
+    # Seconds an unused pooled LLM or embedding is kept, 0 disables the pool
+    resource_pool_idle_time: int = 10 * 60
+    # Processes building the CPU-heavy vertex types or base types listed
+    # below, 0 builds them in the web worker like the others
+    process_pool_size: int = 0
+    cpu_heavy_vertex_types: list = ["documentloaders", "textsplitters"]
+    # Trace allocations to report the memory peak of each vertex build
+    trace_build_memory: bool = False
+    # Seconds an async vertex build (streaming builds, /process) may take, 0
+    # means no limit. Sync builds are not limited. Can be set per vertex type
+    # or base type, e.g. {"Chroma": 60, "documentloaders": 120}
+    vertex_build_timeout: int = 0
+    vertex_build_timeouts: dict = {}
 
     @root_validator(pre=True)
     def set_database_url(cls, values):
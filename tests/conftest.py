@@ -1,7 +1,10 @@
+import copy
 import json
 from pathlib import Path
 from typing import AsyncGenerator
 from langflow.api.v1.flows import get_session
+from langflow.cache.pool import resource_pool
+from langflow.cache.vertex import vertex_cache
 
 from langflow.graph.graph.base import Graph
 import pytest
@@ -72,6 +75,19 @@ def basic_graph_data():
         return json.load(f)
 
 
+@pytest.fixture
+def basic_graph_data_with_island(basic_graph_data):
+    """The basic flow plus an LLM -> chain branch the root does not use."""
+    data = basic_graph_data["data"]
+    nodes = {node["id"]: node for node in data["nodes"]}
+    for node_id in ("dndnode_81", "dndnode_82"):
+        island_node = copy.deepcopy(nodes[node_id])
+        island_node["id"] = f"island_{node_id}"
+        data["nodes"].append(island_node)
+    data["edges"].append({"source": "island_dndnode_82", "target": "island_dndnode_81"})
+    return basic_graph_data
+
+
 @pytest.fixture
 def basic_graph():
     return get_graph()
@@ -116,3 +132,52 @@ def client_fixture(session: Session):  #
 
     yield TestClient(app)
     app.dependency_overrides.clear()  #
+
+
+def build_synthetic_graph_data(num_nodes: int = 1000, fan_in: int = 3) -> dict:
+    """Build a layered graph payload where each node depends on its predecessors"""
+    nodes = []
+    edges = []
+    for i in range(num_nodes):
+        nodes.append(
+            {
+                "id": f"node-{i}",
+                "data": {
+                    "type": "SyntheticNode",
+                    "node": {
+                        "base_classes": ["SyntheticNode"],
+                        "template": {
+                            "_type": "SyntheticNode",
+                            "inputs": {
+                                "type": "SyntheticNode",
+                                "required": False,
+                                "list": True,
+                            },
+                        },
+                    },
+                },
+            }
+        )
+        for j in range(max(0, i - fan_in), i):
+            edges.append({"source": f"node-{j}", "target": f"node-{i}"})
+    return {"nodes": nodes, "edges": edges}
+
+
+@pytest.fixture
+def synthetic_graph_data():
+    return build_synthetic_graph_data()
+
+
+@pytest.fixture(name="build_synthetic_graph_data")
+def build_synthetic_graph_data_fixture():
+    return build_synthetic_graph_data
+
+
+@pytest.fixture(autouse=True)
+def clear_vertex_cache():
+    # Built objects would otherwise leak between tests through the caches
+    vertex_cache.clear()
+    resource_pool.clear()
+    yield
+    vertex_cache.clear()
+    resource_pool.clear()
@@ -1,5 +1,36 @@
+import asyncio
+import copy
+import gc
+import hashlib
 import json
-from langflow.graph import Graph
+import os
+import sys
+import threading
+import time
+from langflow.cache.fingerprint import (
+    BLOB_SIZE,
+    blob_digest,
+    compute_fingerprint,
+    compute_flow_fingerprint,
+)
+from langflow.cache.base import CacheStats
+from langflow.cache.disk import DiskCache
+from langflow.cache.flow import InMemoryCache, close_resource
+from langflow.cache.pool import ResourcePool, resource_pool
+from langflow.cache.utils import compute_dict_hash, estimate_size, memoize_dict
+from langflow.cache.registry import ObservableLRUCache, cache_registry
+from langflow.cache import vertex as vertex_module
+from langflow.cache.vertex import (
+    ARTIFACT_KEY_VERSION,
+    artifact_cache,
+    compute_artifact_key,
+    vertex_cache,
+)
+from langflow.graph import Graph, LLMVertex, MemoryVertex, PromptVertex
+from langflow.chat.config import ChatConfig
+from langflow.interface.utils import set_langchain_cache, try_setting_streaming_options
+from langflow.settings import settings
+from langflow.utils.payload import get_root_node
 
 import pytest
 from langflow.interface.run import (
@@ -69,3 +100,433 @@ def test_cache_size_limit(basic_data_graph):
         build_langchain_object_with_caching(modified_data_graph_new_id)
 
     assert len(build_langchain_object_with_caching.cache) == 10
+
+
+def test_vertex_cache_shares_identical_vertices(basic_data_graph):
+    first = Graph.from_payload(copy.deepcopy(basic_data_graph))
+    second = Graph.from_payload(copy.deepcopy(basic_data_graph))
+    first.build()
+    second.build()
+
+    first_llm = next(node for node in first.nodes if isinstance(node, LLMVertex))
+    second_llm = next(node for node in second.nodes if isinstance(node, LLMVertex))
+    assert first_llm.build_key is not None
+    assert first_llm.build_key == second_llm.build_key
+    assert first_llm._built_object is second_llm._built_object
+    assert first_llm.build_key in vertex_cache
+    assert first_llm.build_metrics["cache_hit"] is False
+    assert second_llm.build_metrics["cache_hit"] is True
+
+
+def test_vertex_cache_skips_stateful_vertices(basic_data_graph):
+    graph = Graph.from_payload(basic_data_graph)
+    memory = next(node for node in graph.nodes if isinstance(node, MemoryVertex))
+    root = get_root_node(graph)
+    # Memories hold conversation state, so neither they nor the
+    # vertices built on top of them can be shared
+    assert memory.build_key is None
+    assert root.build_key is None
+
+
+def test_vertex_cache_key_changes_with_template(basic_data_graph):
+    graph = Graph.from_payload(copy.deepcopy(basic_data_graph))
+    changed_data = copy.deepcopy(basic_data_graph)
+    for node in changed_data["nodes"]:
+        if node["data"]["type"] == "OpenAI":
+            node["data"]["node"]["template"]["temperature"]["value"] = 0.1
+    changed = Graph.from_payload(changed_data)
+
+    def llm_key(graph):
+        return next(
+            node for node in graph.nodes if isinstance(node, LLMVertex)
+        ).build_key
+
+    assert llm_key(graph) != llm_key(changed)
+
+
+def test_vertex_cache_disabled(basic_data_graph, monkeypatch):
+    monkeypatch.setattr(settings, "vertex_cache_size", 0)
+    Graph.from_payload(basic_data_graph).build()
+    assert len(vertex_cache) == 0
+
+
+def test_resource_pool_refcounts_and_idle_eviction():
+    pool = ResourcePool(idle_time=None)
+    key = pool.compute_key("llms.OpenAI", {"temperature": 0.7, "stop": None})
+    assert key == pool.compute_key("llms.OpenAI", {"temperature": 0.7})
+    assert key != pool.compute_key("llms.OpenAI", {"temperature": 0.5})
+    assert pool.compute_key("llms.OpenAI", {"callback": object()}) is None
+
+    assert pool.acquire(key) is None
+    value = object()
+    assert pool.add(key, value) is value
+    # A concurrent build of the same object gets the pooled one
+    assert pool.add(key, object()) is value
+    assert pool.acquire(key) is value
+    assert pool.refs(key) == 3
+
+    for _ in range(3):
+        pool.release(key)
+    assert pool.refs(key) == 0
+    assert key in pool
+    pool.idle_time = 0
+    assert pool.evict_idle() == 1
+    assert key not in pool
+
+
+def test_resource_pool_shares_llms_between_flows(basic_data_graph, monkeypatch):
+    # The pool finalizers of graphs left by other tests must not run mid-test
+    gc.collect()
+    resource_pool.clear()
+    # Only the pool can share the LLM here
+    monkeypatch.setattr(settings, "vertex_cache_size", 0)
+    monkeypatch.setattr(resource_pool, "idle_time", None)
+    first = Graph.from_payload(copy.deepcopy(basic_data_graph))
+    second = Graph.from_payload(copy.deepcopy(basic_data_graph))
+    first.build()
+    second.build()
+
+    first_llm = next(node for node in first.nodes if isinstance(node, LLMVertex))
+    second_llm = next(node for node in second.nodes if isinstance(node, LLMVertex))
+    pool_key = first_llm._get_pool_key()
+    assert pool_key == second_llm._get_pool_key()
+    assert first_llm._built_object is second_llm._built_object
+    assert resource_pool.refs(pool_key) == 2
+
+    # Building again does not leak a reference
+    first_llm.build(force=True)
+    assert resource_pool.refs(pool_key) == 2
+
+    del first, second, first_llm, second_llm
+    gc.collect()
+    assert resource_pool.refs(pool_key) == 0
+
+
+def test_streaming_options_do_not_change_pooled_llms(basic_data_graph):
+    root = Graph.from_payload(copy.deepcopy(basic_data_graph)).build()
+    pooled_llm = root.llm
+    assert pooled_llm.streaming is False
+    try_setting_streaming_options(root, None)
+    # Other flows sharing the pooled LLM keep their setting
+    assert pooled_llm.streaming is False
+    assert root.llm is not pooled_llm
+    assert root.llm.streaming is ChatConfig.streaming
+
+
+def test_resource_pool_keeps_different_params_apart(basic_data_graph):
+    other_data_graph = copy.deepcopy(basic_data_graph)
+    llm_data = next(
+        node for node in other_data_graph["nodes"] if node["data"]["type"] == "OpenAI"
+    )
+    llm_data["data"]["node"]["template"]["temperature"]["value"] = 0.1
+    first = Graph.from_payload(copy.deepcopy(basic_data_graph))
+    second = Graph.from_payload(other_data_graph)
+    first.build()
+    second.build()
+
+    first_llm = next(node for node in first.nodes if isinstance(node, LLMVertex))
+    second_llm = next(node for node in second.nodes if isinstance(node, LLMVertex))
+    assert first_llm._built_object is not second_llm._built_object
+
+
+def test_in_memory_cache_evicts_by_weight():
+    evicted = []
+    cache = InMemoryCache(
+        max_weight=10,
+        weigher=len,
+        on_evict=lambda key, value: evicted.append(key),
+    )
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.weight == 8
+    # "a" becomes the most recently used item
+    assert cache.get("a") == "aaaa"
+    cache.set("c", "cccc")
+    assert "b" not in cache
+    assert evicted == ["b"]
+    assert cache.weight == 8
+    assert cache.evictions == 1
+
+    # Values heavier than the cache are not stored
+    cache.set("d", "d" * 11)
+    assert "d" not in cache
+    assert cache.stats() == CacheStats(
+        entries=2,
+        bytes=8,
+        hits=1,
+        misses=0,
+        evictions=1,
+        max_entries=None,
+        max_bytes=10,
+    )
+
+    # Deleting and clearing do not call the eviction callback, evicting does
+    cache.set("c", "c")
+    cache.delete("a")
+    assert cache.evict("c")
+    assert not cache.evict("c")
+    cache.clear()
+    assert evicted == ["b", "c"]
+    assert cache.weight == 0
+
+
+def test_in_memory_cache_closes_expired_items():
+    class Connection:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    connection = Connection()
+    cache = InMemoryCache(expiration_time=0, on_evict=close_resource)
+    cache.set("connection", connection)
+    assert cache.get("connection") is None
+    assert connection.closed
+    assert cache.expirations == 1
+
+
+def test_estimate_size():
+    small = estimate_size({"text": "a"})
+    large = estimate_size({"text": "a" * 10_000})
+    assert large - small > 9_900
+    # Shared objects are counted once
+    shared = ["a" * 10_000]
+    assert estimate_size([shared, shared]) < 2 * estimate_size(shared)
+
+
+def test_memoize_dict_lru_and_ttl():
+    calls = []
+
+    @memoize_dict(maxsize=2, ttl=0.05)
+    def build(data):
+        calls.append(data["id"])
+        return data["id"]
+
+    build({"id": "a"})
+    build({"id": "b"})
+    # A hit makes "a" the most recently used result
+    build({"id": "a"})
+    build({"id": "c"})
+    build({"id": "a"})
+    assert calls == ["a", "b", "c"]
+    time.sleep(0.1)
+    build({"id": "a"})
+    assert calls == ["a", "b", "c", "a"]
+    stats = build.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.expirations) == (
+        2,
+        4,
+        1,
+        1,
+    )
+    assert (stats.entries, stats.max_entries) == (2, 2)
+    assert stats.bytes > 0
+
+
+def test_memoize_dict_single_flight_threads():
+    calls = []
+
+    @memoize_dict(maxsize=2)
+    def build(data):
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    barrier = threading.Barrier(8)
+
+    def run():
+        barrier.wait()
+        results.append(build({"id": "a"}))
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    # The callers that waited for the first one are not hits
+    stats = build.stats()
+    assert stats.misses == 1 and stats.waits > 0
+    assert stats.hits + stats.waits == 7
+
+
+def test_memoize_dict_single_flight_async():
+    calls = []
+
+    @memoize_dict(maxsize=2)
+    async def build(data):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        if data["id"] == "broken":
+            raise ValueError("Broken flow")
+        return object()
+
+    async def run():
+        results = await asyncio.gather(*(build({"id": "a"}) for _ in range(8)))
+        errors = await asyncio.gather(
+            *(build({"id": "broken"}) for _ in range(4)), return_exceptions=True
+        )
+        return results, errors
+
+    results, errors = asyncio.run(run())
+    assert len(calls) == 2
+    assert all(result is results[0] for result in results)
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert build.stats().misses == 2
+    assert build.stats().waits == 10
+    assert build.stats().hits == 0
+
+
+def test_flow_fingerprint_ignores_ui_keys_without_mutating(basic_data_graph):
+    data = copy.deepcopy(basic_data_graph)
+    fingerprint = compute_flow_fingerprint(data)
+    assert data == basic_data_graph
+
+    moved = copy.deepcopy(data)
+    moved["viewport"] = {"x": 1, "y": 2, "zoom": 1}
+    for node in moved["nodes"]:
+        node["position"] = {"x": 0, "y": 0}
+        node["selected"] = True
+    assert compute_flow_fingerprint(moved) == fingerprint
+    assert compute_dict_hash(moved) == fingerprint
+
+    edited = copy.deepcopy(data)
+    edited["nodes"][0]["data"]["node"]["template"]["_type"] = "changed"
+    assert compute_flow_fingerprint(edited) != fingerprint
+
+
+def test_fingerprint_large_strings():
+    blob = "x" * (BLOB_SIZE + 1)
+    refs = sys.getrefcount(blob)
+    first = compute_fingerprint({"file": blob, "other": "y"})
+    assert compute_fingerprint({"other": "y", "file": blob}) == first
+    assert blob_digest(blob) == hashlib.sha256(blob.encode()).hexdigest()
+    # Fingerprinting does not keep file contents alive
+    assert sys.getrefcount(blob) == refs
+    assert compute_fingerprint({"file": blob + "x", "other": "y"}) != first
+    # Values are tagged with their type
+    assert compute_fingerprint(["1"]) != compute_fingerprint([1])
+    assert compute_fingerprint(["a", "b"]) != compute_fingerprint(["ab"])
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path / "artifacts", max_size=None)
+    assert cache.get("a") is None
+    assert cache.set("a", "a" * 1000)
+    assert cache.get("a") == "a" * 1000
+    artifact_size = cache.size()
+
+    cache.max_size = 2 * artifact_size
+    cache.set("b", "b" * 1000)
+    # Make "b" older than "a"
+    past = time.time() - 60
+    os.utime(cache._path("b"), (past, past))
+    cache.set("c", "c" * 1000)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.size() <= cache.max_size
+    assert not list(cache.directory.glob("*.tmp"))
+
+    # Unpicklable objects are not stored, unreadable artifacts are removed
+    assert not cache.set("lock", threading.Lock())
+    cache._path("a").write_bytes(b"not a pickle")
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.stats().evictions == 1
+
+
+def test_artifact_cache_survives_restarts(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_cache, "directory", tmp_path)
+    monkeypatch.setattr(artifact_cache, "max_size", 10 * 1024 * 1024)
+    # A prompt no agent builds
+    nodes = [
+        node
+        for node in get_graph("complex")["nodes"]
+        if node["data"]["type"] == "ZeroShotPrompt"
+    ]
+    data = {"nodes": nodes, "edges": []}
+
+    graph = Graph.from_payload(copy.deepcopy(data))
+    graph.build()
+    prompt = next(node for node in graph.nodes if node.base_type == "prompts")
+    assert prompt.build_metrics["cache_hit"] is False
+    assert len(artifact_cache) == 1
+
+    # A new worker starts with an empty vertex cache
+    vertex_cache.clear()
+    graph = Graph.from_payload(copy.deepcopy(data))
+    asyncio.run(graph.abuild())
+    loaded_prompt = next(node for node in graph.nodes if node.base_type == "prompts")
+    assert loaded_prompt.build_metrics["cache_hit"] is True
+    assert loaded_prompt._built_object == prompt._built_object
+    assert artifact_cache.stats().hits >= 1
+
+
+def test_artifact_cache_skips_what_agents_build(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_cache, "directory", tmp_path)
+    monkeypatch.setattr(artifact_cache, "max_size", 10 * 1024 * 1024)
+    graph = Graph.from_payload(get_graph("complex"))
+    graph.build()
+    prompt = next(node for node in graph.nodes if node.base_type == "prompts")
+    assert prompt.deferred
+    assert prompt._get_artifact_key() is None
+    assert len(artifact_cache) == 0
+
+
+def test_artifact_key_is_versioned(monkeypatch):
+    key = compute_artifact_key("build", {})
+    monkeypatch.setattr(vertex_module, "ARTIFACT_KEY_VERSION", ARTIFACT_KEY_VERSION + 1)
+    assert compute_artifact_key("build", {}) != key
+
+
+def test_observable_lru_cache_counts():
+    cache = ObservableLRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    assert cache.get("missing") is None
+    cache["c"] = 3
+    assert "b" not in cache
+    assert cache.evict("c")
+    assert not cache.evict("c")
+    stats = cache.stats()
+    assert (stats.entries, stats.hits, stats.misses, stats.evictions) == (1, 1, 1, 1)
+
+
+def test_llm_cache_is_observable(monkeypatch):
+    import langchain
+
+    monkeypatch.setattr(langchain, "llm_cache", None)
+    monkeypatch.setattr(settings, "cache", "InMemoryCache")
+    set_langchain_cache(settings)
+    llm_cache = langchain.llm_cache
+    assert cache_registry.get("llm") is llm_cache
+    assert llm_cache.lookup("prompt", "llm") is None
+    llm_cache.update("prompt", "llm", [])
+    assert llm_cache.lookup("prompt", "llm") == []
+    stats = llm_cache.stats()
+    assert (stats.entries, stats.hits, stats.misses) == (1, 1, 1)
+
+
+def test_vertex_cache_key_covers_agent_tools():
+    data = get_graph("complex")
+
+    def build_prompt(tool_name):
+        flow_data = copy.deepcopy(data)
+        for node in flow_data["nodes"]:
+            if node["data"]["type"] == "PythonFunctionTool":
+                node["data"]["node"]["template"]["name"]["value"] = tool_name
+        graph = Graph.from_payload(flow_data)
+        graph.build()
+        return next(node for node in graph.nodes if isinstance(node, PromptVertex))
+
+    first = build_prompt("Uppercase")
+    second = build_prompt("Lowercase")
+    # The agent builds its prompt from its tools, so the prompts differ
+    assert first.build_key is not None
+    assert first.build_key != second.build_key
+    assert "Uppercase" in first._built_object.template
+    assert "Lowercase" in second._built_object.template
+    assert "Uppercase:" not in second._built_object.template
@@ -1,7 +1,10 @@
+import asyncio
+import time
 from io import StringIO
 
 import pandas as pd
 import pytest
+from langflow.cache.files import serialize_file
 from langflow.cache.manager import CacheManager
 from PIL import Image
 
@@ -59,7 +62,11 @@ def test_cache_manager_add_pandas(cache_manager):
         cached_df = cache_manager.get("test_df")
         assert cached_df["type"] == "pandas"
         assert cached_df["extension"] == "csv"
-        read_df = pd.read_csv(StringIO(cached_df["obj"]), index_col=0)
+        # The DataFrame is kept as is and serialized when it is sent
+        assert cached_df["obj"] is df
+        data, media_type, _ = serialize_file(cached_df["obj"])
+        assert media_type == "text/csv"
+        read_df = pd.read_csv(StringIO(data.decode("utf-8")), index_col=0)
         pd.testing.assert_frame_equal(df, read_df)
 
 
@@ -80,3 +87,93 @@ def test_cache_manager_get_last(cache_manager):
         cache_manager.add("baz", "qux", "string")
         last_item = cache_manager.get_last()
         assert last_item == {"obj": "qux", "type": "string", "extension": "str"}
+
+
+def test_cache_manager_concurrent_clients():
+    cache_manager = CacheManager()
+
+    async def session(client_id):
+        with cache_manager.set_client_id(client_id):
+            for i in range(5):
+                cache_manager.add(f"obj{i}", f"{client_id}-{i}", "string")
+                await asyncio.sleep(0)
+                assert cache_manager.current_client_id == client_id
+                assert cache_manager.get_last()["obj"] == f"{client_id}-{i}"
+            # Threads started with asyncio.to_thread see the same client
+            return await asyncio.to_thread(lambda: cache_manager.get("obj4")["obj"])
+
+    async def main():
+        return await asyncio.gather(*(session(f"client{i}") for i in range(3)))
+
+    assert asyncio.run(main()) == ["client0-4", "client1-4", "client2-4"]
+    assert cache_manager.current_client_id is None
+    assert cache_manager.stats().entries == 15
+
+
+def test_cache_manager_without_client_does_not_store(cache_manager):
+    cache_manager.add("foo", "bar", "string")
+    assert cache_manager.stats().entries == 0
+
+
+def test_cache_manager_client_quota():
+    cache_manager = CacheManager(max_client_bytes=50_000)
+    with cache_manager.set_client_id("client1"):
+        for i in range(5):
+            cache_manager.add_image(f"image{i}", Image.new("RGB", (100, 50)))
+        # Each image weighs 15000 bytes, the oldest ones were evicted
+        assert [name for name in cache_manager.current_cache] == [
+            "image2",
+            "image3",
+            "image4",
+        ]
+        # The newest object is kept even if it exceeds the quota
+        cache_manager.add_image("large", Image.new("RGB", (1000, 1000)))
+        assert list(cache_manager.current_cache) == ["large"]
+    stats = cache_manager.stats()
+    assert stats.entries == 1
+    assert stats.evictions == 5
+    assert stats.bytes == 3_000_000
+
+
+def test_cache_manager_removes_unused_clients():
+    cache_manager = CacheManager(client_ttl=0.05)
+    with cache_manager.set_client_id("client1"):
+        cache_manager.add("foo", "bar", "string")
+    with cache_manager.set_client_id("client2"):
+        cache_manager.add("foo", "bar", "string")
+        time.sleep(0.1)
+        # client2 is in use, client1 was not used for longer than the TTL
+        assert cache_manager.cleanup() == 1
+    assert cache_manager.stats().expirations == 1
+    with cache_manager.set_client_id("client2"):
+        assert cache_manager.get("foo")["obj"] == "bar"
+
+
+def test_chat_manager_disconnect_clears_client_objects():
+    from langflow.chat.manager import ChatManager
+
+    chat_manager = ChatManager()
+    with chat_manager.cache_manager.set_client_id("client1"):
+        chat_manager.cache_manager.add("foo", "bar", "string")
+    chat_manager.disconnect("client1")
+    assert not chat_manager.cache_manager.evict("client1")
+
+
+def test_chat_manager_removes_unused_histories(monkeypatch):
+    from langflow.api.v1.schemas import ChatMessage
+    from langflow.chat.manager import ChatManager
+
+    chat_manager = ChatManager()
+    monkeypatch.setattr(chat_manager.cache_manager, "client_ttl", 0.05)
+    for client_id in ("client1", "client2"):
+        chat_manager.chat_history.add_message(client_id, ChatMessage(message="hi"))
+    with chat_manager.cache_manager.set_client_id("client1"):
+        chat_manager.cache_manager.add("foo", "bar", "string")
+    chat_manager.active_connections["client2"] = object()
+    time.sleep(0.1)
+    # client2 is connected, client1 left longer than the TTL ago
+    assert chat_manager.cleanup() == 1
+    assert chat_manager.chat_history.get_history("client1") == []
+    assert "client1" not in chat_manager.chat_history.history
+    assert len(chat_manager.chat_history.get_history("client2")) == 1
+    assert not chat_manager.cache_manager.evict("client1")
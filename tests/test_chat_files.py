@@ -0,0 +1,197 @@
+import asyncio
+import base64
+import hashlib
+
+import pandas as pd
+import pytest
+from langflow.api.v1.schemas import ChatResponse, FileDelivery, FileResponse
+from langflow.cache.files import (
+    file_store,
+    pending_downloads,
+    serialize_file,
+    store_file,
+)
+from langflow.chat.manager import ChatManager
+from PIL import Image
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(("json", data))
+
+    async def send_bytes(self, data):
+        self.sent.append(("bytes", data))
+
+
+@pytest.fixture
+def chat_manager():
+    chat_manager = ChatManager()
+    yield chat_manager
+    chat_manager.cache_manager.detach(chat_manager.update)
+    file_store.clear()
+    pending_downloads.clear()
+
+
+def connect(chat_manager, client_id, files, table_format="csv"):
+    websocket = FakeWebSocket()
+    chat_manager.active_connections[client_id] = websocket
+    chat_manager.file_options[client_id] = (files, table_format)
+    return websocket
+
+
+def test_store_file_is_content_addressed():
+    image = Image.new("RGB", (10, 10), color="red")
+    chat_file = store_file(image)
+    data, media_type, extension = serialize_file(image)
+    assert chat_file.id == hashlib.sha256(data).hexdigest()
+    assert (chat_file.media_type, chat_file.extension) == (media_type, extension)
+    # The same content is stored once
+    assert store_file(image.copy()) is chat_file
+    file_store.clear()
+
+
+def test_serialize_file_falls_back_to_csv_without_pyarrow():
+    df = pd.DataFrame({"a": [1, 2]})
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        assert serialize_file(df, "parquet")[1] == "text/csv"
+    else:
+        assert serialize_file(df, "parquet")[1] == "application/vnd.apache.parquet"
+    with pytest.raises(ValueError):
+        serialize_file(object())
+
+
+def test_file_payload_inline(chat_manager):
+    connect(chat_manager, "client1", FileDelivery.INLINE)
+    image = Image.new("RGB", (10, 10), color="red")
+    payload, frame = chat_manager.file_payload(
+        "client1", FileResponse(data=image, data_type="image")
+    )
+    assert frame is None
+    assert base64.b64decode(payload["data"]) == serialize_file(image)[0]
+    payload, _ = chat_manager.file_payload(
+        "client1", FileResponse(data=pd.DataFrame({"a": [1]}), data_type="pandas")
+    )
+    assert payload["data"] == ",a\n0,1\n"
+
+
+def test_file_payload_url(chat_manager, client):
+    connect(chat_manager, "client1", FileDelivery.URL)
+    image = Image.new("RGB", (10, 10), color="red")
+    payload, frame = chat_manager.file_payload(
+        "client1", FileResponse(data=image, data_type="image")
+    )
+    assert frame is None
+    assert payload["data"] is None
+    response = client.get(payload["url"])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content == serialize_file(image)[0]
+    assert "max-age=31536000" in response.headers["cache-control"]
+    assert client.get("api/v1/files/unknown").status_code == 404
+
+
+def test_file_url_outlives_file_store_eviction(chat_manager, client):
+    connect(chat_manager, "client1", FileDelivery.URL)
+    image = Image.new("RGB", (10, 10), color="red")
+    payload, _ = chat_manager.file_payload(
+        "client1", FileResponse(data=image, data_type="image")
+    )
+    file_store.clear()
+    response = client.get(payload["url"])
+    assert response.status_code == 200
+    assert response.content == serialize_file(image)[0]
+    # Once downloaded, the file is back in file_store like any other
+    assert payload["file_id"] not in pending_downloads
+    assert payload["file_id"] in file_store
+
+
+def test_files_are_serialized_once(chat_manager, monkeypatch):
+    connect(chat_manager, "client1", FileDelivery.BINARY)
+    calls = []
+
+    def to_csv(self, *args, **kwargs):
+        calls.append(1)
+        return "a\n1\n"
+
+    monkeypatch.setattr(pd.DataFrame, "to_csv", to_csv)
+    file_response = FileResponse(data=pd.DataFrame({"a": [1]}), data_type="pandas")
+    for _ in range(3):
+        payload, frame = chat_manager.file_payload("client1", file_response)
+    assert frame == b"a\n1\n"
+    assert payload["file_id"] == hashlib.sha256(frame).hexdigest()
+    assert len(calls) == 1
+
+
+def test_send_json_binary_frames_follow_message(chat_manager):
+    websocket = connect(chat_manager, "client1", FileDelivery.BINARY)
+    image = Image.new("RGB", (10, 10), color="red")
+    response = ChatResponse(
+        message="done",
+        intermediate_steps="",
+        type="end",
+        files=[FileResponse(data=image, data_type="image")],
+    )
+    asyncio.run(chat_manager.send_json("client1", response))
+    (kind, payload), (frame_kind, frame) = websocket.sent
+    assert kind == "json" and frame_kind == "bytes"
+    assert payload["files"][0]["data"] is None
+    assert payload["files"][0]["media_type"] == "image/png"
+    assert frame == serialize_file(image)[0]
+    # The history keeps the image, not its encoding
+    assert response.files[0].data is image
+
+
+def test_added_dataframe_reaches_the_client(chat_manager):
+    websocket = connect(chat_manager, "client1", FileDelivery.INLINE)
+    df = pd.DataFrame({"a": [1]})
+    with chat_manager.cache_manager.set_client_id("client1"):
+        chat_manager.cache_manager.add_pandas("table", df)
+    file_response = chat_manager.chat_history.get_history("client1")[-1]
+    assert file_response.data is df
+    asyncio.run(chat_manager.send_json("client1", file_response))
+    assert websocket.sent[0][1]["data"] == ",a\n0,1\n"
+
+
+def test_history_does_not_keep_released_objects(chat_manager, monkeypatch):
+    monkeypatch.setattr(chat_manager.cache_manager, "max_client_bytes", 20_000)
+    connect(chat_manager, "client1", FileDelivery.INLINE)
+    images = [Image.new("RGB", (100, 50), color=color) for color in ("red", "blue")]
+    with chat_manager.cache_manager.set_client_id("client1"):
+        for i, image in enumerate(images):
+            chat_manager.cache_manager.add_image(f"image{i}", image)
+    first, second = chat_manager.chat_history.get_history("client1")
+    # The quota evicted the first image, the history keeps its file only
+    assert first.data is None
+    assert second.data is images[1]
+    payload, _ = chat_manager.file_payload("client1", first)
+    assert base64.b64decode(payload["data"]) == serialize_file(images[0])[0]
+
+    chat_manager.disconnect("client1")
+    assert second.data is None
+    connect(chat_manager, "client1", FileDelivery.INLINE)
+    payload, _ = chat_manager.file_payload("client1", second)
+    assert base64.b64decode(payload["data"]) == serialize_file(images[1])[0]
+    # Once the file is evicted too, the history sends no data
+    file_store.clear()
+    payload, frame = chat_manager.file_payload("client1", second)
+    assert payload["data"] is None and frame is None
+
+
+def test_pending_downloads_are_bounded(chat_manager, monkeypatch):
+    connect(chat_manager, "client1", FileDelivery.URL)
+    images = [Image.new("RGB", (10, 10), color=color) for color in ("red", "blue")]
+    sizes = [len(serialize_file(image)[0]) for image in images]
+    monkeypatch.setattr(pending_downloads, "max_weight", max(sizes))
+    payloads = [
+        chat_manager.file_payload(
+            "client1", FileResponse(data=image, data_type="image")
+        )[0]
+        for image in images
+    ]
+    assert payloads[0]["file_id"] not in pending_downloads
+    assert payloads[1]["file_id"] in pending_downloads
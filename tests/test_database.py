@@ -3,12 +3,16 @@ import pytest
 
 from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
+from sqlmodel import select
 
 from fastapi.testclient import TestClient
 from fastapi.encoders import jsonable_encoder
 
 from langflow.api.v1.schemas import FlowListCreate
+from langflow.cache.fingerprint import compute_flow_fingerprint
 from langflow.database.models.flow import Flow, FlowCreate, FlowUpdate
+from langflow.database.models.flow_plan import FlowPlan
+from langflow.graph import Graph
 
 from langflow.database.models.flow_style import (
     FlowStyleCreate,
@@ -338,3 +342,117 @@ def test_delete_flow_style(client: TestClient):
 
     response = client.get(f"api/v1/flow_styles/{created_flow_style.id}")
     assert response.status_code == 404
+
+
+def test_flow_plan_is_compiled_on_save(
+    client: TestClient, session: Session, json_flow: str
+):
+    data = json.loads(json_flow)["data"]
+    flow = FlowCreate(name="Test Flow", description="description", data=data)
+    response = client.post("api/v1/flows/", json=flow.dict())
+    flow_id = response.json()["id"]
+
+    db_flow = session.get(Flow, UUID(flow_id))
+    assert db_flow.plan is not None
+    assert len(db_flow.plan.plan["vertices"]) == len(Graph.from_payload(data).nodes)
+
+    # A flow that cannot be loaded is still saved, without a plan
+    broken_data = {"nodes": [], "edges": [{"source": "a", "target": "b"}]}
+    response = client.patch(f"api/v1/flows/{flow_id}", json={"data": broken_data})
+    assert response.status_code == 200
+    session.refresh(db_flow)
+    assert db_flow.plan is None
+
+    response = client.delete(f"api/v1/flows/{flow_id}")
+    assert response.status_code == 200
+    assert session.exec(select(FlowPlan)).all() == []
+
+
+def test_flow_fingerprint_is_stored_on_save(
+    client: TestClient, session: Session, json_flow: str
+):
+    data = json.loads(json_flow)["data"]
+    flow = FlowCreate(name="Test Flow", description="description", data=data)
+    response = client.post("api/v1/flows/", json=flow.dict())
+    flow_id = response.json()["id"]
+
+    db_flow = session.get(Flow, UUID(flow_id))
+    assert db_flow.plan.fingerprint == compute_flow_fingerprint(data)
+
+    fingerprint = db_flow.plan.fingerprint
+    data["nodes"][0]["data"]["node"]["description"] = "changed"
+    response = client.patch(f"api/v1/flows/{flow_id}", json={"data": data})
+    assert response.status_code == 200
+    session.refresh(db_flow)
+    assert db_flow.plan.fingerprint == compute_flow_fingerprint(data)
+    assert db_flow.plan.fingerprint != fingerprint
+
+
+def test_process_recompiles_stale_plan(
+    client: TestClient, session: Session, json_flow: str, monkeypatch
+):
+    from langflow.api.v1 import endpoints
+    from langflow.graph.graph.constants import PLAN_VERSION
+
+    data = json.loads(json_flow)["data"]
+    flow = FlowCreate(name="Test Flow", description="description", data=data)
+    response = client.post("api/v1/flows/", json=flow.dict())
+    flow_id = response.json()["id"]
+    db_flow = session.get(Flow, UUID(flow_id))
+    # A plan compiled by another version of langflow
+    db_flow.plan.plan = {**db_flow.plan.plan, "version": PLAN_VERSION - 1}
+    session.add(db_flow.plan)
+    session.commit()
+
+    processed = []
+
+    async def aprocess_graph_cached(graph_data, inputs=None, fingerprint=None):
+        processed.append(graph_data)
+        return {"result": "ok"}
+
+    async def aprocess_plan_cached(plan, inputs=None, fingerprint=None):
+        raise AssertionError("The stale plan was used")
+
+    monkeypatch.setattr(endpoints, "aprocess_graph_cached", aprocess_graph_cached)
+    monkeypatch.setattr(endpoints, "aprocess_plan_cached", aprocess_plan_cached)
+    response = client.post(f"api/v1/process/{flow_id}", json={"inputs": {}})
+    assert response.status_code == 200
+    assert response.json()["result"] == {"result": "ok"}
+    assert processed == [data]
+    session.refresh(db_flow)
+    assert db_flow.plan.plan["version"] == PLAN_VERSION
+
+
+def test_process_stale_plan_with_tweaks(
+    client: TestClient, session: Session, json_flow: str, monkeypatch
+):
+    from langflow.api.v1 import endpoints
+    from langflow.graph.graph.constants import PLAN_VERSION
+
+    data = json.loads(json_flow)["data"]
+    flow = FlowCreate(name="Test Flow", description="description", data=data)
+    response = client.post("api/v1/flows/", json=flow.dict())
+    flow_id = response.json()["id"]
+    db_flow = session.get(Flow, UUID(flow_id))
+    db_flow.plan.plan = {**db_flow.plan.plan, "version": PLAN_VERSION - 1}
+    session.add(db_flow.plan)
+    session.commit()
+
+    processed = []
+
+    async def aprocess_graph_cached(graph_data, inputs=None, fingerprint=None):
+        processed.append(graph_data)
+        return {"result": "ok"}
+
+    monkeypatch.setattr(endpoints, "aprocess_graph_cached", aprocess_graph_cached)
+    tweaks = {"dndnode_82": {"model_name": "tweaked-model"}}
+    response = client.post(
+        f"api/v1/process/{flow_id}", json={"inputs": {}, "tweaks": tweaks}
+    )
+    assert response.status_code == 200
+    # The tweaks reach this request only
+    assert "tweaked-model" in json.dumps(processed[0])
+    session.refresh(db_flow)
+    assert db_flow.plan.plan["version"] == PLAN_VERSION
+    assert "tweaked-model" not in json.dumps(db_flow.plan.plan)
+    assert "tweaked-model" not in json.dumps(db_flow.data)
@@ -1,5 +1,8 @@
 import pytest
 from fastapi.testclient import TestClient
+from langflow.cache.flow import InMemoryCache, close_resource
+from langflow.cache.registry import cache_registry
+from langflow.cache.vertex import vertex_cache
 from langflow.interface.tools.constants import CUSTOM_TOOLS
 
 
@@ -121,3 +124,71 @@ def test_various_prompts(client, prompt, expected_input_variables):
     assert response.json() == {
         "input_variables": expected_input_variables,
     }
+
+
+def test_post_validate_graph(client: TestClient, basic_graph_data):
+    response = client.post("api/v1/validate/graph", json=basic_graph_data)
+    assert response.status_code == 200
+    assert response.json()["valid"] is True
+    assert response.json()["root"] is not None
+    assert response.json()["errors"] == []
+
+    basic_graph_data["data"]["edges"] = []
+    response = client.post("api/v1/validate/graph", json=basic_graph_data)
+    assert response.status_code == 200
+    assert response.json()["valid"] is False
+    assert any(
+        error["message"].startswith("Required input")
+        for error in response.json()["errors"]
+    )
+
+    basic_graph_data["data"]["edges"] = ["not an edge"]
+    response = client.post("api/v1/validate/graph", json=basic_graph_data)
+    assert response.status_code == 422
+
+
+def test_cache_stats(client: TestClient):
+    response = client.get("api/v1/cache/stats")
+    assert response.status_code == 200
+    caches = response.json()["caches"]
+    for name in ["builds", "chat", "client_objects", "flows", "resources", "vertices"]:
+        assert name in caches
+        assert set(caches[name]) >= {
+            "entries",
+            "bytes",
+            "hits",
+            "misses",
+            "evictions",
+            "expirations",
+        }
+
+
+def test_cache_clear_and_evict(client: TestClient):
+    vertex_cache.set("key", "value")
+    vertex_cache.set("other", "value")
+    response = client.delete("api/v1/cache/vertices/key")
+    assert response.status_code == 200
+    assert "key" not in vertex_cache
+    assert client.delete("api/v1/cache/vertices/key").status_code == 404
+
+    response = client.post("api/v1/cache/vertices/clear")
+    assert response.status_code == 200
+    assert len(vertex_cache) == 0
+
+    assert client.post("api/v1/cache/unknown/clear").status_code == 404
+
+
+def test_cache_evict_closes_resources(client: TestClient, monkeypatch):
+    class Connection:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    cache = InMemoryCache(on_evict=close_resource)
+    monkeypatch.setitem(cache_registry._caches, "connections", cache)
+    connection = Connection()
+    cache.set("connection", connection)
+    response = client.delete("api/v1/cache/connections/connection")
+    assert response.status_code == 200
+    assert connection.closed
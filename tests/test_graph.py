@@ -1,8 +1,16 @@
+import asyncio
+import copy
+import json
 import os
+import threading
+import time
+import tracemalloc
 from pathlib import Path
 from typing import Type, Union
 from langflow.graph.edge.base import Edge
+from langflow.graph.edge.compatibility import TypeCompatibilityIndex, type_index
 from langflow.graph.vertex.base import Vertex
+from langflow.graph.vertex.metrics import count_cpu_time, measure_build
 
 import pytest
 from langchain.chains.base import Chain
@@ -18,7 +26,9 @@ from langflow.graph.vertex.types import (
     ToolVertex,
     WrapperVertex,
 )
+from langflow.interface.initialize import loading
 from langflow.processing.process import get_result_and_thought
+from langflow.settings import settings
 from langflow.utils.payload import get_root_node
 
 # Test cases for the graph module
@@ -173,6 +183,45 @@ def test_get_node(basic_graph):
     assert node.id == node_id
 
 
+def test_graph_adjacency_matches_edges(synthetic_graph_data):
+    """Test that the adjacency index agrees with a scan of the edge list"""
+    graph = Graph.from_payload(synthetic_graph_data)
+    assert len(graph.nodes) == 1000
+    for node in graph.nodes:
+        assert graph.get_node(node.id) is node
+        assert graph.get_nodes_with_target(node) == [
+            edge.source for edge in graph.edges if edge.target == node
+        ]
+        assert graph.get_nodes_with_source(node) == [
+            edge.target for edge in graph.edges if edge.source == node
+        ]
+    assert graph.get_node("missing") is None
+
+
+def test_synthetic_graph_lookups_benchmark(synthetic_graph_data):
+    """Neighbour queries on a 1k-node graph should not scale with the edge count"""
+    graph = Graph.from_payload(synthetic_graph_data)
+
+    def indexed():
+        for node in graph.nodes:
+            graph.get_node(node.id)
+            graph.get_nodes_with_target(node)
+
+    def linear():
+        # The lookups before the adjacency index: a scan per query
+        for node in graph.nodes:
+            next(vertex for vertex in graph.nodes if vertex.id == node.id)
+            [edge.source for edge in graph.edges if edge.target == node]
+
+    def timed(lookups):
+        start = time.perf_counter()
+        lookups()
+        return time.perf_counter() - start
+
+    # The index is orders of magnitude faster, the margin absorbs slow runners
+    assert min(timed(indexed) for _ in range(3)) * 5 < timed(linear)
+
+
 def test_build_nodes(basic_graph):
     """Test building nodes"""
 
@@ -260,6 +309,205 @@ def assert_agent_was_built(graph):
     assert isinstance(result, Chain)
 
 
+def test_parallel_build(basic_graph, complex_graph):
+    """Test building the graph layer by layer on a thread pool"""
+    for graph in (basic_graph, complex_graph):
+        result = graph.build(parallel=True, max_workers=4)
+        assert isinstance(result, Chain)
+        assert all(node._built for node in graph.nodes)
+
+
+def test_parallel_build_defers_agent_prompt(complex_graph):
+    """The ZeroShotPrompt must still receive the agent's tools"""
+    prompt_node = get_node_by_type(complex_graph, PromptVertex)
+    assert prompt_node in complex_graph._get_deferred_vertices()
+    complex_graph.build(parallel=True)
+    tool_names = [tool.name for tool in prompt_node.params["tools"]]
+    assert tool_names
+    assert all(name in prompt_node._built_object.template for name in tool_names)
+
+
+def test_abuild(basic_graph, complex_graph):
+    """Test building the graph through the async path"""
+    for graph in (basic_graph, complex_graph):
+        result = asyncio.run(graph.abuild())
+        assert isinstance(result, Chain)
+
+
+def test_abuild_parallel(complex_graph):
+    """Test building the layers concurrently on the event loop"""
+    result = asyncio.run(complex_graph.abuild(parallel=True))
+    assert isinstance(result, Chain)
+    assert all(node._built for node in complex_graph.nodes)
+
+
+def test_abuild_does_not_block_event_loop(basic_graph, monkeypatch):
+    """Blocking instantiation should run in an executor"""
+    from langflow.interface.initialize import loading
+
+    instantiate_class = loading.instantiate_class
+
+    def slow_instantiate_class(*args, **kwargs):
+        time.sleep(0.05)
+        return instantiate_class(*args, **kwargs)
+
+    monkeypatch.setattr(loading, "instantiate_class", slow_instantiate_class)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await basic_graph.abuild()
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 0
+
+
+def test_incremental_rebuild(basic_graph_data):
+    """Only the changed vertex and its dependents should be rebuilt"""
+    previous = Graph.from_payload(copy.deepcopy(basic_graph_data))
+    previous.build()
+
+    new_data = copy.deepcopy(basic_graph_data)
+    memory = next(
+        node
+        for node in new_data["data"]["nodes"]
+        if node["data"]["type"] == "ConversationBufferMemory"
+    )
+    memory["data"]["node"]["template"]["ai_prefix"]["value"] = "Assistant"
+
+    graph = Graph.from_payload(new_data)
+    changed = {node.id for node in graph.get_changed_vertices(previous)}
+    root = get_root_node(graph)
+    assert changed == {memory["id"], root.id}
+
+    graph = Graph.from_previous(previous, new_data)
+    llm_node = get_node_by_type(graph, LLMVertex)
+    assert llm_node._built
+    assert llm_node._built_object is get_node_by_type(previous, LLMVertex)._built_object
+    assert not root._built
+    result = graph.build()
+    assert result.memory.ai_prefix == "Assistant"
+
+
+def test_incremental_rebuild_of_agent_tools():
+    """The prompt and chain an agent builds are rebuilt when a tool changes"""
+    with open(pytest.COMPLEX_EXAMPLE_PATH, "r") as f:
+        data = json.load(f)["data"]
+    previous = Graph.from_payload(copy.deepcopy(data))
+    previous.build()
+
+    new_data = copy.deepcopy(data)
+    for node in new_data["nodes"]:
+        if node["data"]["type"] == "PythonFunctionTool":
+            node["data"]["node"]["template"]["name"]["value"] = "Lowercase"
+    graph = Graph.from_previous(previous, new_data)
+    changed = graph.get_changed_vertices(previous)
+    assert get_node_by_type(graph, PromptVertex) in changed
+    assert get_node_by_type(graph, ChainVertex) in changed
+    graph.build()
+    prompt = get_node_by_type(graph, PromptVertex)._built_object
+    assert "Lowercase:" in prompt.template
+    assert "Uppercase:" not in prompt.template
+
+
+def test_incremental_rebuild_unchanged(basic_graph_data):
+    """An identical payload reuses every vertex"""
+    previous = Graph.from_payload(copy.deepcopy(basic_graph_data))
+    built = previous.build()
+    graph = Graph.from_previous(previous, copy.deepcopy(basic_graph_data))
+    assert all(node._built for node in graph.nodes)
+    assert graph.build() is built
+
+
+def test_build_order(complex_graph):
+    """Prompts and chains of an agent come right after the agent"""
+    order = complex_graph.build_order()
+    assert len(order) == len(complex_graph.nodes)
+    assert set(order) == set(complex_graph.nodes)
+    agent_node = get_node_by_type(complex_graph, AgentVertex)
+    prompt_node = get_node_by_type(complex_graph, PromptVertex)
+    assert order.index(agent_node) < order.index(prompt_node)
+    deferred = complex_graph._get_deferred_vertices()
+    for vertex in order:
+        if vertex in deferred:
+            assert order.index(deferred[vertex]) < order.index(vertex)
+            continue
+        for source in complex_graph.get_nodes_with_target(vertex):
+            if source not in deferred:
+                assert order.index(source) < order.index(vertex)
+
+
+def test_build_order_builds_each_vertex_once(complex_graph, monkeypatch):
+    from langflow.interface.initialize import loading
+
+    built_types = []
+    instantiate_class = loading.instantiate_class
+
+    def counting_instantiate_class(node_type, base_type, params):
+        built_types.append(node_type)
+        return instantiate_class(node_type, base_type, params)
+
+    monkeypatch.setattr(loading, "instantiate_class", counting_instantiate_class)
+    for vertex in complex_graph.build_order():
+        vertex.build()
+        assert vertex.build_start_time <= vertex.build_end_time
+    assert sorted(built_types) == sorted(
+        vertex.vertex_type for vertex in complex_graph.nodes
+    )
+    assert isinstance(get_root_node(complex_graph).build(), Chain)
+
+
+def test_topological_layers(synthetic_graph_data):
+    """Every vertex should come after all of its sources"""
+    graph = Graph.from_payload(synthetic_graph_data)
+    layers = graph.topological_layers()
+    layer_index = {
+        node.id: index for index, layer in enumerate(layers) for node in layer
+    }
+    assert len(layer_index) == len(graph.nodes)
+    for edge in graph.edges:
+        assert layer_index[edge.source.id] < layer_index[edge.target.id]
+
+
+def test_sort_vertices_deep_chain(build_synthetic_graph_data):
+    """A long dependency chain must not hit the recursion limit"""
+    graph = Graph.from_payload(build_synthetic_graph_data(5000, fan_in=1))
+    order, waves = graph.sort_vertices()
+    assert [node.id for node in order] == [f"node-{i}" for i in range(5000)]
+    assert len(waves) == 5000
+    assert graph.topological_sort() == order
+
+
+def test_sort_vertices_waves(synthetic_graph_data):
+    graph = Graph.from_payload(synthetic_graph_data)
+    order, waves = graph.sort_vertices()
+    assert order == [node for wave in waves for node in wave]
+    assert waves == graph.topological_layers()
+
+
+def test_sort_vertices_reports_cycle(build_synthetic_graph_data):
+    graph_data = build_synthetic_graph_data(6, fan_in=1)
+    graph_data["edges"].append({"source": "node-4", "target": "node-2"})
+    graph = Graph.from_payload(graph_data)
+    with pytest.raises(ValueError) as exc_info:
+        graph.topological_sort()
+    message, cycle = str(exc_info.value).split(": ")
+    assert message == "Graph contains a cycle, cannot perform topological sort"
+    cycle_ids = cycle.split(" -> ")
+    assert cycle_ids[0] == cycle_ids[-1]
+    assert set(cycle_ids) == {"node-2", "node-3", "node-4"}
+    for source, target in zip(cycle_ids, cycle_ids[1:]):
+        assert {"source": source, "target": target} in graph_data["edges"]
+
+
 def test_agent_node_build(complex_graph):
     agent_node = get_node_by_type(complex_graph, AgentVertex)
     assert agent_node is not None
@@ -352,3 +600,253 @@ def test_get_result_and_thought(basic_graph):
     # Get the result and thought
     result = get_result_and_thought(langchain_object, message)
     assert isinstance(result, dict)
+
+
+def test_plan_round_trip(complex_graph):
+    plan = complex_graph.to_plan()
+    # The plan is stored in a JSON column
+    plan = json.loads(json.dumps(plan))
+    graph = Graph.from_plan(plan)
+
+    assert [type(node) for node in graph.nodes] == [
+        type(node) for node in complex_graph.topological_sort()
+    ]
+    assert [node.id for node in graph.topological_sort()] == [
+        node.id for node in complex_graph.topological_sort()
+    ]
+    for node in graph.nodes:
+        original = complex_graph.get_node(node.id)
+        assert node.vertex_type == original.vertex_type
+        assert node.fingerprint == original.fingerprint
+        assert node.build_key == original.build_key
+        assert node.params.keys() == original.params.keys()
+    assert {(e.source.id, e.target.id, e.matched_type) for e in graph.edges} == {
+        (e.source.id, e.target.id, e.matched_type) for e in complex_graph.edges
+    }
+
+
+def test_build_from_plan(basic_graph):
+    graph = Graph.from_plan(basic_graph.to_plan())
+    assert isinstance(graph.build(), Chain)
+
+
+def test_plan_requires_unbuilt_graph(basic_graph):
+    basic_graph.build()
+    with pytest.raises(ValueError):
+        basic_graph.to_plan()
+
+
+def test_plan_version_is_checked(basic_graph):
+    plan = basic_graph.to_plan()
+    plan["version"] = -1
+    with pytest.raises(ValueError):
+        Graph.from_plan(plan)
+
+
+def test_validate_payload_does_not_instantiate(basic_graph_data, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("validation must not instantiate nodes")
+
+    monkeypatch.setattr(loading, "instantiate_class", fail)
+    result = Graph.validate_payload(basic_graph_data)
+    assert result["valid"]
+    assert result["errors"] == []
+    root = get_root_node(Graph.from_payload(basic_graph_data["data"]))
+    assert result["root"] == root.id
+
+
+def test_validate_payload_reports_every_error(basic_graph_data):
+    data = copy.deepcopy(basic_graph_data["data"])
+    first, second = data["nodes"][0]["id"], data["nodes"][1]["id"]
+    data["edges"] += [
+        {"source": first, "target": "missing"},
+        {"source": first, "target": second},
+        {"source": second, "target": first},
+    ]
+    del data["nodes"][-1]["data"]["node"]["template"]
+
+    result = Graph.validate_payload(data)
+    messages = [error["message"] for error in result["errors"]]
+    assert not result["valid"]
+    assert "Edge node missing not found" in messages
+    assert any(message.startswith("Invalid node data") for message in messages)
+    assert len(messages) >= 3
+
+
+def test_validate_payload_warns_about_isolated_nodes(basic_graph_data):
+    data = copy.deepcopy(basic_graph_data["data"])
+    isolated = copy.deepcopy(
+        next(
+            node
+            for node in data["nodes"]
+            if node["data"]["type"] == "ConversationBufferMemory"
+        )
+    )
+    isolated["id"] = "isolated"
+    data["nodes"].append(isolated)
+    result = Graph.validate_payload(data)
+    assert result["valid"]
+    assert [warning["node"] for warning in result["warnings"]] == ["isolated"]
+
+
+def test_validate_payload_rejects_malformed_edges(basic_graph_data):
+    data = copy.deepcopy(basic_graph_data["data"])
+    data["edges"].append("not an edge")
+    with pytest.raises(ValueError):
+        Graph.validate_payload(data)
+
+
+def test_validate_payload_reports_cycles(build_synthetic_graph_data):
+    data = build_synthetic_graph_data(num_nodes=3, fan_in=1)
+    data["edges"].append({"source": "node-2", "target": "node-0"})
+    result = Graph.validate_payload(data)
+    assert not result["valid"]
+    assert result["root"] is None
+    assert result["errors"][0]["message"].startswith("Graph contains a cycle")
+
+
+def test_type_index_matches_substring_rule(complex_graph):
+    assert type_index.matches("Chain", "LLMChain")
+    assert not type_index.matches("LLMChain", "Chain")
+    # Types that are not in langchain_types_dict are indexed as they are seen
+    assert type_index.matches("CustomType", "List[CustomType]")
+    for edge in complex_graph.edges:
+        assert edge.valid == any(
+            output in target_req
+            for output in edge.source_types
+            for target_req in edge.target_reqs
+        )
+        assert edge.matched_type == next(
+            output for output in edge.source_types if output in edge.target_reqs
+        )
+
+
+def test_type_index_does_not_grow_with_unknown_types():
+    index = TypeCompatibilityIndex(max_edges=10)
+    index.load({})
+    for i in range(100):
+        assert index.matches(f"Custom{i}", f"List[Custom{i}]")
+        assert index.match_edge([f"Custom{i}"], [f"Custom{i}"]) == (True, f"Custom{i}")
+    assert len(index._matches) == 0
+    assert len(index._edges) == 10
+
+
+def test_vertices_release_raw_payload(basic_graph_data):
+    data = copy.deepcopy(basic_graph_data["data"])
+    graph = Graph.from_payload(data)
+    raw_ids = {id(node) for node in data["nodes"]} | {
+        id(edge) for edge in data["edges"]
+    }
+    assert not raw_ids & {id(node) for node in graph._nodes + graph._edges}
+    for node in graph.nodes:
+        assert "template" not in node.data["node"]
+        assert node._data["data"] is node.data
+        assert (
+            node.fingerprint
+            == Vertex(
+                next(raw for raw in data["nodes"] if raw["id"] == node.id)
+            ).fingerprint
+        )
+    assert isinstance(graph.build(), Chain)
+
+
+def test_unreachable_nodes_are_skipped(basic_graph_data_with_island, monkeypatch):
+    built_params = []
+    original_build_params = Vertex._build_params
+
+    def build_params(self):
+        built_params.append(self.id)
+        original_build_params(self)
+
+    monkeypatch.setattr(Vertex, "_build_params", build_params)
+    graph = Graph.from_payload(basic_graph_data_with_island)
+
+    island_ids = {"island_dndnode_81", "island_dndnode_82"}
+    assert {node.id for node in graph.unreachable_nodes} == island_ids
+    assert not island_ids & {node.id for node in graph.nodes}
+    assert not island_ids & set(built_params)
+    for node in graph.nodes:
+        for edge in node.edges:
+            assert edge.source.id not in island_ids
+            assert edge.target.id not in island_ids
+    assert get_root_node(graph).id == "dndnode_81"
+    assert isinstance(graph.build(), Chain)
+
+
+def test_measure_build():
+    tracemalloc.start()
+    try:
+        with measure_build() as metrics:
+            data = [bytearray(1024) for _ in range(100)]
+    finally:
+        tracemalloc.stop()
+    assert metrics["wall_time"] >= 0
+    assert metrics["cpu_time"] >= 0
+    assert metrics["memory_peak"] >= 100 * 1024
+    del data
+
+    with measure_build() as metrics:
+        pass
+    assert metrics["memory_peak"] is None
+
+
+def test_measure_build_concurrent_blocks():
+    tracemalloc.start()
+    try:
+        with measure_build() as outer:
+            with measure_build(offloaded=True) as inner:
+                data = [bytearray(1024) for _ in range(100)]
+    finally:
+        tracemalloc.stop()
+    del data
+    # The peak covers the whole process, so overlapping blocks report none
+    assert outer["memory_peak"] is None
+    assert inner["memory_peak"] is None
+    # Nothing ran through count_cpu_time
+    assert inner["cpu_time"] == 0
+
+
+def test_measure_build_counts_offloaded_cpu_time():
+    def spin():
+        end = time.thread_time() + 0.05
+        while time.thread_time() < end:
+            pass
+
+    async def build():
+        with measure_build(offloaded=True) as metrics:
+            await asyncio.to_thread(count_cpu_time, spin)
+            await asyncio.sleep(0.05)
+        return metrics
+
+    assert asyncio.run(build())["cpu_time"] >= 0.05
+
+
+def test_measure_build_counts_the_calling_thread_only():
+    done = threading.Event()
+
+    def spin():
+        while not done.is_set():
+            pass
+
+    thread = threading.Thread(target=spin)
+    thread.start()
+    try:
+        with measure_build() as metrics:
+            time.sleep(0.2)
+    finally:
+        done.set()
+        thread.join()
+    assert metrics["cpu_time"] < 0.1
+
+
+def test_abuild_times_out(basic_graph, monkeypatch):
+    async def hang(**kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(loading, "ainstantiate_class", hang)
+    monkeypatch.setattr(settings, "vertex_build_timeouts", {"OpenAI": 0.01})
+    llm = get_node_by_type(basic_graph, LLMVertex)
+    assert llm._get_build_timeout() == 0.01
+    with pytest.raises(ValueError, match="timed out"):
+        asyncio.run(llm.abuild())
+    assert not llm._built
@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+
+import pytest
+from langflow.cache.flow import (
+    InMemoryCache,
+    start_cache_sweeper,
+    stop_cache_sweeper,
+    sweep_caches,
+)
+
+THREADS = 16
+
+
+def run_threads(target, count=THREADS):
+    """Run target(index) in count threads started together, re-raising errors."""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads), "Deadlock"
+    if errors:
+        raise errors[0]
+
+
+def test_sweep_removes_unread_expired_items():
+    evicted = []
+    cache = InMemoryCache(
+        expiration_time=0.05, on_evict=lambda key, value: evicted.append(key)
+    )
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert "a" in cache
+    time.sleep(0.1)
+    # Expired items are not contained even before they are removed
+    assert "a" not in cache
+    assert len(cache) == 2
+    assert cache.sweep() == 2
+    assert len(cache) == 0
+    assert sorted(evicted) == ["a", "b"]
+
+
+def test_sweep_skips_items_set_again():
+    cache = InMemoryCache(expiration_time=0.1)
+    cache.set("a", 1)
+    time.sleep(0.06)
+    cache.set("a", 2)
+    time.sleep(0.06)
+    # The first expiration of "a" has passed but it was set again
+    assert cache.sweep() == 0
+    assert cache.get("a") == 2
+
+
+def test_expiration_heap_stays_bounded():
+    cache = InMemoryCache(expiration_time=60)
+    for i in range(1000):
+        cache.set("a", i)
+    assert len(cache._expirations) <= 2 * len(cache) + 64
+
+
+def test_background_sweeper():
+    cache = InMemoryCache(expiration_time=0.01)
+    cache.set("a", 1)
+    start_cache_sweeper(0.02)
+    try:
+        deadline = time.monotonic() + 5
+        while len(cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop_cache_sweeper()
+    assert len(cache) == 0
+    assert sweep_caches() == 0
+
+
+def test_get_or_set_value():
+    cache = InMemoryCache()
+    assert cache.get_or_set("a", 1) == 1
+    assert cache.get_or_set("a", 2) == 1
+
+
+def test_get_or_set_computes_once_under_contention():
+    cache = InMemoryCache()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = [None] * THREADS
+
+    def get(index):
+        results[index] = cache.get_or_set("key", factory=factory)
+
+    run_threads(get)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    # Late callers find the value, the others wait for it
+    assert cache.misses == 1
+    assert cache.hits + cache.waits == THREADS - 1
+
+
+def test_get_or_set_shares_factory_errors():
+    cache = InMemoryCache()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        raise ValueError("Build failed")
+
+    def get(index):
+        with pytest.raises(ValueError, match="Build failed"):
+            cache.get_or_set("key", factory=factory)
+
+    run_threads(get)
+    assert len(calls) == 1
+    assert "key" not in cache
+    # A later call computes the value again
+    assert cache.get_or_set("key", factory=lambda: 1) == 1
+
+
+def test_concurrent_operations_keep_the_cache_consistent():
+    evicted = []
+    cache = InMemoryCache(
+        max_size=50,
+        max_weight=400,
+        weigher=lambda value: value % 10 + 1,
+        expiration_time=0.01,
+        on_evict=lambda key, value: evicted.append(key),
+    )
+
+    def work(index):
+        rng = random.Random(index)
+        for i in range(2000):
+            key = rng.randrange(100)
+            operation = rng.random()
+            if operation < 0.4:
+                cache.set(key, i)
+            elif operation < 0.7:
+                value = cache.get(key)
+                assert value is None or isinstance(value, int)
+            elif operation < 0.85:
+                cache.get_or_set(key, factory=lambda: i)
+            elif operation < 0.95:
+                cache.delete(key)
+            elif operation < 0.99:
+                key in cache
+            else:
+                cache.sweep()
+
+    run_threads(work)
+    with cache._lock:
+        items = list(cache._cache.values())
+    assert len(items) <= cache.max_size
+    assert cache.weight == sum(item["weight"] for item in items)
+    assert cache.weight <= cache.max_weight
+    assert not cache._pending
+    assert cache.evictions + cache.expirations == len(evicted)
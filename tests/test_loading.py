@@ -1,8 +1,32 @@
+import asyncio
 import json
+import threading
 
 import pytest
 from langchain.chains.base import Chain
+from langchain.schema import Document
+from langflow.interface.initialize import loading
+from langflow.interface.initialize.loading import ainstantiate_class, instantiate_class
+from langflow.interface.initialize.process_pool import (
+    pack_documents,
+    pack_params,
+    shutdown_process_pool,
+    unpack_documents,
+)
+from langflow.interface.importing.utils import (
+    import_chat_llm,
+    import_documentloader,
+    import_llm,
+)
+from langflow.interface import listing
+from langflow.interface.listing import (
+    TYPE_REGISTRY,
+    TypeEntry,
+    build_type_registry,
+    get_type_importer,
+)
 from langflow.processing.process import load_flow_from_json
+from langflow.settings import settings
 from langflow.graph import Graph
 from langflow.utils.payload import get_root_node
 
@@ -34,3 +58,87 @@ def test_get_root_node():
     assert root is not None
     assert hasattr(root, "id")
     assert hasattr(root, "data")
+
+
+def test_type_registry():
+    assert TYPE_REGISTRY["OpenAI"].base_type == "llms"
+    assert TYPE_REGISTRY["OpenAI"].importer is import_llm
+    assert TYPE_REGISTRY["ChatOpenAI"].importer is import_chat_llm
+    assert TYPE_REGISTRY["PyPDFLoader"].importer is import_documentloader
+    # Custom nodes are not imported from langchain
+    assert TYPE_REGISTRY["Python Function"].importer is None
+    with pytest.raises(TypeError):
+        TYPE_REGISTRY["OpenAI"] = TYPE_REGISTRY["OpenAI"]  # type: ignore
+
+
+def test_instantiate_class_uses_type_registry(monkeypatch):
+    assert get_type_importer("PyPDFLoader", "documentloaders") is import_documentloader
+    assert get_type_importer("OpenAI", "tools") is None
+    imported = []
+
+    def importer(name):
+        imported.append(name)
+        return dict
+
+    monkeypatch.setattr(
+        listing, "TYPE_REGISTRY", {"Fake": TypeEntry("wrappers", importer)}
+    )
+    assert instantiate_class("Fake", "wrappers", {"a": 1}) == {"a": 1}
+    assert imported == ["Fake"]
+
+
+def test_type_registry_reports_ambiguous_names():
+    registry, ambiguous = build_type_registry(
+        {"chains": ["Shared", "LLMChain"], "tools": ["Shared", "Shared"]}
+    )
+    assert registry["Shared"].base_type == "chains"
+    assert ambiguous == {"Shared": ["chains", "tools"]}
+
+
+def test_cpu_heavy_vertices_are_built_in_process_pool(monkeypatch):
+    documents = [Document(page_content="a b c " * 50, metadata={"source": "test"})]
+    params = {"chunk_size": 20, "chunk_overlap": 0, "separator": " "}
+    expected = instantiate_class(
+        "CharacterTextSplitter", "textsplitters", {**params, "documents": documents}
+    )
+
+    packed = []
+    unpacked = []
+    # The pool is disabled by default and the settings reject restoring
+    # the normalized default through setattr
+    monkeypatch.setitem(settings.__dict__, "process_pool_size", 1)
+    monkeypatch.setattr(
+        loading,
+        "pack_params",
+        lambda params: packed.append(threading.current_thread()) or pack_params(params),
+    )
+    monkeypatch.setattr(
+        loading,
+        "unpack_documents",
+        lambda value: unpacked.append(threading.current_thread())
+        or unpack_documents(value),
+    )
+    try:
+        result = asyncio.run(
+            ainstantiate_class(
+                "CharacterTextSplitter",
+                "textsplitters",
+                {**params, "documents": documents},
+            )
+        )
+    finally:
+        shutdown_process_pool()
+    # Neither pickling nor rebuilding the documents runs on the event loop
+    assert packed and threading.main_thread() not in packed
+    assert unpacked and threading.main_thread() not in unpacked
+    assert result == expected
+
+
+def test_pack_documents():
+    documents = [Document(page_content="text", metadata={"page": 1})]
+    packed = pack_documents(documents)
+    assert packed == [("text", {"page": 1})]
+    assert unpack_documents(packed) == documents
+    # Other values are left alone
+    assert pack_documents([]) == []
+    assert unpack_documents(["text"]) == ["text"]
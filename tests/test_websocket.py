@@ -1,8 +1,16 @@
+import asyncio
+import json
+import threading
+
 from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
 
 # from langflow.chat.manager import ChatManager
 
 import pytest
+from langflow.api.v1.chat import chat_manager, flow_data_store
+from langflow.chat.utils import BuildCancelledError, run_until_cancelled
+from langflow.graph.vertex.base import Vertex
 
 
 def test_init_build(client):
@@ -45,3 +53,157 @@ def test_websocket_endpoint_after_build(client, basic_graph_data):
         with client.websocket_connect("api/v1/chat/websocket_test") as websocket:
             websocket.send_json({"input": "test"})
             websocket.receive_json()
+
+
+def test_stream_build_reports_vertex_timestamps(client, basic_graph_data):
+    client.post("api/v1/build/init/stream_test", json=basic_graph_data["data"])
+    response = client.get("api/v1/build/stream/stream_test")
+    assert response.status_code == 200
+
+    messages = [
+        json.loads(line[len("data: ") :])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    vertex_messages = [message for message in messages if "id" in message]
+    assert len(vertex_messages) == len(basic_graph_data["data"]["nodes"])
+    for message in vertex_messages:
+        assert message["valid"], message["params"]
+        assert message["start_time"] <= message["end_time"]
+    assert messages[-1] == {"end_of_stream": True}
+    # Only the built graph is kept, not the raw payload
+    assert "graph_data" not in flow_data_store["stream_test"]
+    assert flow_data_store["stream_test"]["graph"] is not None
+
+
+def test_stream_build_reports_flows_too_large_for_the_chat(
+    client, basic_graph_data, monkeypatch
+):
+    monkeypatch.setattr(chat_manager.in_memory_cache, "max_weight", 1)
+    client.post("api/v1/build/init/too_large", json=basic_graph_data["data"])
+    response = client.get("api/v1/build/stream/too_large")
+    assert "too large to be kept for the chat" in response.text
+    assert client.get("api/v1/build/too_large/status").json()["built"] is False
+
+
+def test_stream_build_reports_unreachable_nodes(client, basic_graph_data_with_island):
+    client.post(
+        "api/v1/build/init/stream_island", json=basic_graph_data_with_island["data"]
+    )
+    response = client.get("api/v1/build/stream/stream_island")
+    assert response.status_code == 200
+
+    messages = [
+        json.loads(line[len("data: ") :])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    skipped = {
+        message["id"]
+        for message in messages
+        if message.get("params") == "skipped (unreachable)"
+    }
+    assert skipped == {"island_dndnode_81", "island_dndnode_82"}
+    vertex_messages = [message for message in messages if "id" in message]
+    assert vertex_messages[-1]["progress"] == 1
+
+
+def test_build_report(client, basic_graph_data):
+    response = client.get("api/v1/build/report_test/report")
+    assert response.status_code == 404
+
+    client.post("api/v1/build/init/report_test", json=basic_graph_data["data"])
+    response = client.get("api/v1/build/stream/report_test")
+    streamed = {
+        message["id"]: message["metrics"]
+        for message in (
+            json.loads(line[len("data: ") :])
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        )
+        if "id" in message
+    }
+    for metrics in streamed.values():
+        assert metrics["wall_time"] >= 0
+        assert metrics["cpu_time"] >= 0
+        assert "cache_hit" in metrics
+
+    response = client.get("api/v1/build/report_test/report")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "success"
+    assert {vertex["id"] for vertex in report["vertices"]} == set(streamed)
+    assert report["wall_time"] == pytest.approx(
+        sum(vertex["wall_time"] for vertex in report["vertices"])
+    )
+
+
+def test_cancel_build(client, basic_graph_data):
+    response = client.post("api/v1/build/cancel_test/cancel")
+    assert response.status_code == 404
+
+    client.post("api/v1/build/init/cancel_test", json=basic_graph_data["data"])
+    client.get("api/v1/build/stream/cancel_test")
+    # Nothing to cancel once the build is over
+    response = client.post("api/v1/build/cancel_test/cancel")
+    assert response.status_code == 200
+    assert response.json() == {"cancelled": False}
+
+
+def test_cancel_streaming_build(client, basic_graph_data, monkeypatch):
+    started = threading.Event()
+
+    async def hang(self):
+        started.set()
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(Vertex, "_ainstantiate", hang)
+    # Entered, the client serves every request on one event loop like the server
+    with TestClient(client.app) as client:
+        client.post("api/v1/build/init/cancel_stream", json=basic_graph_data["data"])
+        responses = []
+        # The stream is read to its end, so it runs in its own thread
+        stream = threading.Thread(
+            target=lambda: responses.append(
+                client.get("api/v1/build/stream/cancel_stream")
+            )
+        )
+        stream.start()
+        try:
+            assert started.wait(5)
+            response = client.post("api/v1/build/cancel_stream/cancel")
+            assert response.json() == {"cancelled": True}
+        finally:
+            stream.join(5)
+        assert not stream.is_alive()
+        response = client.get("api/v1/build/cancel_stream/status")
+        assert response.json()["built"] is False
+
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in responses[0].text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert {"error": "Build cancelled"} in events
+    # No vertex finished building
+    assert not [event for event in events if "id" in event]
+
+
+def test_run_until_cancelled():
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def run():
+        cancel_event = asyncio.Event()
+        assert (
+            await run_until_cancelled(asyncio.sleep(0, "done"), cancel_event) == "done"
+        )
+
+        task = asyncio.ensure_future(slow())
+        asyncio.get_running_loop().call_later(0.01, cancel_event.set)
+        with pytest.raises(BuildCancelledError):
+            await run_until_cancelled(task, cancel_event)
+        await asyncio.sleep(0)
+        assert task.cancelled()
+
+    asyncio.run(run())